@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML -> text engines against the original BeautifulSoup(...).get_text path.
+
+Usage:
+    python backend/benchmarks/text_extraction_benchmark.py URL_OR_FILE [URL_OR_FILE ...] [--repeat N]
+
+For each engine it reports the mean parse time per page, the amount of text produced and
+the useful-text ratio: the share of the first 12000 characters (what the LLM actually sees)
+that is prose, i.e. sentence-like segments of at least 8 words ending in . ! or ?
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from functools import partial
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools import http_client
+from tools.text_extraction import BLOCK_PARSERS, ENGINES, main_content_text
+
+LLM_WINDOW = 12000
+SENTENCE = re.compile(r"[^.!?\n]+[.!?]")
+
+
+def useful_text_ratio(text: str) -> float:
+    window = text[:LLM_WINDOW]
+    if not window:
+        return 0.0
+    useful = sum(len(s) for s in SENTENCE.findall(window) if len(s.split()) >= 8)
+    return useful / len(window)
+
+
+def load_pages(sources):
+    pages = []
+    for source in sources:
+        if os.path.exists(source):
+            with open(source, "r", encoding="utf-8", errors="replace") as f:
+                pages.append((source, f.read()))
+            continue
+        try:
+            page = http_client.fetch_html(source, timeout=10)
+        except Exception as e:
+            print(f"Skipping {source}: {e}")
+            continue
+        if page.text is None:
+            print(f"Skipping {source}: status {page.status}, content type {page.content_type}")
+            continue
+        pages.append((source, page.text))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="+", help="article URLs or local HTML files")
+    parser.add_argument("--repeat", type=int, default=5, help="parses per page and engine")
+    parser.add_argument("--engines", default="soup,main:stdlib,main:lxml",
+                        help="comma separated engine names; main:stdlib / main:lxml pick the main engine's parser")
+    args = parser.parse_args()
+
+    pages = load_pages(args.sources)
+    if not pages:
+        print("No pages to benchmark")
+        return 1
+    print(f"{len(pages)} pages, {sum(len(html) for _, html in pages) / 1024:.0f} KiB of HTML, "
+          f"{args.repeat} runs each\n")
+    print(f"{'engine':<12}{'ms/page':>10}{'chars/page':>12}{'useful ratio':>14}")
+    engines = dict(ENGINES)
+    engines.update({f"main:{name}": partial(main_content_text, parser=name) for name in BLOCK_PARSERS})
+    for name in args.engines.split(","):
+        engine = engines.get(name)
+        if engine is None:
+            print(f"{name:<12}not installed")
+            continue
+        try:
+            engine(pages[0][1])
+        except ImportError:
+            print(f"{name:<12}not installed")
+            continue
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            outputs = [engine(html) for _, html in pages]
+        elapsed = (time.perf_counter() - started) / (args.repeat * len(pages))
+        chars = sum(len(text) for text in outputs) / len(outputs)
+        ratio = sum(useful_text_ratio(text) for text in outputs) / len(outputs)
+        print(f"{name:<12}{elapsed * 1000:>10.1f}{chars:>12.0f}{ratio:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -9,6 +9,124 @@ LANGSEARCH_API_KEY = os.environ.get("LANGSEARCH_API_KEY", "")
 AZURE_OPENAI_API_KEY = os.environ.get("AZURE_OPENAI_API_KEY", "")
 AZURE_OPENAI_ENDPOINT = os.environ.get("AZURE_OPENAI_ENDPOINT", "https://newaitoolssearch-resource.cognitiveservices.azure.com/openai/deployments/gpt-4o-mini/chat/completions?api-version=2025-01-01-preview")
 
+# Azure OpenAI deployment and shared LLM client settings
+AZURE_OPENAI_DEPLOYMENT = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
+AZURE_OPENAI_API_VERSION = os.environ.get("AZURE_OPENAI_API_VERSION", "2025-01-01-preview")
+LLM_EXTRACTION_TEMPERATURE = float(os.environ.get("LLM_EXTRACTION_TEMPERATURE", "0.2"))
+LLM_SUMMARY_TEMPERATURE = float(os.environ.get("LLM_SUMMARY_TEMPERATURE", "0.7"))
+LLM_MAX_TOKENS = int(os.environ.get("LLM_MAX_TOKENS", "512"))
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "16"))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "60"))
+
+# LLM reply cache (same prompt and parameters -> same reply, no tokens spent)
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(14 * 24 * 3600)))
+
 # URLs
 LANGSEARCH_SEARCH_ENDPOINT = "https://api.langsearch.com/v1/web-search"
 BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:8000")
+
+# LangSearch request rate (token bucket) and strategic query fan-out
+LANGSEARCH_REQUESTS_PER_SECOND = float(os.environ.get("LANGSEARCH_REQUESTS_PER_SECOND", "2"))
+LANGSEARCH_BURST = int(os.environ.get("LANGSEARCH_BURST", "8"))
+LANGSEARCH_MAX_WORKERS = int(os.environ.get("LANGSEARCH_MAX_WORKERS", "8"))
+
+# LangSearch retries (exponential backoff with jitter, honors Retry-After)
+LANGSEARCH_MAX_ATTEMPTS = int(os.environ.get("LANGSEARCH_MAX_ATTEMPTS", "4"))
+LANGSEARCH_RETRY_BUDGET = int(os.environ.get("LANGSEARCH_RETRY_BUDGET", "20"))
+LANGSEARCH_RETRY_BASE_DELAY = float(os.environ.get("LANGSEARCH_RETRY_BASE_DELAY", "1"))
+LANGSEARCH_RETRY_MAX_DELAY = float(os.environ.get("LANGSEARCH_RETRY_MAX_DELAY", "30"))
+
+# Shared HTTP client (keep-alive pools per host)
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", "32"))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "16"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+HTTP_ENABLE_HTTP2 = os.environ.get("HTTP_ENABLE_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# Local caches (SQLite files live here)
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+# LangSearch response cache; TTLs in seconds per query type, 0 disables that type
+SEARCH_CACHE_ENABLED = os.environ.get("SEARCH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_CACHE_PATH = os.environ.get("SEARCH_CACHE_PATH", os.path.join(CACHE_DIR, "search_cache.sqlite3"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "2000"))
+SEARCH_CACHE_TTL_STRATEGIC = float(os.environ.get("SEARCH_CACHE_TTL_STRATEGIC", "43200"))
+SEARCH_CACHE_TTL_TOOL = float(os.environ.get("SEARCH_CACHE_TTL_TOOL", "86400"))
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.sqlite3"))
+
+# Article/vendor page cache: revalidated with conditional GETs, capped by total stored bytes
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PAGE_CACHE_PATH = os.environ.get("PAGE_CACHE_PATH", os.path.join(CACHE_DIR, "page_cache.sqlite3"))
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Tool website metadata (title, description, pricing hints): only the first bytes of a page are read
+METADATA_MAX_BYTES = int(os.environ.get("METADATA_MAX_BYTES", "131072"))
+METADATA_PRICING_SCAN_CHARS = int(os.environ.get("METADATA_PRICING_SCAN_CHARS", "20000"))
+METADATA_CACHE_TTL = float(os.environ.get("METADATA_CACHE_TTL", str(7 * 24 * 3600)))
+METADATA_FETCH_DEADLINE = float(os.environ.get("METADATA_FETCH_DEADLINE", "15"))
+
+# Near-duplicate detection: estimated Jaccard similarity of title+snippet words
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.7"))
+
+# Article fetching: worker pool size, per-host concurrency cap, whole-stage deadline (seconds)
+ARTICLE_FETCH_WORKERS = int(os.environ.get("ARTICLE_FETCH_WORKERS", "8"))
+ARTICLE_FETCH_PER_HOST = int(os.environ.get("ARTICLE_FETCH_PER_HOST", "2"))
+ARTICLE_FETCH_DEADLINE = float(os.environ.get("ARTICLE_FETCH_DEADLINE", "30"))
+
+# Page downloads are streamed: non-HTML responses are skipped and reading stops after this many bytes
+PAGE_MAX_BYTES = int(os.environ.get("PAGE_MAX_BYTES", "1048576"))
+
+# LLM tool-name extraction: "map_reduce" reads every article in parallel chunks, "single" makes one
+# call on the first 12000 characters of all articles
+LLM_EXTRACTION_MODE = os.environ.get("LLM_EXTRACTION_MODE", "map_reduce")
+LLM_EXTRACTION_CHUNK_TOKENS = int(os.environ.get("LLM_EXTRACTION_CHUNK_TOKENS", "3000"))
+LLM_EXTRACTION_MAX_ARTICLE_TOKENS = int(os.environ.get("LLM_EXTRACTION_MAX_ARTICLE_TOKENS", "6000"))
+LLM_EXTRACTION_WORKERS = int(os.environ.get("LLM_EXTRACTION_WORKERS", "6"))
+
+# Tool gazetteer: chunks where at least GAZETTEER_MIN_HITS known tools account for at least
+# GAZETTEER_MIN_CONFIDENCE of the candidate names skip the LLM; LLM results grow the dictionary
+GAZETTEER_ENABLED = os.environ.get("GAZETTEER_ENABLED", "true").lower() in ("1", "true", "yes")
+GAZETTEER_PATH = os.environ.get("GAZETTEER_PATH", os.path.join(CACHE_DIR, "tool_gazetteer.json"))
+GAZETTEER_MIN_HITS = int(os.environ.get("GAZETTEER_MIN_HITS", "4"))
+GAZETTEER_MIN_CONFIDENCE = float(os.environ.get("GAZETTEER_MIN_CONFIDENCE", "0.8"))
+
+# Tool summaries: "batch" summarizes several tools per request (split by prompt token budget),
+# "single" makes one request per tool, "async" runs every tool concurrently (see below)
+LLM_SUMMARY_MODE = os.environ.get("LLM_SUMMARY_MODE", "batch")
+LLM_SUMMARY_BATCH_TOKENS = int(os.environ.get("LLM_SUMMARY_BATCH_TOKENS", "3000"))
+LLM_SUMMARY_BATCH_SIZE = int(os.environ.get("LLM_SUMMARY_BATCH_SIZE", "8"))
+# "async" runs one search -> enrich -> summarize chain per tool, at most this many at once
+LLM_SUMMARY_CONCURRENCY = int(os.environ.get("LLM_SUMMARY_CONCURRENCY", "8"))
+
+# Workflow execution: "sequential" runs search -> extraction -> summarization one after another,
+# "pipelined" overlaps extraction and summarization (map_reduce extraction only)
+WORKFLOW_MODE = os.environ.get("WORKFLOW_MODE", "sequential")
+
+# Run checkpoints: state after each workflow node and finished tool summaries, so a failed run
+# resumes where it stopped; unfinished runs older than CHECKPOINT_MAX_AGE seconds start over
+CHECKPOINT_ENABLED = os.environ.get("CHECKPOINT_ENABLED", "true").lower() in ("1", "true", "yes")
+CHECKPOINT_PATH = os.environ.get("CHECKPOINT_PATH", os.path.join(CACHE_DIR, "workflow_checkpoints.sqlite3"))
+CHECKPOINT_MAX_AGE = float(os.environ.get("CHECKPOINT_MAX_AGE", str(24 * 3600)))
+
+# Scheduled runs across uvicorn workers: one process holds a lease (renewed well within
+# SCHEDULER_LEASE_TTL seconds) and runs the weekly workflow once per WEEKLY_RUN_INTERVAL; a failed
+# scheduled run is retried WEEKLY_RUN_RETRY_DELAY seconds later. The same database holds the
+# runs and their progress (one run at a time across workers; a run's worker renews it within
+# SCHEDULER_LEASE_TTL seconds, or it counts as failed)
+SCHEDULER_DB_PATH = os.environ.get("SCHEDULER_DB_PATH", os.path.join(CACHE_DIR, "scheduler.sqlite3"))
+SCHEDULER_LEASE_TTL = float(os.environ.get("SCHEDULER_LEASE_TTL", "60"))
+SCHEDULER_CHECK_INTERVAL = float(os.environ.get("SCHEDULER_CHECK_INTERVAL", "300"))
+WEEKLY_RUN_INTERVAL = float(os.environ.get("WEEKLY_RUN_INTERVAL", str(7 * 24 * 3600)))
+WEEKLY_RUN_RETRY_DELAY = float(os.environ.get("WEEKLY_RUN_RETRY_DELAY", "3600"))
+
+# Incremental runs: tools already in last run's results keep their entry until it is
+# INCREMENTAL_TRUST_DAYS days old; only new or stale tools are searched and summarized
+INCREMENTAL_RUNS_ENABLED = os.environ.get("INCREMENTAL_RUNS_ENABLED", "true").lower() in ("1", "true", "yes")
+INCREMENTAL_TRUST_DAYS = float(os.environ.get("INCREMENTAL_TRUST_DAYS", "28"))
+
+# HTML -> text engine for articles: "main" (boilerplate removal), "soup" (full page text) or "trafilatura"
+TEXT_EXTRACTION_ENGINE = os.environ.get("TEXT_EXTRACTION_ENGINE", "main")
+# HTML parser behind the "main" engine: "auto" (lxml if installed, else html.parser), "lxml" or "stdlib"
+TEXT_EXTRACTION_PARSER = os.environ.get("TEXT_EXTRACTION_PARSER", "auto")
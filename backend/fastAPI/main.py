@@ -1,18 +1,52 @@
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
 import sys
 import os
+import tempfile
+from typing import Optional
 
 # Add the backend directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from workflow.coordinator import RunCoordinator, RunStore
+from workflow.leader import LeaderLease
 from workflow.workflow import Workflow
+from tools import http_client, llm_client
+from tools.incremental import load_previous_results
+from config import (INCREMENTAL_RUNS_ENABLED, SCHEDULER_CHECK_INTERVAL, SCHEDULER_LEASE_TTL, WEEKLY_RUN_INTERVAL,
+                    WEEKLY_RUN_RETRY_DELAY)
 from apscheduler.schedulers.background import BackgroundScheduler
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 import json
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start a scheduler when a worker starts serving: it renews/contends for the leader lease
+    (defined below) and checks whether the weekly run (every 7 days) is due. On shutdown stop
+    it, give up the lease so another worker can take over at once, and close the shared HTTP
+    and LLM connection pools.
+    """
+    global scheduler
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(leader.try_acquire, "interval", seconds=SCHEDULER_LEASE_TTL / 3, next_run_time=datetime.now())
+    scheduler.add_job(scheduled_run, "interval", seconds=SCHEDULER_CHECK_INTERVAL, max_instances=1)
+    scheduler.start()
+    try:
+        yield
+    finally:
+        scheduler.shutdown(wait=False)
+        leader.release()
+        http_client.close()
+        llm_client.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Instantiate workflow with path to weekly_tech_tools.json
 JSON_PATH = os.path.join(os.path.dirname(__file__), "weekly_tech_tools.json")
@@ -20,11 +54,33 @@ workflow = Workflow(top_n_tools=8)  # Increased from 5 to 8 for more developer t
 
 RESULTS_PATH = os.path.join(os.path.dirname(__file__), "weekly_tech_tools.json")
 
-def run_and_store_weekly_results():
-    """Run workflow and store results with timestamp"""
+def write_results(data):
+    """
+    Replace the results file atomically (temp file + rename), so readers in any worker
+    never see a partly written file.
+    """
+    directory = os.path.dirname(RESULTS_PATH)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, RESULTS_PATH)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def run_and_store_weekly_results(full: bool = False, progress=None):
+    """
+    Run workflow and store results with timestamp. Unless `full` is set (or incremental
+    runs are disabled), tools unchanged since the stored results are carried over.
+    `progress` receives the workflow's progress events. Failures are recorded in the results file and re-raised for the run coordinator.
+    Don't call directly from request handlers or jobs: go through `coordinator`.
+    """
     try:
         print("Starting workflow execution...")
-        results = workflow.run()
+        previous = None if full or not INCREMENTAL_RUNS_ENABLED else load_previous_results(RESULTS_PATH)
+        results = workflow.run(previous_results=previous, progress=progress)
         print(f"Workflow returned {len(results)} results")
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         data = {
@@ -32,8 +88,7 @@ def run_and_store_weekly_results():
             "last_updated": timestamp,
             "total_tools": len(results)
         }
-        with open(RESULTS_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_results(data)
         print(f"[{timestamp}] Workflow completed. Found {len(results)} tools.")
         
         # If no results found, create a diagnostic message
@@ -44,38 +99,86 @@ def run_and_store_weekly_results():
         print(f"Error in workflow: {e}")
         import traceback
         traceback.print_exc()
-        # Create empty results file if workflow fails
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(RESULTS_PATH, "w", encoding="utf-8") as f:
-            json.dump({
-                "results": [], 
-                "last_updated": timestamp, 
-                "total_tools": 0,
-                "error": str(e),
-                "message": "Workflow failed - check search API configuration"
-            }, f)
+        # Keep the last good results (the run resumes from its checkpoint next time)
+        previous = load_previous_results(RESULTS_PATH)
+        if previous is not None:
+            with open(RESULTS_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            data["last_error"] = str(e)
+            data["last_error_at"] = timestamp
+            write_results(data)
+            raise
+        # Create empty results file if workflow fails
+        write_results({
+            "results": [], 
+            "last_updated": timestamp, 
+            "total_tools": 0,
+            "error": str(e),
+            "message": "Workflow failed - check search API configuration"
+        })
+        raise
+
+
+# One workflow run at a time across all workers: the scheduler, /trigger-workflow, /jobs and
+# /chatbot all go through this, and runs and their progress are shared through the run store
+coordinator = RunCoordinator(run_and_store_weekly_results, store=RunStore())
+
+
+def read_stored_results():
+    """The stored results file as a dict, or None if no run has stored one yet."""
+    if not os.path.exists(RESULTS_PATH):
+        return None
+    with open(RESULTS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 
+# With several uvicorn workers every process runs this module; the lease elects one scheduler leader
+leader = LeaderLease()
 
-# APScheduler setup (run every 7 days automatically)
-scheduler = BackgroundScheduler()
-scheduler.add_job(run_and_store_weekly_results, "interval", days=7)
-scheduler.start()
+
+def scheduled_run():
+    """
+    Runs in every worker; only the leader may claim the weekly run, and the claim is
+    recorded in the shared database. The week counts as done only once a run succeeds;
+    after a failure the run is claimed again WEEKLY_RUN_RETRY_DELAY seconds later.
+    """
+    if leader.is_leader and leader.claim_run("weekly", WEEKLY_RUN_INTERVAL, WEEKLY_RUN_RETRY_DELAY):
+        run, _ = coordinator.run("scheduler")
+        if run.status == "completed":
+            leader.complete_run("weekly")
+
+
+# The running APScheduler instance, created by `lifespan`
+scheduler: Optional[BackgroundScheduler] = None
 
 # Run once at startup to ensure results exist - commented out to prevent server blocking
-# run_and_store_weekly_results()
+# coordinator.start("startup")
 
 class ChatRequest(BaseModel):
     message: str
     history: list
+    refresh: bool = False
 
 @app.post("/chatbot")
-async def chatbot_endpoint(chat: ChatRequest):
-    results = workflow.run()
+def chatbot_endpoint(chat: ChatRequest):
+    """
+    Answer from the latest stored results; the workflow never runs inside the request.
+    With `refresh`, a background run is started (or the one in progress is joined)
+    and its ID is returned.
+    """
+    response = {}
+    if chat.refresh:
+        run, _ = coordinator.start("chatbot")
+        response["run_id"] = run.run_id
+    data = read_stored_results() or {}
+    results = data.get("results", [])
     if results:
         reply = results[0]["summary"]
     else:
         reply = "Sorry, I couldn't find any new tech tools this week."
-    return {"reply": reply}
+    response["reply"] = reply
+    return response
 
 @app.get("/")
 def read_root():
@@ -86,9 +189,8 @@ def get_weekly_tech_tools():
     """
     Return the most recent weekly discovered tech tools and their summaries.
     """
-    if os.path.exists(RESULTS_PATH):
-        with open(RESULTS_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    data = read_stored_results()
+    if data is not None:
         # Return the data as-is (includes metadata like last_updated)
         return data
     else:
@@ -100,31 +202,98 @@ def get_weekly_tech_tools():
         }
 
 @app.post("/trigger-workflow")
-def trigger_workflow_manually():
+def trigger_workflow_manually(full: bool = False):
     """
-    Manually trigger the workflow to search for new AI tools.
+    Manually trigger the workflow to search for new AI tools and wait for it.
+    Pass `?full=true` to recompute every tool instead of only new or changed ones.
+    If a run is already in progress, this waits for that run instead of starting another.
     """
     try:
         print("Manual workflow trigger initiated...")
-        run_and_store_weekly_results()
-        
+        run, started = coordinator.run("manual", full=full)
+        if run.status == "failed":
+            return {"error": run.error, "message": "Manual workflow failed", "run_id": run.run_id}
+
         # Read the results to return them
-        if os.path.exists(RESULTS_PATH):
-            with open(RESULTS_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
+        data = read_stored_results()
+        if data is not None:
             results = data.get("results", [])
             last_updated = data.get("last_updated", "Unknown")
             return {
                 "message": f"Manual search completed successfully! Found {len(results)} tools.", 
                 "results": results,
                 "last_updated": last_updated,
-                "total_tools": len(results)
+                "total_tools": len(results),
+                "run_id": run.run_id,
+                "joined_existing_run": not started
             }
         else:
-            return {"message": "Workflow completed but no results file found.", "results": []}
+            return {"message": "Workflow completed but no results file found.", "results": [], "run_id": run.run_id}
     except Exception as e:
         return {"error": str(e), "message": "Manual workflow failed"}
 
+# Job API: start a run without waiting for it, then poll its status or stream its progress
+SSE_POLL_INTERVAL = 1.0
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+
+def _get_job(job_id: str):
+    run = coordinator.get(job_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return run
+
+
+@app.post("/jobs", status_code=202)
+def create_job(full: bool = False):
+    """
+    Start a workflow run in the background and return its job ID at once.
+    If a run is already in progress, its ID is returned instead of starting another.
+    """
+    run, started = coordinator.start("api", full=full)
+    return {"job_id": run.run_id, "status": run.status, "joined_existing_run": not started}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status of a job, with per-node progress and the tools summarized so far."""
+    return _get_job(job_id).as_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events stream of a job's progress: "node" (started/completed/restored),
+    "summary" (one per summarized tool) and a final "status" event, after which the
+    stream ends. Event IDs are sequence numbers, so a client reconnecting with
+    Last-Event-ID continues where it left off.
+    """
+    run = _get_job(job_id)
+    last_event_id = request.headers.get("last-event-id", "")
+    start = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+
+    async def events():
+        index = start
+        idle = 0.0
+        while not await request.is_disconnected():
+            new_events, finished = run.events_since(index)
+            for event in new_events:
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            index += len(new_events)
+            if finished:
+                return
+            if new_events:
+                idle = 0.0
+            elif idle >= SSE_KEEPALIVE_INTERVAL:
+                # Comment line: keeps proxies and clients from timing out an idle stream
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+            idle += SSE_POLL_INTERVAL
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/debug-config")
 def debug_config():
     """
@@ -178,6 +347,7 @@ def debug_workflow():
     try:
         from tools.search_agent import SearchAgent
         from tools.article_url_extractor import extract_tool_names_llm
+        from tools.document_store import DocumentStore
         
         # Step 1: Search
         search_agent = SearchAgent()
@@ -187,7 +357,7 @@ def debug_workflow():
         # Step 2: Extract tool names (if we have URLs)
         tool_names = []
         if urls:
-            tool_names = extract_tool_names_llm(urls)
+            tool_names = extract_tool_names_llm(urls, documents=DocumentStore())
         
         return {
             "step1_search_results": len(search_results),
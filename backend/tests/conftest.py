@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Tests import modules the way the app does (`from tools.x import ...`), with backend/ on the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the SQLite caches, gazetteer and checkpoints of a test run out of backend/.cache
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="tech-tools-tests-"))
@@ -0,0 +1,186 @@
+"""Offline stand-ins for the LLM and LangSearch used by the tests."""
+import json
+import random
+import string
+import threading
+from types import SimpleNamespace
+from typing import Dict, List
+
+
+class FakeLLM:
+    """
+    Chat model stand-in with the attributes the LLM cache key reads. Batch prompts (a JSON
+    array of keyed tool records) get one summary per tool, except for names in `skip`;
+    any other prompt gets `reply(prompt)` or a single summary.
+    """
+
+    def __init__(self, reply=None, skip=(), deployment_name="fake", temperature=0.0, max_tokens=512):
+        self.reply = reply
+        self.skip = set(skip)
+        self.deployment_name = deployment_name
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.top_p = None
+        self.prompts: List[str] = []
+        self._lock = threading.Lock()
+
+    def _content(self, prompt: str) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+        batch = _batch_records(prompt)
+        if batch is not None:
+            return json.dumps([{"key": item["key"], "summary": f"{item['name']} summary", "bullets": ["b"]}
+                               for item in batch if item["name"] not in self.skip])
+        if self.reply is not None:
+            return self.reply(prompt)
+        return json.dumps({"summary": "single summary", "bullets": ["b"]})
+
+    def invoke(self, prompt):
+        return SimpleNamespace(content=self._content(str(prompt)))
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+    @property
+    def calls(self) -> int:
+        return len(self.prompts)
+
+
+def _batch_records(prompt: str):
+    start = prompt.find('[{"key"')
+    if start < 0:
+        return None
+    return json.loads(prompt[start:prompt.rindex("]") + 1])
+
+
+class FakeSearchAgent:
+    """SearchAgent stand-in: every tool has one result on its own site, unless listed in `missing`."""
+
+    def __init__(self, missing=()):
+        self.max_workers = 4
+        self.missing = set(missing)
+        self.searched: List[str] = []
+
+    def search_tool(self, tool_name: str) -> List[Dict]:
+        self.searched.append(tool_name)
+        if tool_name in self.missing:
+            return []
+        slug = tool_name.lower().replace(" ", "")
+        return [{"name": tool_name, "url": f"https://{slug}.dev/", "snippet": f"{tool_name} is a tool."}]
+
+    async def asearch_tool(self, tool_name: str, client) -> List[Dict]:
+        return self.search_tool(tool_name)
+
+
+def tool_info(result: Dict, *args, **kwargs) -> Dict:
+    """extract_tool_info stand-in that does not fetch the tool's website."""
+    return {"name": result["name"], "website": result["url"], "description": result["snippet"], "category": "Dev"}
+
+
+class FakeResponse:
+    """requests.Response stand-in with the attributes the search and retry code read."""
+
+    def __init__(self, status_code: int = 200, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+        self.text = json.dumps(payload) if payload is not None else ""
+
+    def json(self):
+        return self._payload
+
+
+def search_result(query_index: int, rank: int) -> Dict:
+    """A fresh web result that passes the quality check, on its own domain, with its own wording."""
+    rng = random.Random(query_index * 100 + rank)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(6)) for _ in range(10)]
+    return {
+        "name": f"{words[0].title()} {query_index}-{rank} launched",
+        "url": f"https://site{query_index}-{rank}.example/posts/{rank}",
+        "snippet": f"New developer api: {' '.join(words)}",
+    }
+
+
+class FakeLangSearch:
+    """
+    LangSearch endpoint stand-in for http_client.post: each strategic query gets its own
+    results (see search_result), after an optional per-query delay. `statuses` lists
+    status codes to answer with before the real reply. Records requests and the peak
+    number of requests in flight.
+    """
+
+    def __init__(self, queries: List[str], per_query: int = 4, delays=None, statuses=()):
+        self.queries = list(queries)
+        self.per_query = per_query
+        self.delays = delays or {}
+        self.statuses = list(statuses)
+        self.requests: List[Dict] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, headers=None, json=None, **kwargs):
+        import time
+        with self._lock:
+            self.requests.append(json)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            status = self.statuses.pop(0) if self.statuses else 200
+        try:
+            index = self.queries.index(json["query"]) if json.get("query") in self.queries else 0
+            time.sleep(self.delays.get(index, 0))
+            if status != 200:
+                return FakeResponse(status, {"error": "rate limited"}, {"Retry-After": "0"})
+            results = [search_result(index, rank) for rank in range(self.per_query)]
+            return FakeResponse(200, {"data": {"webPages": {"value": results}}})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class PageServer:
+    """
+    Local HTTP/1.1 server with keep-alive, for tests of the real HTTP stack. `pages` maps
+    paths (query ignored) to (status, headers, body bytes), where the body may be a
+    function of the request headers returning that triple; `requests` records (path, request headers)
+    and `connections` the client ports seen, one per TCP connection.
+    """
+
+    def __init__(self, pages=None):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        self.pages: Dict[str, tuple] = dict(pages or {})
+        self.requests: List[tuple] = []
+        self.connections = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                server.connections.add(self.client_address[1])
+                status, headers, body = server.pages.get(self.path.split("?")[0], (404, {}, b"not found"))
+                if callable(body):
+                    status, headers, body = body(dict(self.headers))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        return self.base + path
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
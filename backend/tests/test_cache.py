@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from fakes import FakeLangSearch
+from tools import cache, http_client
+from tools.cache import SQLiteCache, make_cache_key
+from tools.rate_limiter import TokenBucket
+from tools.search_agent import SEARCH_CACHE_TTLS, SearchAgent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    store = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    store.set("k", {"v": 1}, ttl=60, kind="tool")
+    clock.now += 59
+    assert store.get("k", kind="tool") == {"v": 1}
+    clock.now += 2
+    assert store.get("k", kind="tool") is None
+    store.set("never", 1, ttl=0)
+    assert store.get("never") is None
+    assert store.stats() == {"default": {"hits": 0, "misses": 1}, "tool": {"hits": 1, "misses": 1}}
+
+
+def test_least_recently_used_entries_are_evicted_over_the_cap(tmp_path, clock):
+    store = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    store.set("a", "A", ttl=3600)
+    clock.now += 1
+    store.set("b", "B", ttl=3600)
+    clock.now += 1
+    assert store.get("a") == "A"  # "b" is now the least recently used
+    clock.now += 1
+    store.set("c", "C", ttl=3600)
+    assert store.get("b") is None
+    assert store.get("a") == "A"
+    assert store.get("c") == "C"
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path, "responses").set("k", ["x"], ttl=60)
+    assert SQLiteCache(path, "responses").get("k") == ["x"]
+    assert SQLiteCache(path, "other").get("k") is None
+
+
+def test_cache_key_ignores_key_order():
+    assert make_cache_key({"query": "q", "count": 20}) == make_cache_key({"count": 20, "query": "q"})
+    assert make_cache_key({"query": "q", "count": 20}) != make_cache_key({"query": "q", "count": 10})
+
+
+def test_identical_searches_are_served_from_the_cache(monkeypatch, tmp_path):
+    queries = SearchAgent.STRATEGIC_QUERIES
+    langsearch = FakeLangSearch(queries)
+    monkeypatch.setattr(http_client, "post", langsearch.post)
+    store = SQLiteCache(str(tmp_path / "search.sqlite3"), "search_responses")
+    week_ago = datetime.now() - timedelta(days=7)
+
+    first = SearchAgent(rate_limiter=TokenBucket(1000, 100), cache=store)._run_strategic_query(queries[0], week_ago)
+    again = SearchAgent(rate_limiter=TokenBucket(1000, 100), cache=store)._run_strategic_query(queries[0], week_ago)
+    assert again == first
+    assert len(langsearch.requests) == 1
+    assert store.stats()["strategic"] == {"hits": 1, "misses": 1}
+    assert SEARCH_CACHE_TTLS["strategic"] > 0 and SEARCH_CACHE_TTLS["tool"] > 0
+
+
+def test_failed_searches_are_not_cached(monkeypatch, tmp_path):
+    queries = SearchAgent.STRATEGIC_QUERIES
+    langsearch = FakeLangSearch(queries, statuses=[401])
+    monkeypatch.setattr(http_client, "post", langsearch.post)
+    store = SQLiteCache(str(tmp_path / "search.sqlite3"), "search_responses")
+    agent = SearchAgent(rate_limiter=TokenBucket(1000, 100), cache=store)
+    week_ago = datetime.now() - timedelta(days=7)
+    assert agent._run_strategic_query(queries[0], week_ago) == []
+    assert len(agent._run_strategic_query(queries[0], week_ago)) == langsearch.per_query
+    assert len(langsearch.requests) == 2
@@ -0,0 +1,100 @@
+import pytest
+
+from tools.retry import RetryBudget
+from workflow import checkpoint as checkpoint_module
+from workflow import workflow
+from workflow.checkpoint import CheckpointStore
+from workflow.workflow import Workflow
+
+
+def test_unfinished_runs_are_resumed_until_finished(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    run = store.start()
+    assert not run.resumed
+    run.node_done("search_articles", {"article_urls": ["https://a.example/"], "documents": object()})
+    run.save_partial("summarize", "rocket", {"name": "Rocket"})
+
+    resumed = store.start()
+    assert resumed.run_id == run.run_id
+    assert resumed.completed == ["search_articles"]
+    assert resumed.state == {"article_urls": ["https://a.example/"]}  # run-scoped objects are not saved
+    assert resumed.partials("summarize") == {"rocket": {"name": "Rocket"}}
+
+    resumed.finish()
+    fresh = store.start()
+    assert fresh.run_id != run.run_id and not fresh.resumed
+    assert fresh.partials("summarize") == {}
+
+
+def test_stale_or_unwanted_checkpoints_are_discarded(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"), max_age=60)
+    run = store.start()
+    run.node_done("search_articles", {"article_urls": []})
+    assert store.start(resume=False).run_id != run.run_id
+    assert store.start().run_id != run.run_id  # the superseded run is gone
+
+    old = store.start()
+    old.node_done("search_articles", {"article_urls": []})
+    now = checkpoint_module.time.time()
+    monkeypatch.setattr(checkpoint_module.time, "time", lambda: now + 61)
+    assert store.start().run_id != old.run_id
+
+
+class FakeSearchAgent:
+    searches = 0
+    budgets = []
+
+    def __init__(self, retry_budget=None):
+        FakeSearchAgent.budgets.append(retry_budget)
+
+    def search_new_ai_tools(self, on_result=None):
+        FakeSearchAgent.searches += 1
+        return [{"url": f"https://news{i}.example/"} for i in range(3)]
+
+
+def test_failed_workflow_resumes_after_its_last_completed_node(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr(workflow, "CHECKPOINTS", store)
+    monkeypatch.setattr(workflow, "SearchAgent", FakeSearchAgent)
+    FakeSearchAgent.searches = 0
+    FakeSearchAgent.budgets = []
+    extractions = []
+    summarized = []
+    attempts = []
+
+    def extract(urls, stats=None, documents=None):
+        extractions.append(urls)
+        return ["Rocket", "Comet", "Rocket"]
+
+    def summarize(names, search_agent=None, documents=None, on_summary=None):
+        attempts.append(list(names))
+        summaries = []
+        for name in names:
+            if len(attempts) == 1 and name == "Comet":
+                raise RuntimeError("LLM unavailable")
+            summarized.append(name)
+            summaries.append({"name": name, "summary": f"{name} summary"})
+            on_summary(summaries[-1])
+        return summaries
+
+    monkeypatch.setattr(workflow, "extract_tool_names_llm", extract)
+    monkeypatch.setattr(workflow, "summarize_top_tools", summarize)
+    runner = Workflow(top_n_articles=3, top_n_tools=2)
+    with pytest.raises(RuntimeError):
+        runner.run()
+
+    events = []
+    results = runner.run(progress=events.append)
+    assert [r["name"] for r in results] == ["Rocket", "Comet"]
+    # Search and extraction are restored; only the unfinished summary is redone
+    assert FakeSearchAgent.searches == 1
+    assert len(extractions) == 1
+    assert attempts == [["Rocket", "Comet"], ["Comet"]]
+    assert summarized == ["Rocket", "Comet"]
+    # Each run's search and summarization agents share one retry budget, kept out of the checkpoint
+    first_run, second_run = FakeSearchAgent.budgets[:2], FakeSearchAgent.budgets[2:]
+    assert isinstance(first_run[0], RetryBudget) and first_run[1] is first_run[0]
+    assert len(second_run) == 1 and second_run[0] is not first_run[0]
+    assert {"type": "node", "node": "search_articles", "status": "restored"} in events
+    # A completed run leaves no checkpoint behind
+    assert not store.start().resumed
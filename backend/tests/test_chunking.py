@@ -0,0 +1,90 @@
+import json
+import random
+import re
+
+import pytest
+
+from fakes import FakeLLM
+from tools import llm_client, llm_summarizer
+from tools.chunking import CHARS_PER_TOKEN, ChunkPacker, chunk_texts
+from tools.llm_summarizer import ToolNameMerger, get_llm_tool_names_from_articles
+
+TOOLS = ("Rocket", "Comet", "Nebula", "Pulsar", "Quasar")
+
+
+def random_text(rng: random.Random) -> str:
+    lines = []
+    for _ in range(rng.randint(0, 40)):
+        words = ["".join(rng.choice("abcdefgh") for _ in range(rng.randint(1, 12)))
+                 for _ in range(rng.randint(0, 30))]
+        if rng.random() < 0.05:
+            words.append("x" * rng.randint(100, 900))  # a "word" longer than a chunk
+        lines.append(" ".join(words))
+    return "\n".join(lines)
+
+
+def test_chunks_respect_the_budget_and_keep_every_word_in_order():
+    rng = random.Random(12)
+    for _ in range(100):
+        texts = [random_text(rng) for _ in range(rng.randint(0, 6))]
+        chunk_tokens = rng.randint(20, 200)
+        chunks = chunk_texts(texts, chunk_tokens)
+        assert all(0 < len(chunk) <= chunk_tokens * CHARS_PER_TOKEN for chunk in chunks)
+        # Over-long words may be cut, but no character is lost or reordered
+        assert "".join("".join(chunks).split()) == "".join("".join(texts).split())
+
+
+def test_incremental_packer_gives_the_chunks_of_chunk_texts():
+    rng = random.Random(3)
+    for _ in range(100):
+        texts = [random_text(rng) for _ in range(rng.randint(0, 6))]
+        packer = ChunkPacker(64, 100)
+        chunks = []
+        for text in texts:
+            chunks.extend(packer.add(text))
+        assert chunks + packer.finish() == chunk_texts(texts, 64, 100)
+
+
+def test_one_text_completes_no_more_chunks_than_the_packer_bound():
+    rng = random.Random(8)
+    assert ChunkPacker(64).max_chunks_per_text() is None
+    for _ in range(200):
+        packer = ChunkPacker(rng.randint(5, 80), rng.randint(5, 300))
+        for _ in range(4):
+            assert len(packer.add(random_text(rng))) <= packer.max_chunks_per_text()
+
+
+def test_each_article_is_cut_to_its_own_budget():
+    chunks = chunk_texts(["a " * 1000, "b " * 10], chunk_tokens=10_000, max_tokens_per_text=50)
+    assert chunks[0].count("a") == 100
+    assert chunks[0].count("b") == 10
+
+
+@pytest.fixture
+def extraction_llm(monkeypatch):
+    def reply(prompt):
+        return json.dumps([name for name in TOOLS if re.search(rf"\b{name}\b", prompt, re.IGNORECASE)])
+    llm = FakeLLM(reply=reply)
+    monkeypatch.setattr(llm_summarizer, "get_llm", lambda role: llm)
+    monkeypatch.setattr(llm_summarizer, "TOOL_GAZETTEER", None)
+    if llm_client.LLM_CACHE is not None:
+        llm_client.LLM_CACHE.clear()
+    return llm
+
+
+def test_map_reduce_reads_every_article(extraction_llm):
+    filler = "Some unrelated paragraph about weather and lunch.\n" * 400
+    articles = [f"Rocket launched today.\n{filler}", f"{filler}A late mention of comet and Rocket.",
+                f"{filler}Nebula closes the last article."]
+    names = get_llm_tool_names_from_articles(articles, chunk_tokens=1000)
+    # A one-shot prompt over the first 12000 characters would only have seen Rocket
+    assert set(names) == {"Rocket", "Comet", "Nebula"}
+    assert extraction_llm.calls > 3
+    assert names.count("Rocket") == 2
+
+
+def test_merge_is_case_insensitive_and_counts_once_per_chunk():
+    merger = ToolNameMerger()
+    assert merger.add(["Rocket", "rocket ", "COMET"]) == ["Rocket", "COMET"]
+    assert merger.add(["ROCKET", "", "Nebula"]) == ["Rocket", "Nebula"]
+    assert merger.merged == ["Rocket", "COMET", "Rocket", "Nebula"]
@@ -0,0 +1,153 @@
+import threading
+import time
+
+from workflow.coordinator import RunCoordinator, RunStatus, RunStore
+from workflow.leader import LeaderLease
+
+
+def blocking_run(release: threading.Event, calls: list):
+    def run_fn(progress, **kwargs):
+        calls.append(kwargs)
+        progress({"type": "node", "node": "search_articles", "status": "completed"})
+        progress({"type": "summary", "summary": {"name": "Rocket", "summary": "Rocket summary"}})
+        if not release.wait(5):
+            raise RuntimeError("not released")
+        return ["Rocket"]
+    return run_fn
+
+
+def test_workers_sharing_a_store_run_one_workflow_and_see_each_others_jobs(tmp_path):
+    path = str(tmp_path / "scheduler.sqlite3")
+    release = threading.Event()
+    calls_a, calls_b = [], []
+    # Two uvicorn workers: separate coordinators and stores over the same database
+    worker_a = RunCoordinator(blocking_run(release, calls_a), store=RunStore(path))
+    worker_b = RunCoordinator(blocking_run(release, calls_b), store=RunStore(path))
+
+    run, started = worker_a.start("manual")
+    assert started
+    joined, started_b = worker_b.start("manual")
+    assert not started_b
+    assert joined.run_id == run.run_id
+
+    seen = worker_b.get(run.run_id)
+    deadline = time.monotonic() + 5
+    while seen.as_dict()["events"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    status = seen.as_dict()
+    assert status["status"] == "running"
+    assert status["nodes"] == {"search_articles": "completed"}
+    assert [summary["name"] for summary in status["partial_results"]] == ["Rocket"]
+
+    release.set()
+    joined.poll_interval = 0.01
+    assert joined.wait(5)
+    assert joined.status == "completed"
+    events, finished = worker_b.get(run.run_id).events_since(0)
+    assert finished
+    assert [event["seq"] for event in events] == [0, 1, 2]
+    assert events[-1]["status"] == "completed"
+    assert len(calls_a) == 1 and calls_b == []
+    assert worker_b.get("unknown") is None
+
+
+def test_run_of_a_dead_worker_expires_and_a_new_one_can_start(tmp_path):
+    path = str(tmp_path / "scheduler.sqlite3")
+    store = RunStore(path, ttl=0.2)
+    # A worker that claimed a run and died: nothing renews its heartbeat
+    orphan = RunStatus("orphan", "scheduler", store)
+    assert store.claim(orphan) is None
+
+    alive = RunCoordinator(lambda progress: "ok", store=RunStore(path, ttl=0.2))
+    _, started = alive.start("manual")
+    assert not started
+    time.sleep(0.3)
+    run, started = alive.run("manual", timeout=5)
+    assert started
+    assert run.status == "completed"
+    stale = alive.get("orphan").as_dict()
+    assert stale["status"] == "failed"
+    assert stale["error"] == "worker stopped responding"
+
+
+def test_heartbeat_keeps_a_long_run_claimed(tmp_path):
+    path = str(tmp_path / "scheduler.sqlite3")
+    release = threading.Event()
+    worker_a = RunCoordinator(blocking_run(release, []), store=RunStore(path, ttl=0.3))
+    worker_b = RunCoordinator(lambda progress: None, store=RunStore(path, ttl=0.3))
+    run, _ = worker_a.start("manual")
+    time.sleep(0.6)
+    joined, started = worker_b.start("manual")
+    assert not started and joined.run_id == run.run_id
+    release.set()
+    assert run.wait(5)
+
+
+def test_weekly_claim_is_retried_after_a_failure_and_done_after_a_success(tmp_path):
+    lease = LeaderLease(str(tmp_path / "scheduler.sqlite3"), ttl=60)
+    week, retry = 7 * 24 * 3600.0, 3600.0
+    assert not lease.claim_run("weekly", week, retry, now=0)       # first start: records a starting point
+    assert not lease.claim_run("weekly", week, retry, now=week - 1)
+    assert lease.claim_run("weekly", week, retry, now=week)
+    # The run fails (no complete_run): no second claim until the retry delay has passed
+    assert not lease.claim_run("weekly", week, retry, now=week + 60)
+    assert lease.claim_run("weekly", week, retry, now=week + retry)
+    lease.complete_run("weekly", now=week + retry + 600)
+    assert not lease.claim_run("weekly", week, retry, now=week + 2 * retry)
+    assert lease.claim_run("weekly", week, retry, now=2 * week + retry + 600)
+
+
+def test_concurrent_triggers_join_the_run_in_progress():
+    release = threading.Event()
+    calls = []
+    coordinator = RunCoordinator(blocking_run(release, calls))
+    started = []
+    threads = [threading.Thread(target=lambda: started.append(coordinator.start("manual", full=True)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({run.run_id for run, _ in started}) == 1
+    assert sum(1 for _, new in started if new) == 1
+    release.set()
+    run = started[0][0]
+    assert run.wait(5) and run.status == "completed"
+    assert calls == [{"full": True}]
+    assert run.result == ["Rocket"]
+    assert coordinator.current() is None
+
+    # Once finished, the next trigger starts a new run
+    next_run, new = coordinator.start("scheduler")
+    assert new and next_run.run_id != run.run_id
+    assert next_run.wait(5)
+
+
+def test_failures_are_recorded_and_old_runs_age_out():
+    def failing(progress):
+        raise RuntimeError("search API down")
+    coordinator = RunCoordinator(failing, history=2)
+    run, _ = coordinator.run("manual", timeout=5)
+    assert run.status == "failed"
+    assert run.error == "search API down"
+    events, finished = run.events_since(0)
+    assert finished
+    assert [(e["type"], e["status"], e["error"]) for e in events] == [("status", "failed", "search API down")]
+    later = [coordinator.run("manual", timeout=5)[0] for _ in range(2)]
+    assert coordinator.get(run.run_id) is None
+    assert all(coordinator.get(r.run_id) is r for r in later)
+
+
+def test_one_leader_at_a_time_and_takeover_after_expiry_or_release(tmp_path):
+    path = str(tmp_path / "scheduler.sqlite3")
+    first, second = LeaderLease(path, ttl=0.3), LeaderLease(path, ttl=0.3)
+    assert first.try_acquire() and first.is_leader
+    assert not second.try_acquire() and not second.is_leader
+    assert first.try_acquire()  # renewal
+    time.sleep(0.35)
+    # The holder stopped renewing: its lease expired, and it stopped acting as leader before that
+    assert not first.is_leader
+    assert second.try_acquire()
+    assert not first.try_acquire()
+    second.release()
+    assert first.try_acquire()
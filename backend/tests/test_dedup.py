@@ -0,0 +1,78 @@
+import random
+
+from tools.dedup import NearDuplicateIndex, TopK, canonicalize_url, normalize_title
+from tools.search_agent import ResultDeduplicator, SearchAgent
+
+
+def test_canonicalize_url_ignores_tracking_and_presentation():
+    assert canonicalize_url("http://WWW.Example.com:443//blog/post/?utm_source=x&b=2&a=1&fbclid=abc#top") == \
+        canonicalize_url("https://example.com/blog/post?a=1&b=2")
+    assert canonicalize_url("https://example.com/a?ref_src=twsrc") == "https://example.com/a"
+
+
+def test_canonicalize_url_keeps_content_parameters():
+    # `source` and `ref` select content on some sites (e.g. a code browser or a git ref)
+    assert canonicalize_url("https://example.com/view?source=main.py") != canonicalize_url("https://example.com/view")
+    assert canonicalize_url("https://example.com/diff?ref=v1") != canonicalize_url("https://example.com/diff?ref=v2")
+
+
+def test_normalize_title_strips_only_site_names():
+    assert normalize_title("New AI tool launches | TechCrunch", "https://techcrunch.com/x") == "new ai tool launches"
+    assert normalize_title("New AI tool launches - The Verge", "https://www.theverge.com/x") == "new ai tool launches"
+    assert normalize_title("Building a CLI in Rust - DEV Community", "https://dev.to/x") == "building a cli in rust"
+    assert normalize_title("New AI tool launches — techcrunch.com", "https://techcrunch.com/x") == "new ai tool launches"
+    # Without a URL nothing is known about the site, so nothing is stripped
+    assert normalize_title("New AI tool launches | TechCrunch") == "new ai tool launches techcrunch"
+
+
+def test_normalize_title_keeps_distinguishing_suffixes():
+    notes = normalize_title("Kubernetes 1.31 - Release Notes", "https://kubernetes.io/a")
+    guide = normalize_title("Kubernetes 1.31 - Deprecations Guide", "https://kubernetes.io/b")
+    assert notes != guide
+    assert normalize_title("Building a CLI in Rust - Part One", "https://dev.to/1") != \
+        normalize_title("Building a CLI in Rust - Part Two", "https://dev.to/2")
+
+
+def test_deduplicator_keeps_distinct_articles_with_similar_titles():
+    deduplicator = ResultDeduplicator(SearchAgent(cache=None))
+    results = [
+        {"name": "Kubernetes 1.31 - Release Notes", "url": "https://kubernetes.io/blog/release-notes",
+         "snippet": "Highlights of the new release: sidecar containers, AppArmor support and more."},
+        {"name": "Kubernetes 1.31 - Deprecations Guide", "url": "https://kubernetes.io/blog/deprecations",
+         "snippet": "APIs removed in this version and how to migrate your manifests before upgrading."},
+    ]
+    assert all(deduplicator.add(result) is not None for result in results)
+
+
+def test_deduplicator_drops_syndicated_copies():
+    deduplicator = ResultDeduplicator(SearchAgent(cache=None))
+    snippet = "Acme released Rocket, an open source build tool for TypeScript monorepos with remote caching."
+    assert deduplicator.add({"name": "Acme launches Rocket build tool | TechCrunch",
+                             "url": "https://techcrunch.com/rocket?utm_source=feed", "snippet": snippet}) is not None
+    # Same page through a tracking link
+    assert deduplicator.add({"name": "Acme launches Rocket", "url": "https://techcrunch.com/rocket/",
+                             "snippet": "other"}) is None
+    # Syndicated copy on another site
+    assert deduplicator.add({"name": "Acme launches Rocket build tool - VentureBeat",
+                             "url": "https://venturebeat.com/rocket", "snippet": snippet}) is None
+
+
+def test_near_duplicate_index_finds_similar_texts_only():
+    index = NearDuplicateIndex(threshold=0.7)
+    base = "acme releases rocket an open source build tool for typescript monorepos with remote caching"
+    index.add(index.signature(base))
+    assert index.find(index.signature(base + " today")) == 0
+    assert index.find(index.signature("postgres adds vector search and faster parallel queries in version 17")) is None
+    assert index.signature("too short") is None
+
+
+def test_top_k_matches_stable_sort():
+    rng = random.Random(3)
+    for _ in range(200):
+        k = rng.randint(1, 6)
+        items = [(rng.randint(0, 5), i) for i in range(rng.randint(0, 20))]
+        top = TopK(k)
+        for score, item in items:
+            top.push(score, item)
+        expected = [item for score, item in sorted(items, key=lambda pair: -pair[0])[:k]]
+        assert top.items() == expected
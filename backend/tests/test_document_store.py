@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fakes import PageServer
+from tools import document_store, http_client
+from tools.article_url_extractor import ArticlePrefetcher, fetch_article_text
+from tools.document_store import DocumentStore
+
+PAGE = (b"<html><head><title>Rocket</title><meta name=\"description\" content=\"Rocket ships code.\"></head>"
+        b"<body><article><p>Rocket is a developer tool. See pricing plans.</p></article></body></html>")
+
+
+@pytest.fixture
+def server():
+    def slow(headers):
+        time.sleep(0.1)
+        return 200, {"Content-Type": "text/html"}, PAGE
+    server = PageServer({"/rocket": (200, {}, slow)})
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    calls = []
+    extract = document_store.extract_text
+
+    def counting(html, engine):
+        calls.append(engine)
+        return extract(html, engine)
+    monkeypatch.setattr(document_store, "extract_text", counting)
+    return calls
+
+
+def test_concurrent_requests_for_one_url_share_a_single_download(server, extractions):
+    documents = DocumentStore(page_cache=None)
+    texts = []
+    # Different spellings of the same canonical URL
+    urls = [server.url("/rocket"), server.url("/rocket?utm_source=x"), server.url("/rocket#top")] * 3
+    threads = [threading.Thread(target=lambda url=url: texts.append(documents.text(url, engine="main")[0]))
+               for url in urls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(server.requests) == 1
+    assert extractions == ["main"]
+    assert len(set(texts)) == 1 and "Rocket is a developer tool" in texts[0]
+    assert documents.stats() == {"documents": 1, "fetches": 1, "reuses": len(urls) - 1}
+
+
+def test_metadata_is_read_from_a_page_the_run_already_downloaded(server):
+    documents = DocumentStore(page_cache=None)
+    documents.page(server.url("/rocket"))
+    metadata, status = documents.metadata(server.url("/rocket"))
+    assert status == 200
+    assert metadata.title == "Rocket"
+    assert metadata.has_pricing
+    assert len(server.requests) == 1
+
+
+def test_async_metadata_reuses_the_run_s_pages_and_results(server):
+    documents = DocumentStore(page_cache=None)
+    documents.page(server.url("/rocket"))
+
+    async def read():
+        async with http_client.new_async_client() as client:
+            return [await documents.ametadata(server.url(path), client) for path in ("/rocket", "/rocket?utm_source=x")]
+    (metadata, status), again = asyncio.run(read())
+    assert status == 200 and metadata.title == "Rocket" and metadata.has_pricing
+    assert again == (metadata, 200)
+    assert len(server.requests) == 1
+
+
+def test_cancelled_downloads_are_not_kept(server):
+    documents = DocumentStore(page_cache=None)
+    cancel = threading.Event()
+    cancel.set()
+    assert documents.page(server.url("/rocket"), cancel_event=cancel).text is None
+    assert documents.page(server.url("/rocket")).text is not None
+    assert documents.stats()["fetches"] == 2
+
+
+def test_prefetcher_downloads_the_provisional_top_articles_for_later_stages():
+    server = PageServer({f"/{name}": (200, {"Content-Type": "text/html"}, PAGE) for name in "abcd"})
+    try:
+        documents = DocumentStore(page_cache=None)
+        prefetcher = ArticlePrefetcher(documents, top_n=2)
+        for name, score in [("a", 1.0), ("b", 2.0), ("c", 0.5), ("d", 3.0)]:
+            prefetcher.offer(score, {"url": server.url(f"/{name}")})
+        prefetcher.close()
+        prefetcher.executor.shutdown(wait=True)
+        # "c" never made the provisional top 2; "a" did before "d" pushed it out
+        assert sorted(path for path, _ in server.requests) == ["/a", "/b", "/d"]
+        text, status = fetch_article_text(server.url("/d"), documents=documents)
+        assert status == 200 and "Rocket is a developer tool" in text
+        assert len(server.requests) == 3
+    finally:
+        server.close()
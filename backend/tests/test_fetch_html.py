@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+
+from fakes import PageServer
+from tools import http_client
+from tools.http_client import CHUNK_SIZE, afetch_html, fetch_html
+
+HTML = {"Content-Type": "text/html"}
+
+
+@pytest.fixture
+def server():
+    big = b"<html><body>" + b"<p>" + b"x" * 200_000 + b"</p></body></html>"
+    # Multi-byte characters straddling every chunk boundary
+    accents = "<html><body><p>" + "é" * (CHUNK_SIZE * 2) + "</p></body></html>"
+    latin1 = "<html><head><meta charset=\"iso-8859-1\"></head><body><p>café</p></body></html>".encode("latin-1")
+    server = PageServer({
+        "/big": (200, HTML, big),
+        "/accents": (200, {"Content-Type": "text/html; charset=utf-8"}, accents.encode("utf-8")),
+        "/latin1": (200, HTML, latin1),
+        "/cp1252": (200, {"Content-Type": "text/html; charset=windows-1252"}, "<p>naïve</p>".encode("cp1252")),
+        "/doc.pdf": (200, {"Content-Type": "application/pdf"}, b"%PDF-1.7" + b"\0" * 5000),
+        "/gone": (410, HTML, b"<p>gone</p>"),
+    })
+    yield server
+    server.close()
+
+
+def test_downloads_stop_at_the_byte_cap(server):
+    page = fetch_html(server.url("/big"), max_bytes=10_000)
+    assert page.truncated
+    assert len(page.text) == 10_000
+    full = fetch_html(server.url("/big"))
+    assert not full.truncated
+    assert full.text.endswith("</html>")
+
+
+def test_non_html_and_error_responses_have_no_text(server):
+    pdf = fetch_html(server.url("/doc.pdf"))
+    assert (pdf.status, pdf.content_type, pdf.text) == (200, "application/pdf", None)
+    gone = fetch_html(server.url("/gone"))
+    assert (gone.status, gone.text) == (410, None)
+
+
+def test_decoding_is_incremental_and_charset_aware(server):
+    page = fetch_html(server.url("/accents"))
+    assert page.text.count("é") == CHUNK_SIZE * 2
+    assert "�" not in page.text
+    # No charset in the header: the <meta charset> decides, not requests' ISO-8859-1 default
+    assert "café" in fetch_html(server.url("/latin1")).text
+    assert "naïve" in fetch_html(server.url("/cp1252")).text
+
+
+def test_a_cancelled_download_returns_no_text(server):
+    cancel = threading.Event()
+    cancel.set()
+    assert fetch_html(server.url("/big"), cancel_event=cancel).text is None
+
+
+@pytest.mark.parametrize("path", ["/big", "/accents", "/latin1", "/cp1252", "/doc.pdf", "/gone"])
+def test_async_fetch_reads_pages_like_the_blocking_one(server, path):
+    async def fetch():
+        async with http_client.new_async_client() as client:
+            return await afetch_html(client, server.url(path), max_bytes=50_000)
+    page = asyncio.run(fetch())
+    expected = fetch_html(server.url(path), max_bytes=50_000)
+    assert (page.status, page.content_type, page.text, page.truncated) == \
+           (expected.status, expected.content_type, expected.text, expected.truncated)
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from tools.fetcher import fetch_all, summarize_fetch_stats
+
+
+class Recorder:
+    """fetch_one stand-in that tracks how many fetches run at once, overall and per host."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_total = 0
+        self.max_per_host = {}
+        self.started = []
+
+    def __call__(self, url, cancel_event):
+        host = url.split("/")[2]
+        with self.lock:
+            self.started.append(url)
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_total = max(self.max_total, sum(self.active.values()))
+            self.max_per_host[host] = max(self.max_per_host.get(host, 0), self.active[host])
+        time.sleep(self.delay(url) if callable(self.delay) else self.delay)
+        with self.lock:
+            self.active[host] -= 1
+        return f"text of {url}", 200
+
+
+def test_respects_worker_and_host_caps():
+    urls = [f"https://host{i % 3}.example/{i}" for i in range(30)]
+    recorder = Recorder()
+    values, stats = fetch_all(urls, recorder, max_workers=4, per_host=2, deadline=None)
+    assert set(values) == set(urls)
+    assert [entry["url"] for entry in stats] == urls
+    assert all(entry["outcome"] == "ok" for entry in stats)
+    assert recorder.max_total <= 4
+    assert max(recorder.max_per_host.values()) <= 2
+
+
+def test_busy_host_does_not_hold_workers():
+    # Six slow pages on one host ahead of three quick ones elsewhere: with one slot per host,
+    # the other workers must pick up the quick pages instead of waiting for the busy host
+    busy = [f"https://busy.example/{i}" for i in range(6)]
+    quick = [f"https://quick{i}.example/" for i in range(3)]
+    finished_at = {}
+    started = time.monotonic()
+    recorder = Recorder(delay=lambda url: 0.2 if "busy" in url else 0.01)
+    fetch_all(busy + quick, recorder, max_workers=4, per_host=1, deadline=None,
+              on_done=lambda url, value: finished_at.setdefault(url, time.monotonic() - started))
+    assert recorder.max_per_host["busy.example"] == 1
+    assert all(finished_at[url] < 0.15 for url in quick)
+
+
+def test_deadline_returns_finished_work_and_cancels_the_rest():
+    urls = [f"https://slow.example/{i}" for i in range(4)] + ["https://fast.example/"]
+
+    def fetch_one(url, cancel_event):
+        if "fast" in url:
+            return "fast", 200
+        cancel_event.wait(5)
+        return "late", 200
+
+    started = time.monotonic()
+    values, stats = fetch_all(urls, fetch_one, max_workers=2, per_host=1, deadline=0.3)
+    assert time.monotonic() - started < 1
+    assert values == {"https://fast.example/": "fast"}
+    outcomes = {entry["url"]: entry["outcome"] for entry in stats}
+    assert outcomes["https://slow.example/0"] == "timeout"
+    assert outcomes["https://slow.example/1"] == "cancelled"
+
+
+def test_outcomes_and_on_done():
+    def fetch_one(url, cancel_event):
+        if url.endswith("missing"):
+            return None, 404
+        if url.endswith("binary"):
+            return None, 200
+        if url.endswith("broken"):
+            raise ValueError("bad response")
+        return "ok", 200
+
+    urls = ["https://a.example/page", "https://a.example/missing", "https://b.example/binary",
+            "https://c.example/broken", "", "https://a.example/page"]
+    done = {}
+    values, stats = fetch_all(urls, fetch_one, deadline=None, on_done=done.__setitem__)
+    assert values == {"https://a.example/page": "ok"}
+    assert [entry["outcome"] for entry in stats] == ["ok", "http_error", "skipped", "error"]
+    assert done == {"https://a.example/page": "ok", "https://a.example/missing": None,
+                    "https://b.example/binary": None, "https://c.example/broken": None}
+    assert summarize_fetch_stats(stats).startswith("error=1 http_error=1 ok=1 skipped=1")
+    assert fetch_all([], fetch_one) == ({}, [])
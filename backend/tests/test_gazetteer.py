@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from fakes import FakeLLM
+from tools import llm_client, llm_summarizer
+from tools.gazetteer import Gazetteer
+from tools.llm_summarizer import extract_chunk_tool_names
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    return Gazetteer(str(tmp_path / "gazetteer.json"), min_hits=3, min_confidence=0.8)
+
+
+def test_finds_known_tools_as_whole_words_in_first_seen_order(gazetteer):
+    text = "We moved from Flask to FastAPI, then added Redis and Docker. Redis again, and Reactive streams."
+    assert gazetteer.find(text) == ["Flask", "FastAPI", "Redis", "Docker"]
+    # Lowercase prose words are not tool names
+    assert gazetteer.find("we go to the express lane in rust") == []
+    assert gazetteer.find("Written in Rust and Go, deployed with Express.") == ["Rust", "Express"]
+
+
+def test_confidence_counts_unknown_mid_sentence_names(gazetteer):
+    confident = gazetteer.match("The stack uses React, Docker, Redis and PostgreSQL for everything.")
+    assert gazetteer.is_confident(confident)
+    unsure = gazetteer.match("The stack uses React, Docker, Redis, Zephyrly and Quuxbase for everything.")
+    assert unsure.unknown == ["Zephyrly", "Quuxbase"]
+    assert not gazetteer.is_confident(unsure)
+
+
+def test_learns_only_names_that_occur_in_the_text_and_persists_them(gazetteer):
+    assert gazetteer.learn(["Zephyrly", "Hallucinated Tool", "AI", "Z"], "Try Zephyrly today.") == 1
+    assert gazetteer.find("We tried Zephyrly.") == ["Zephyrly"]
+    gazetteer.save()
+    with open(gazetteer.path, encoding="utf-8") as f:
+        assert "zephyrly" in json.load(f)["tools"]
+    reloaded = Gazetteer(gazetteer.path)
+    assert reloaded.find("Zephyrly is fast") == ["Zephyrly"]
+    assert "hallucinated tool" not in reloaded._tools
+
+
+def test_confident_chunks_skip_the_llm_and_others_teach_the_gazetteer(monkeypatch, gazetteer):
+    monkeypatch.setattr(llm_summarizer, "TOOL_GAZETTEER", gazetteer)
+    if llm_client.LLM_CACHE is not None:
+        llm_client.LLM_CACHE.clear()
+    llm = FakeLLM(reply=lambda prompt: json.dumps(["Zephyrly", "Quuxbase", "React"]))
+    hits = []
+
+    known = "The stack uses React, Docker, Redis and PostgreSQL for everything."
+    assert extract_chunk_tool_names(known, llm, hits) == ["React", "Docker", "Redis", "PostgreSQL"]
+    assert llm.calls == 0 and hits == [known]
+
+    new = "The stack uses React, Zephyrly and Quuxbase for everything."
+    assert extract_chunk_tool_names(new, llm, hits) == ["Zephyrly", "Quuxbase", "React"]
+    assert llm.calls == 1
+    assert gazetteer.find(new) == ["React", "Zephyrly", "Quuxbase"]
@@ -0,0 +1,73 @@
+import asyncio
+import sys
+import threading
+
+import pytest
+
+from fakes import PageServer
+from tools import http_client
+
+
+@pytest.fixture
+def server():
+    server = PageServer({"/a": (200, {"Content-Type": "text/html"}, b"<p>a</p>"),
+                         "/b": (200, {"Content-Type": "text/html"}, b"<p>b</p>")})
+    yield server
+    server.close()
+
+
+def test_one_session_is_shared_by_every_thread():
+    http_client.close()
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(http_client.get_session())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(session) for session in sessions}) == 1
+    assert sessions[0] is http_client.get_session()
+
+
+def test_requests_to_one_host_reuse_a_kept_alive_connection(server):
+    for path in ("/a", "/b", "/a"):
+        assert http_client.get(server.url(path)).status_code == 200
+    assert len(server.requests) == 3
+    assert len(server.connections) == 1
+
+
+def test_close_drops_the_pool_and_a_new_session_is_built_on_demand(server):
+    first = http_client.get_session()
+    http_client.get(server.url("/a"))
+    http_client.close()
+    assert http_client.get_session() is not first
+    http_client.get(server.url("/a"))
+    assert len(server.connections) == 2
+
+
+def test_default_timeouts_are_applied(monkeypatch):
+    calls = []
+    monkeypatch.setattr(http_client.get_session(), "get", lambda url, **kwargs: calls.append(kwargs))
+    http_client.get("http://example.invalid/")
+    http_client.get("http://example.invalid/", timeout=3)
+    assert calls == [{"timeout": http_client.DEFAULT_TIMEOUT}, {"timeout": 3}]
+
+
+def test_post_uses_the_session_when_http2_is_off(monkeypatch, server):
+    monkeypatch.setattr(http_client, "HTTP_ENABLE_HTTP2", False)
+    assert http_client.get_http2_client() is None
+    calls = []
+    monkeypatch.setattr(http_client.get_session(), "post", lambda url, **kwargs: calls.append((url, kwargs)))
+    http_client.post("http://example.invalid/search", json={"query": "q"})
+    assert calls == [("http://example.invalid/search", {"timeout": http_client.DEFAULT_TIMEOUT,
+                                                         "json": {"query": "q"}})]
+
+
+def test_missing_http2_extra_is_detected_once(monkeypatch, capsys):
+    monkeypatch.setattr(http_client, "HTTP_ENABLE_HTTP2", True)
+    monkeypatch.setattr(http_client, "_http2_support", None)
+    # A None entry makes `import h2` raise ImportError
+    monkeypatch.setitem(sys.modules, "h2", None)
+    assert [http_client.get_http2_client() for _ in range(3)] == [None, None, None]
+    client = http_client.new_async_client()
+    asyncio.run(client.aclose())
+    assert capsys.readouterr().out.count("httpx[http2] is not installed") == 1
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tools.incremental import TIMESTAMP_FORMAT, merge_results, plan_refresh
+from tools.llm_summarizer import FAILED_SUMMARY
+from workflow import workflow
+
+# Tools each week's articles mention; the article URLs never repeat between weeks
+ARTICLES = {
+    "https://news.example/2026/week-41/ai-roundup": ["Rocket", "Comet", "Rocket"],
+    "https://blog.example/posts/top-tools-october": ["Rocket", "Nebula"],
+    "https://news.example/2026/week-42/whats-new": ["Rocket", "Comet"],
+    "https://another.example/2026/10/ai-dev-tools": ["Rocket", "Pulsar", "Pulsar"],
+}
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    summarized = []
+
+    def extract_tool_names(urls, stats=None, documents=None):
+        return [name for url in urls for name in ARTICLES[url]]
+
+    def summarize(names, search_agent=None, documents=None, on_summary=None):
+        summarized.append(list(names))
+        return [{"name": name, "summary": f"{name} summary"} for name in names]
+
+    monkeypatch.setattr(workflow, "extract_tool_names_llm", extract_tool_names)
+    monkeypatch.setattr(workflow, "summarize_top_tools", summarize)
+    return summarized
+
+
+def run_week(article_urls, previous):
+    state = {"article_urls": article_urls, "previous_results": previous}
+    state = workflow.make_extract_tools_llm_node(top_n=3)(state)
+    return workflow.make_llm_summarize_top_tools_node()(state)["summaries"]
+
+
+def a_week_earlier(results):
+    """Results as the next weekly run sees them: refreshed seven days before now."""
+    refreshed_at = (datetime.now() - timedelta(days=7)).strftime(TIMESTAMP_FORMAT)
+    return [{**entry, "refreshed_at": refreshed_at} for entry in results]
+
+
+def test_tool_found_in_different_articles_is_carried_over_to_next_week(offline):
+    week1 = run_week(list(ARTICLES)[:2], None)
+    assert [entry["name"] for entry in week1] == ["Rocket", "Comet", "Nebula"]
+
+    previous = a_week_earlier(week1)
+    week2 = run_week(list(ARTICLES)[2:], previous)
+
+    assert offline == [["Rocket", "Comet", "Nebula"], ["Pulsar"]]
+    assert [entry["name"] for entry in week2] == ["Rocket", "Pulsar", "Comet"]
+    assert week2[0] == previous[0]
+    assert week2[2] == previous[1]
+    assert week2[1]["summary"] == "Pulsar summary"
+
+
+def test_entries_older_than_the_trust_window_are_refreshed():
+    now = datetime(2026, 10, 18, 12, 0, 0)
+    previous = [
+        {"name": "Rocket", "summary": "old", "refreshed_at": (now - timedelta(days=29)).strftime(TIMESTAMP_FORMAT)},
+        {"name": "comet ", "summary": "recent", "refreshed_at": (now - timedelta(days=27)).strftime(TIMESTAMP_FORMAT)},
+    ]
+    carried, refresh = plan_refresh(["Rocket", "Comet"], previous, trust_days=28, now=now)
+    assert refresh == ["Rocket"]
+    assert carried == {"comet": previous[1]}
+
+
+def test_failed_or_unstamped_entries_are_not_reused():
+    now = datetime(2026, 10, 18)
+    stamp = now.strftime(TIMESTAMP_FORMAT)
+    previous = [
+        {"name": "Rocket", "summary": FAILED_SUMMARY, "refreshed_at": stamp},
+        {"name": "Comet", "summary": "fine"},
+        {"name": "Nebula", "summary": "", "refreshed_at": stamp},
+    ]
+    carried, refresh = plan_refresh(["Rocket", "Comet", "Nebula"], previous, now=now)
+    assert carried == {}
+    assert refresh == ["Rocket", "Comet", "Nebula"]
+
+
+def test_merge_keeps_ranking_order_and_stamps_only_new_summaries():
+    now = datetime(2026, 10, 18, 9, 30, 0)
+    carried = {"comet": {"name": "Comet", "summary": "kept", "refreshed_at": "2026-10-11 09:00:00"}}
+    fresh = [{"name": "Rocket", "summary": "new"}]
+    results = merge_results(["Rocket", "Comet", "Nebula"], carried, fresh, now=now)
+    assert results == [
+        {"name": "Rocket", "summary": "new", "refreshed_at": "2026-10-18 09:30:00"},
+        carried["comet"],
+    ]
@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from workflow.coordinator import RunCoordinator, RunStore
+
+
+@pytest.fixture(scope="module")
+def main():
+    # The scheduler only runs inside the app's lifespan, which TestClient starts in a `with` block
+    from fastAPI import main
+    return main
+
+
+@pytest.fixture
+def api(main, monkeypatch, tmp_path):
+    release = threading.Event()
+
+    def run_fn(progress, full=False):
+        progress({"type": "node", "node": "search_articles", "status": "completed"})
+        progress({"type": "summary", "summary": {"name": "Rocket", "summary": "Rocket summary"}})
+        if not release.wait(5):
+            raise RuntimeError("not released")
+    monkeypatch.setattr(main, "coordinator", RunCoordinator(run_fn, store=RunStore(str(tmp_path / "runs.sqlite3"))))
+    monkeypatch.setattr(main, "SSE_POLL_INTERVAL", 0.01)
+    return TestClient(main.app), release
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_jobs_start_in_the_background_and_report_progress(api, main):
+    client, release = api
+    created = client.post("/jobs")
+    assert created.status_code == 202
+    job_id = created.json()["job_id"]
+    joined = client.post("/jobs?full=true").json()
+    assert joined == {"job_id": job_id, "status": "running", "joined_existing_run": True}
+
+    run = main.coordinator.get(job_id)
+    deadline = time.monotonic() + 5
+    while run.as_dict()["events"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    status = client.get(f"/jobs/{job_id}").json()
+    assert status["status"] == "running"
+    assert status["nodes"] == {"search_articles": "completed"}
+    assert status["partial_results"] == [{"name": "Rocket", "summary": "Rocket summary"}]
+
+    release.set()
+    events = parse_events(client.get(f"/jobs/{job_id}/events").text)
+    assert [(seq, kind) for seq, kind, _ in events] == [(0, "node"), (1, "summary"), (2, "status")]
+    assert events[-1][2]["status"] == "completed"
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "completed"
+
+
+def test_event_stream_resumes_after_last_event_id(api, main):
+    client, release = api
+    job_id = client.post("/jobs").json()["job_id"]
+    release.set()
+    assert main.coordinator.get(job_id).wait(5)
+    events = parse_events(client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": "0"}).text)
+    assert [seq for seq, _, _ in events] == [1, 2]
+
+
+def test_jobs_of_other_workers_are_served_from_the_store(api, main):
+    client, release = api
+    job_id = client.post("/jobs").json()["job_id"]
+    release.set()
+    assert main.coordinator.get(job_id).wait(5)
+    # Another worker's coordinator: nothing in memory, same store
+    main.coordinator = RunCoordinator(lambda progress: None, store=main.coordinator.store)
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "completed"
+    assert len(parse_events(client.get(f"/jobs/{job_id}/events").text)) == 3
+
+
+def test_unknown_jobs_are_404(api):
+    client, _ = api
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.get("/jobs/nope/events").status_code == 404
+
+
+def test_lifespan_runs_the_scheduler_and_releases_the_lease_on_shutdown(main):
+    for _ in range(2):  # e.g. a server restarted in the same process
+        with TestClient(main.app):
+            scheduler = main.scheduler
+            assert scheduler.running
+            deadline = time.monotonic() + 5
+            while not main.leader.is_leader and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert main.leader.is_leader
+        assert not scheduler.running
+        assert not main.leader.is_leader
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+
+import langchain_openai
+import pytest
+
+from fakes import FakeLLM
+from tools import llm_client
+from tools.cache import SQLiteCache
+from tools.llm_client import (
+    ainvoke_cached, azure_base_endpoint, get_llm, invoke_cached, response_cache_key, store_response
+)
+
+
+class RecordingChatModel:
+    """AzureChatOpenAI stand-in that records how it was built."""
+    built = []
+
+    def __init__(self, **kwargs):
+        time.sleep(0.01)
+        self.kwargs = kwargs
+        RecordingChatModel.built.append(self)
+
+
+@pytest.fixture
+def chat_model(monkeypatch):
+    RecordingChatModel.built = []
+    monkeypatch.setattr(langchain_openai, "AzureChatOpenAI", RecordingChatModel)
+    llm_client.close()
+    yield RecordingChatModel
+    llm_client.close()
+
+
+def test_clients_are_built_once_per_profile_even_under_concurrency(chat_model):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_llm("summarization"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(llm) for llm in results}) == 1
+    assert len(chat_model.built) == 1
+
+    extraction = get_llm("extraction")
+    longer = get_llm("extraction", max_tokens=2048)
+    assert extraction is not results[0] and longer is not extraction
+    assert get_llm("extraction", max_tokens=2048) is longer
+    assert longer.kwargs["max_tokens"] == 2048
+    assert len(chat_model.built) == 3
+
+
+def test_every_client_shares_one_pooled_http_client(chat_model):
+    get_llm("extraction")
+    get_llm("summarization")
+    http_clients = {id(llm.kwargs["http_client"]) for llm in chat_model.built}
+    assert len(http_clients) == 1
+    llm_client.close()
+    assert get_llm("extraction").kwargs["http_client"] is not chat_model.built[0].kwargs["http_client"]
+
+
+def test_profiles_set_their_own_sampling_parameters(chat_model):
+    extraction = get_llm("extraction")
+    summarization = get_llm("summarization")
+    assert extraction.kwargs["temperature"] == llm_client.LLM_PROFILES["extraction"]["temperature"]
+    assert summarization.kwargs["temperature"] == llm_client.LLM_PROFILES["summarization"]["temperature"]
+
+
+def test_full_chat_completions_url_is_reduced_to_the_resource():
+    url = "https://res.openai.azure.com/openai/deployments/gpt/chat/completions?api-version=2024-02-01"
+    assert azure_base_endpoint(url) == "https://res.openai.azure.com/"
+    assert azure_base_endpoint("https://res.openai.azure.com") == "https://res.openai.azure.com/"
+
+
+def test_cache_key_covers_deployment_and_sampling_but_not_whitespace():
+    base = FakeLLM(deployment_name="gpt", temperature=0.2)
+    key = response_cache_key(base, "Summarize\n  Rocket")
+    assert response_cache_key(FakeLLM(deployment_name="gpt", temperature=0.2), "Summarize Rocket ") == key
+    assert response_cache_key(FakeLLM(deployment_name="gpt-2", temperature=0.2), "Summarize Rocket") != key
+    assert response_cache_key(FakeLLM(deployment_name="gpt", temperature=0.7), "Summarize Rocket") != key
+    assert response_cache_key(FakeLLM(deployment_name="gpt", temperature=0.2, max_tokens=64),
+                              "Summarize Rocket") != key
+    assert response_cache_key(base, "Summarize Comet") != key
+
+
+def test_identical_prompts_are_answered_from_the_cache(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "llm.sqlite3"), "llm_responses")
+    llm = FakeLLM(reply=lambda prompt: json.dumps(["Rocket"]))
+    assert invoke_cached(llm, "names in: Rocket", "tool_names", json.loads, cache=cache) == ["Rocket"]
+    assert invoke_cached(llm, "names in:  Rocket", "tool_names", json.loads, cache=cache) == ["Rocket"]
+    assert llm.calls == 1
+    assert cache.stats()["tool_names"] == {"hits": 1, "misses": 1}
+    assert asyncio.run(ainvoke_cached(llm, "names in: Rocket", "tool_names", json.loads, cache=cache)) == ["Rocket"]
+    assert llm.calls == 1
+
+
+def test_replies_that_do_not_parse_are_never_cached(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "llm.sqlite3"), "llm_responses")
+    llm = FakeLLM(reply=lambda prompt: "sorry, no JSON today")
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            invoke_cached(llm, "names in: Rocket", "tool_names", json.loads, cache=cache)
+    assert llm.calls == 2
+    # A stored reply the parser now rejects is skipped, and the fresh reply replaces it
+    store_response(llm, "prompt", "summary", "garbage", cache=cache)
+    llm.reply = lambda prompt: '{"summary": "ok"}'
+    assert invoke_cached(llm, "prompt", "summary", json.loads, cache=cache) == {"summary": "ok"}
+    assert invoke_cached(llm, "prompt", "summary", json.loads, cache=cache) == {"summary": "ok"}
+    assert llm.calls == 3
@@ -0,0 +1,143 @@
+import asyncio
+import json
+
+import pytest
+
+from fakes import FakeLLM, FakeSearchAgent, _batch_records, tool_info
+from tools import llm_client, llm_summarizer
+from tools.llm_summarizer import asummarize_top_tools, make_summary_batches, summarize_top_tools
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(llm_summarizer, "extract_tool_infos",
+                        lambda results, documents=None: [tool_info(result) for result in results])
+    monkeypatch.setattr(llm_summarizer, "extract_tool_info", tool_info)
+
+    async def atool_info(result, client, documents=None):
+        return tool_info(result)
+    monkeypatch.setattr(llm_summarizer, "aextract_tool_info", atool_info)
+    monkeypatch.setattr(llm_summarizer, "LLM_SUMMARY_MODE", "batch")
+    if llm_client.LLM_CACHE is not None:
+        llm_client.LLM_CACHE.clear()
+
+
+def test_batch_mode_reports_every_summary_including_cached_ones():
+    tools = ["Rocket", "Comet", "Nebula"]
+    llm = FakeLLM()
+    reported = []
+    summaries = summarize_top_tools(tools, search_agent=FakeSearchAgent(), llm=llm, on_summary=reported.append)
+    assert [summary["summary"] for summary in summaries] == [f"{tool} summary" for tool in tools]
+    assert sorted(r["name"] for r in reported) == sorted(tools)
+    assert llm.calls == 1
+
+    if llm_client.LLM_CACHE is None:
+        pytest.skip("LLM cache disabled")
+    # Second run: every summary comes from the per-tool cache and must still be reported
+    llm = FakeLLM()
+    reported = []
+    again = summarize_top_tools(tools, search_agent=FakeSearchAgent(), llm=llm, on_summary=reported.append)
+    assert again == summaries
+    assert llm.calls == 0
+    assert sorted(r["name"] for r in reported) == sorted(tools)
+
+
+def test_tools_missing_from_the_batch_reply_are_summarized_singly():
+    llm = FakeLLM(skip={"Comet"})
+    reported = []
+    summaries = summarize_top_tools(["Rocket", "Comet", "Ghost"], search_agent=FakeSearchAgent(missing={"Ghost"}),
+                                    llm=llm, on_summary=reported.append)
+    assert [(s["name"], s["summary"]) for s in summaries] == [("Rocket", "Rocket summary"),
+                                                              ("Comet", "single summary")]
+    assert llm.calls == 2
+    assert sorted(r["name"] for r in reported) == ["Comet", "Rocket"]
+
+
+def test_failed_summaries_are_not_reported():
+    def broken(prompt):
+        return "not json"
+
+    reported = []
+    summaries = summarize_top_tools(["Rocket"], search_agent=FakeSearchAgent(), llm=FakeLLM(reply=broken),
+                                    on_summary=reported.append)
+    assert summaries[0]["summary"] == llm_summarizer.FAILED_SUMMARY
+    assert reported == []
+
+
+def test_summary_batches_respect_size_and_budget():
+    items = [{"key": str(i), "name": f"tool {i}", "description": "word " * 200} for i in range(10)]
+    batches = make_summary_batches(items, budget_tokens=700, max_size=3)
+    assert [item for batch in batches for item in batch] == items
+    assert all(1 <= len(batch) <= 3 for batch in batches)
+    assert len(make_summary_batches(items, budget_tokens=10, max_size=8)) == len(items)
+
+
+class SlowSearchAgent(FakeSearchAgent):
+    """Async searches take a while; records the peak number running at once."""
+
+    def __init__(self, missing=()):
+        super().__init__(missing)
+        self.running = 0
+        self.peak = 0
+
+    async def asearch_tool(self, tool_name, client):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return self.search_tool(tool_name)
+
+
+def test_async_chains_run_concurrently_up_to_the_cap():
+    tools = [f"Tool{i}" for i in range(10)]
+    agent = SlowSearchAgent(missing={"Tool3"})
+    reported = []
+    summaries = asyncio.run(asummarize_top_tools(tools, search_agent=agent, llm=FakeLLM(), concurrency=4,
+                                                 on_summary=reported.append))
+    assert agent.peak == 4
+    # Input order is kept and tools without search results are left out
+    assert [s["name"] for s in summaries] == [tool for tool in tools if tool != "Tool3"]
+    assert sorted(r["name"] for r in reported) == sorted(s["name"] for s in summaries)
+
+
+def test_async_mode_runs_from_sync_code_and_from_inside_an_event_loop(monkeypatch):
+    monkeypatch.setattr(llm_summarizer, "LLM_SUMMARY_MODE", "async")
+    expected = ["Rocket", "Comet"]
+    summaries = summarize_top_tools(expected, search_agent=SlowSearchAgent(), llm=FakeLLM())
+    assert [s["name"] for s in summaries] == expected
+
+    async def endpoint():
+        # e.g. an async FastAPI handler calling the sync API
+        return summarize_top_tools(expected, search_agent=SlowSearchAgent(), llm=FakeLLM())
+    assert [s["name"] for s in asyncio.run(endpoint())] == expected
+
+
+def titled_tool_info(result, *args, **kwargs):
+    """extract_tool_info as on real pages: the name is the search result's page title."""
+    return {**tool_info(result), "name": f"{result['name']} 2.0 launched – Blog"}
+
+
+class KeylessBatchLLM(FakeLLM):
+    """Batch replies that identify tools by name only, as some models do."""
+
+    def _content(self, prompt):
+        batch = _batch_records(prompt)
+        if batch is None:
+            return super()._content(prompt)
+        with self._lock:
+            self.prompts.append(prompt)
+        return json.dumps([{"name": item["name"], "summary": f"{item['name']} summary"} for item in batch])
+
+
+@pytest.mark.parametrize("llm_class", [FakeLLM, KeylessBatchLLM])
+def test_batches_summarize_tools_by_name_not_by_page_title(monkeypatch, llm_class):
+    monkeypatch.setattr(llm_summarizer, "extract_tool_infos",
+                        lambda results, documents=None: [titled_tool_info(result) for result in results])
+    tools = ["Rocket", "Comet"]
+    llm = llm_class()
+    summaries = summarize_top_tools(tools, search_agent=FakeSearchAgent(), llm=llm)
+    assert [(s["name"], s["summary"]) for s in summaries] == [("Rocket", "Rocket summary"),
+                                                              ("Comet", "Comet summary")]
+    assert llm.calls == 1
+    batch = _batch_records(llm.prompts[0])
+    assert [item["name"] for item in batch] == tools
@@ -0,0 +1,96 @@
+import asyncio
+
+from config import METADATA_PRICING_SCAN_CHARS
+from fakes import PageServer
+from tools import metadata
+from tools.cache import SQLiteCache
+from tools.http_client import CHUNK_SIZE, FetchedPage
+from tools.metadata import PageMetadata, aload_metadata, load_metadata, parse_metadata
+
+HEAD = """<html><head><title> Rocket &amp; Co </title>
+<meta name="description" content=" Fast monorepo builds. ">
+<script>var price = 10;</script></head>"""
+
+
+def test_reads_title_and_description_from_head():
+    page = parse_metadata(HEAD + "<body><p>Build faster.</p></body></html>")
+    assert page == PageMetadata("Rocket & Co", "Fast monorepo builds.", False)
+
+
+def test_pricing_words_in_visible_text():
+    assert parse_metadata(HEAD + "<body><a href='/pricing'>See plans</a><p>Start a free trial</p></body>").has_pricing
+    assert parse_metadata(HEAD + "<body><p>Only <b>$9</b> a month</p></body>").has_pricing
+
+
+def test_scripts_styles_and_comments_do_not_count_as_pricing():
+    body = """<body>
+<script src="/jquery.js"></script>
+<script>$(function () { $(".price-tag").hide(); var free = true; });</script>
+<style>.pricing { display: none }</style>
+<noscript><p>Enable JavaScript for pricing.</p></noscript>
+<!-- subscription form goes here -->
+<p>Rocket builds your monorepo in parallel.</p>
+</body></html>"""
+    assert not parse_metadata(HEAD + body).has_pricing
+
+
+def test_script_cut_off_by_the_scan_window_is_ignored():
+    body = "<body><p>Rocket builds monorepos.</p><script>$(init);" + "var x = 1;" * 100 + "</script><p>free</p>"
+    html = HEAD + body
+    assert not parse_metadata(html, pricing_scan_chars=200).has_pricing
+    assert parse_metadata(html, pricing_scan_chars=len(html)).has_pricing
+
+
+def test_load_metadata_caches_pages(tmp_path, monkeypatch):
+    calls = []
+
+    def fetch_html(url, **kwargs):
+        calls.append(url)
+        return FetchedPage(url, 200, "text/html", HEAD + "<body>Pricing</body>", {})
+
+    monkeypatch.setattr(metadata.http_client, "fetch_html", fetch_html)
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    first = load_metadata("https://rocket.dev/?utm_source=x", cache=cache)
+    second = load_metadata("https://www.rocket.dev/", cache=cache)
+    assert first == second == (PageMetadata("Rocket & Co", "Fast monorepo builds.", True), 200)
+    assert len(calls) == 1
+
+
+def test_head_window_stops_after_the_pricing_scan_window():
+    window = metadata._HeadWindow(pricing_scan_chars=100)
+    # The end of the head is split across two pieces
+    assert not window("<html><head><title>Rocket</title></he")
+    assert not window("ad><body>" + "x" * 50)
+    assert window.head_end == len("<html><head><title>Rocket</title></head>")
+    assert window("x" * 60)
+
+
+def test_load_metadata_downloads_only_the_head_and_the_scan_window(monkeypatch):
+    body = b"<body><p>Start a free trial.</p>" + b"<p>Filler text.</p>" * 50_000 + b"</body></html>"
+    server = PageServer({"/": (200, {"Content-Type": "text/html"}, HEAD.encode() + body)})
+    pages = []
+    fetch_html = metadata.http_client.fetch_html
+
+    def recording(url, **kwargs):
+        pages.append(fetch_html(url, **kwargs))
+        return pages[-1]
+    monkeypatch.setattr(metadata.http_client, "fetch_html", recording)
+    afetch_html = metadata.http_client.afetch_html
+
+    async def arecording(client, url, **kwargs):
+        pages.append(await afetch_html(client, url, **kwargs))
+        return pages[-1]
+    monkeypatch.setattr(metadata.http_client, "afetch_html", arecording)
+
+    async def aload():
+        async with metadata.http_client.new_async_client() as client:
+            return await aload_metadata(server.url("/"), client, cache=None)
+    try:
+        loaded = load_metadata(server.url("/"), cache=None)
+        aloaded = asyncio.run(aload())
+    finally:
+        server.close()
+    assert loaded == aloaded == (PageMetadata("Rocket & Co", "Fast monorepo builds.", True), 200)
+    for page in pages:
+        assert page.truncated
+        assert len(page.text) < len(HEAD) + METADATA_PRICING_SCAN_CHARS + 2 * CHUNK_SIZE
@@ -0,0 +1,87 @@
+import pytest
+
+from fakes import PageServer
+from tools import page_cache
+from tools.page_cache import CachedPage, PageCache, content_hash, fetch_page_text
+
+ARTICLE = b"<html><body><article><h1>Launch</h1><p>Rocket is a new developer tool for testing.</p></article></body></html>"
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    calls = []
+    extract = page_cache.extract_text
+
+    def counting(html, engine):
+        calls.append(engine)
+        return extract(html, engine)
+    monkeypatch.setattr(page_cache, "extract_text", counting)
+    return calls
+
+
+@pytest.fixture
+def server():
+    def with_etag(headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"Content-Type": "text/html", "ETag": '"v1"'}, ARTICLE
+    server = PageServer({"/etag": (200, {}, with_etag),
+                         "/plain": (200, {"Content-Type": "text/html"}, ARTICLE)})
+    yield server
+    server.close()
+
+
+def test_unchanged_page_is_revalidated_with_a_conditional_get(tmp_path, server, extractions):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"))
+    text, page = fetch_page_text(server.url("/etag"), engine="main", cache=cache)
+    again, page_again = fetch_page_text(server.url("/etag"), engine="main", cache=cache)
+
+    assert "Rocket is a new developer tool" in text
+    assert again == text
+    assert page_again.status == 200 and page_again.text == page.text
+    assert server.requests[1][1].get("If-None-Match") == '"v1"'
+    assert extractions == ["main"]
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_same_content_without_validators_reuses_the_extracted_text(tmp_path, server, extractions):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"))
+    first, _ = fetch_page_text(server.url("/plain"), engine="main", cache=cache)
+    second, _ = fetch_page_text(server.url("/plain?utm_source=feed"), engine="main", cache=cache)
+    assert second == first
+    assert extractions == ["main"]
+    assert cache.stats()["unchanged"] == 1
+
+    # A different engine needs its own extraction; changed content invalidates it
+    fetch_page_text(server.url("/plain"), engine="soup", cache=cache)
+    server.pages["/plain"] = (200, {"Content-Type": "text/html"}, ARTICLE.replace(b"Rocket", b"Comet"))
+    changed, _ = fetch_page_text(server.url("/plain"), engine="soup", cache=cache)
+    assert "Comet" in changed
+    assert extractions == ["main", "soup", "soup"]
+
+
+def page(body: str) -> CachedPage:
+    return CachedPage("https://example.com/", "text/html", body, None, None, content_hash(body), None, None, False)
+
+
+def test_least_recently_used_pages_are_evicted_over_the_byte_cap(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"), max_bytes=250)
+    cache.put("https://a.example/", page("a" * 100))
+    cache.put("https://b.example/", page("b" * 100))
+    cache.touch("https://a.example/")
+    cache.put("https://c.example/", page("c" * 100))
+    assert cache.get("https://b.example/") is None
+    assert cache.get("https://a.example/") is not None
+    assert cache.get("https://c.example/") is not None
+    cache.put("https://huge.example/", page("h" * 1000))
+    assert cache.get("https://huge.example/") is None
+    assert cache.stats()["bytes"] == 200
+
+
+def test_text_is_only_attached_to_the_content_it_came_from(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"))
+    cache.put("https://a.example/", page("<p>one</p>"))
+    cache.set_text("https://a.example/", content_hash("<p>two</p>"), "main", "two")
+    assert cache.get("https://a.example/").text is None
+    cache.set_text("https://a.example/", content_hash("<p>one</p>"), "main", "one")
+    assert cache.get("https://a.example/").text == "one"
@@ -0,0 +1,109 @@
+import json
+import random
+import re
+import threading
+from collections import Counter
+
+import pytest
+
+from fakes import FakeLLM
+from tools import llm_client, llm_summarizer
+from tools.llm_summarizer import get_llm_tool_names_from_articles
+from workflow import pipeline
+from workflow.pipeline import RankTracker, run_pipelined
+
+TOOLS = ["Rocket", "Comet", "Nebula", "Pulsar", "Quasar", "Meteor", "Aurora", "Zenith", "Orbit", "Photon"]
+
+
+def test_names_called_certain_always_make_the_final_top_n():
+    rng = random.Random(5)
+    for _ in range(300):
+        top_n = rng.randint(1, 5)
+        chunks = [rng.sample(TOOLS, rng.randint(0, 4)) for _ in range(rng.randint(1, 12))]
+        final = RankTracker(top_n)
+        for names in chunks:
+            final.add(names)
+        tracker = RankTracker(top_n)
+        for index, names in enumerate(chunks):
+            tracker.add(names)
+            assert set(tracker.certain(len(chunks) - index - 1)) <= set(final.top())
+        assert set(tracker.certain(0)) == set(final.top())
+        merged = [name for names in chunks for name in dict.fromkeys(names)]
+        assert final.top() == [name for name, _ in Counter(merged).most_common(top_n)]
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    rng = random.Random(9)
+    articles = {}
+    for index in range(6):
+        lines = [f"{rng.choice(TOOLS)} was released." if rng.random() < 0.3 else "Unrelated filler text here."
+                 for _ in range(rng.randint(20, 200))]
+        articles[f"https://news{index}.example/post"] = "\n".join(lines)
+
+    def reply(prompt):
+        return json.dumps([name for name in TOOLS if re.search(rf"\b{name}\b", prompt)])
+    llm = FakeLLM(reply=reply)
+    summarized = []
+
+    def search_and_summarize(name, search_agent, llm, documents):
+        summarized.append((name,))
+        return {"name": name, "summary": f"{name} summary"}
+
+    def summarize_top_tools(names, search_agent, documents=None, on_summary=None):
+        summarized.append(tuple(names))
+        return [{"name": name, "summary": f"{name} summary"} for name in names]
+
+    monkeypatch.setattr(pipeline, "fetch_article_text", lambda url, cancel, documents=None: (articles[url], 200))
+    monkeypatch.setattr(pipeline, "get_llm", lambda role: llm)
+    monkeypatch.setattr(llm_summarizer, "get_llm", lambda role: llm)
+    monkeypatch.setattr(pipeline, "search_and_summarize", search_and_summarize)
+    monkeypatch.setattr(pipeline, "summarize_top_tools", summarize_top_tools)
+    monkeypatch.setattr(pipeline, "SearchAgent", lambda retry_budget=None: None)
+    monkeypatch.setattr(llm_summarizer, "TOOL_GAZETTEER", None)
+    monkeypatch.setattr(pipeline, "LLM_EXTRACTION_CHUNK_TOKENS", 200)
+    if llm_client.LLM_CACHE is not None:
+        llm_client.LLM_CACHE.clear()
+    return articles, summarized
+
+
+@pytest.mark.parametrize("mode", ["batch", "single"])
+def test_pipelined_run_picks_the_same_tools_as_the_sequential_one(offline, monkeypatch, mode):
+    monkeypatch.setattr(pipeline, "LLM_SUMMARY_MODE", mode)
+    articles, summarized = offline
+    state = {"article_urls": list(articles), "previous_results": None}
+    summaries = run_pipelined(state, top_n_tools=4)
+
+    names = get_llm_tool_names_from_articles(list(articles.values()), chunk_tokens=200)
+    expected = [name for name, _ in Counter(names).most_common(4)]
+    assert state["top_tools"] == expected
+    assert [summary["name"] for summary in summaries] == expected
+    assert sorted(name for group in summarized for name in group) == sorted(expected)
+    if mode == "single":
+        assert all(len(group) == 1 for group in summarized)
+
+
+def test_summarization_starts_while_articles_are_still_being_fetched(offline, monkeypatch):
+    articles, summarized = offline
+    urls = [f"https://news{index}.example/post" for index in range(9)]
+    started = threading.Event()
+    overlapped = []
+
+    def fetch(url, cancel, documents=None):
+        if url == urls[-1]:
+            # The last article only arrives once a summary has been asked for
+            overlapped.append(started.wait(5))
+        return "Rocket was released.\n" * 40, 200
+
+    def summarize(names, search_agent, documents=None, on_summary=None):
+        started.set()
+        return [{"name": name, "summary": f"{name} summary"} for name in names]
+    monkeypatch.setattr(pipeline, "fetch_article_text", fetch)
+    monkeypatch.setattr(pipeline, "search_and_summarize", lambda name, *args: summarize([name], None)[0])
+    monkeypatch.setattr(pipeline, "summarize_top_tools", summarize)
+    monkeypatch.setattr(pipeline, "LLM_EXTRACTION_MAX_ARTICLE_TOKENS", 200)
+
+    state = {"article_urls": urls, "previous_results": None}
+    summaries = run_pipelined(state, top_n_tools=1)
+    assert overlapped == [True]
+    assert [summary["name"] for summary in summaries] == ["Rocket"]
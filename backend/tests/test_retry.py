@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from fakes import FakeLangSearch, FakeResponse
+from tools import http_client, retry
+from tools.rate_limiter import TokenBucket
+from tools.retry import RetryBudget, arequest_with_retry, backoff_delay, parse_retry_after, request_with_retry
+from tools.search_agent import SearchAgent
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waited = []
+    monkeypatch.setattr(retry.time, "sleep", waited.append)
+    return waited
+
+
+def responses(*statuses):
+    replies = iter([FakeResponse(status, {"status": status}) for status in statuses])
+    return lambda: next(replies)
+
+
+def test_retries_rate_limited_requests_until_one_succeeds(sleeps):
+    budget = RetryBudget(10)
+    response = request_with_retry(responses(429, 503, 200), budget, max_attempts=5, base_delay=1, max_delay=8)
+    assert response.status_code == 200
+    assert len(sleeps) == 2
+    assert budget.stats()["retries"] == 2
+    assert budget.stats()["retry_wait_seconds"] == pytest.approx(sum(sleeps), abs=0.01)
+
+
+def test_non_retryable_statuses_are_returned_at_once(sleeps):
+    response = request_with_retry(responses(401, 200), RetryBudget(10), max_attempts=5, base_delay=1, max_delay=8)
+    assert response.status_code == 401
+    assert sleeps == []
+
+
+def test_attempts_and_the_shared_budget_bound_the_retries(sleeps):
+    budget = RetryBudget(3)
+    assert request_with_retry(responses(429, 429, 429), budget, 3, 1, 8).status_code == 429
+    assert budget.retries == 2
+    # The budget is shared: the next request may retry only once more
+    assert request_with_retry(responses(429, 429, 200), budget, 3, 1, 8).status_code == 429
+    assert budget.stats()["retries"] == 3
+    assert budget.stats()["budget_exhausted"] == 1
+
+
+def test_async_variant_retries_without_blocking(monkeypatch):
+    waited = []
+
+    async def fake_sleep(seconds):
+        waited.append(seconds)
+    monkeypatch.setattr(retry.asyncio, "sleep", fake_sleep)
+    replies = iter([FakeResponse(429, headers={"Retry-After": "2"}), FakeResponse(200, {})])
+
+    async def send():
+        return next(replies)
+    response = asyncio.run(arequest_with_retry(send, RetryBudget(5), 3, base_delay=0.5, max_delay=10))
+    assert response.status_code == 200
+    assert 2 <= waited[0] <= 2.5
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(" -3 ") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(later) <= 30
+
+
+def test_backoff_is_capped_and_honours_retry_after():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 1, 8) <= 8
+    # Retry-After is a floor, never shortened to fit the cap
+    assert 5 <= backoff_delay(0, 1, 8, retry_after=5) <= 6
+    assert 8 <= backoff_delay(0, 1, 8, retry_after=8) <= 9
+    assert backoff_delay(0, 1, 8, retry_after=60) is None
+
+
+def test_gives_up_when_retry_after_is_longer_than_we_wait(sleeps):
+    budget = RetryBudget(10)
+    replies = iter([FakeResponse(429, headers={"Retry-After": "60"}), FakeResponse(200, {})])
+    response = request_with_retry(lambda: next(replies), budget, max_attempts=5, base_delay=1, max_delay=8)
+    assert response.status_code == 429
+    assert sleeps == []
+    assert budget.retries == 0
+
+
+def test_strategic_query_survives_a_rate_limited_reply(monkeypatch, sleeps):
+    queries = SearchAgent.STRATEGIC_QUERIES
+    langsearch = FakeLangSearch(queries, statuses=[429])
+    monkeypatch.setattr(http_client, "post", langsearch.post)
+    agent = SearchAgent(rate_limiter=TokenBucket(1000, 100), cache=None)
+    results = agent._run_strategic_query(queries[0], datetime.now() - timedelta(days=7))
+    assert len(results) == langsearch.per_query
+    assert len(langsearch.requests) == 2
+    assert agent.retry_budget.retries == 1
@@ -0,0 +1,81 @@
+import random
+
+from tools.scoring import (
+    CONTENT_SCORER, DOMAIN_AUTHORITY_SCORES, HIGH_VALUE_KEYWORDS, MIN_CONTENT_LENGTH, NEGATIVE_PENALTY,
+    NEGATIVE_TERMS, QUALITY_FRESHNESS_BONUS, QUALITY_FRESHNESS_TERMS, RELEVANCE_FRESHNESS_BONUS,
+    RELEVANCE_FRESHNESS_TERMS, RELEVANCE_INDICATORS, SHORT_CONTENT_PENALTY, TRUSTED_DOMAINS, TermMatcher
+)
+
+
+def reference_score(result):
+    """The original loop-per-table scoring the compiled scorer replaced."""
+    snippet = (result.get('snippet', '') + ' ' + result.get('name', '')).lower()
+    url = result.get('url', '').lower()
+    quality = 0
+    for domain, score in TRUSTED_DOMAINS.items():
+        if domain in url:
+            quality += score
+            break
+    for term, score in RELEVANCE_INDICATORS.items():
+        if term in snippet:
+            quality += score
+    if any(term in snippet for term in QUALITY_FRESHNESS_TERMS):
+        quality += QUALITY_FRESHNESS_BONUS
+    if any(term in snippet for term in NEGATIVE_TERMS):
+        quality -= NEGATIVE_PENALTY
+    if len(snippet.strip()) < MIN_CONTENT_LENGTH:
+        quality -= SHORT_CONTENT_PENALTY
+
+    relevance = 0.0
+    for term, score in HIGH_VALUE_KEYWORDS.items():
+        if term in snippet:
+            relevance += score
+    for domain, score in DOMAIN_AUTHORITY_SCORES.items():
+        if domain in url:
+            relevance += score
+            break
+    if any(term in snippet for term in RELEVANCE_FRESHNESS_TERMS):
+        relevance += RELEVANCE_FRESHNESS_BONUS
+    return quality, relevance
+
+
+def test_term_matcher_matches_substring_semantics():
+    terms = ['ai', 'ai tool', 'api', 'rest api', 'go', 'google.com', 'new', 'news', 'just', 'ust']
+    matcher = TermMatcher(terms)
+    rng = random.Random(7)
+    alphabet = 'aipgoltsrenwuj .'
+    for _ in range(2000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert matcher.find(text) == {term for term in terms if term in text}, text
+
+
+def test_term_matcher_overlapping_terms():
+    matcher = TermMatcher(['rest api', 'api', 'ai tool', 'tool'])
+    assert matcher.find('a rest api and an ai tool') == {'rest api', 'api', 'ai tool', 'tool'}
+    assert TermMatcher([]).find('anything') == set()
+
+
+def test_scorer_agrees_with_reference():
+    vocabulary = (list(RELEVANCE_INDICATORS) + list(HIGH_VALUE_KEYWORDS) + QUALITY_FRESHNESS_TERMS
+                  + NEGATIVE_TERMS + ['the', 'tools', 'week', 'x'])
+    domains = list(TRUSTED_DOMAINS) + ['example.org', 'blog.example.com']
+    rng = random.Random(11)
+    for _ in range(500):
+        result = {
+            'name': ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 4))).title(),
+            'snippet': ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 12))),
+            'url': f"https://{rng.choice(domains)}/{rng.choice(domains)}" if rng.random() < 0.2
+                   else f"https://{rng.choice(domains)}/post",
+        }
+        score = CONTENT_SCORER.score(result)
+        quality, relevance = reference_score(result)
+        assert score.quality == quality
+        assert score.relevance == relevance
+
+
+def test_score_batch_keeps_order():
+    results = [{'snippet': 'A new developer API launched today', 'url': 'https://openai.com/x'},
+               {'snippet': 'casino', 'url': 'https://example.org'}]
+    scores = CONTENT_SCORER.score_batch(results)
+    assert [s.quality for s in scores] == [reference_score(r)[0] for r in results]
+    assert scores[0].is_quality and not scores[1].is_quality
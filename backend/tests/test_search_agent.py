@@ -0,0 +1,110 @@
+import random
+import time
+
+import pytest
+
+from fakes import FakeLangSearch, search_result
+from tools import http_client
+from tools.dedup import TopK
+from tools.rate_limiter import TokenBucket
+from tools.retry import RetryBudget
+from tools.search_agent import SearchAgent
+
+QUERIES = SearchAgent.STRATEGIC_QUERIES
+
+
+def make_agent(monkeypatch, langsearch, **kwargs):
+    monkeypatch.setattr(http_client, "post", langsearch.post)
+    return SearchAgent(rate_limiter=TokenBucket(1000, 100), cache=None, **kwargs)
+
+
+def test_concurrent_fan_out_returns_the_sequential_ranking(monkeypatch):
+    # Early queries answer last, so completion order is the reverse of query order
+    delays = {index: 0.02 * (len(QUERIES) - index) for index in range(len(QUERIES))}
+    langsearch = FakeLangSearch(QUERIES, delays=delays)
+    concurrent = make_agent(monkeypatch, langsearch, max_workers=8).search_new_ai_tools()
+    assert langsearch.peak_in_flight > 1
+
+    langsearch = FakeLangSearch(QUERIES)
+    sequential = make_agent(monkeypatch, langsearch).search_new_ai_tools(concurrent=False)
+    assert langsearch.peak_in_flight == 1
+    assert concurrent == sequential
+    assert len(concurrent) == SearchAgent.TOP_RESULTS
+
+
+def test_every_request_takes_a_token(monkeypatch):
+    langsearch = FakeLangSearch(QUERIES)
+    monkeypatch.setattr(http_client, "post", langsearch.post)
+    # Next to no refill during the test: the tokens left show how many were taken
+    bucket = TokenBucket(0.001, 100)
+    SearchAgent(rate_limiter=bucket, cache=None).search_new_ai_tools()
+    assert len(langsearch.requests) == len(QUERIES)
+    assert int(bucket._tokens) == 100 - len(QUERIES)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_a_burst_then_spaces_requests(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("tools.rate_limiter.time", clock)
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(0.5)
+    # Idle time refills the bucket, but never beyond its capacity
+    clock.now += 60
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() > 0
+
+
+def test_token_bucket_rejects_a_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+@pytest.mark.parametrize("slow_query", [0, len(QUERIES) - 1])
+def test_stream_yields_results_before_a_slow_query_finishes(monkeypatch, slow_query):
+    # Whichever query is slow, the others' results must not wait for it
+    langsearch = FakeLangSearch(QUERIES, delays={slow_query: 0.5})
+    agent = make_agent(monkeypatch, langsearch, max_workers=8)
+    started = time.monotonic()
+    stream = agent.stream_new_ai_tools()
+    score, first = next(stream)
+    assert time.monotonic() - started < 0.4
+    assert not first["url"].startswith(f"https://site{slow_query}-")
+    stream.close()
+
+
+@pytest.mark.parametrize("slow_query", [None, 0, len(QUERIES) - 1])
+def test_exhausted_stream_ranking_equals_the_batch_top_k(monkeypatch, slow_query):
+    delays = {slow_query: 0.2} if slow_query is not None else {}
+    langsearch = FakeLangSearch(QUERIES, delays=delays)
+    agent = make_agent(monkeypatch, langsearch, max_workers=8)
+    ranking = TopK(SearchAgent.TOP_RESULTS)
+    streamed = list(agent.stream_new_ai_tools(ranking))
+    assert ranking.items() == agent.search_new_ai_tools(concurrent=False)
+    # The stream itself yields every accepted result, the same ones the batch deduplicator keeps
+    raw = [search_result(index, rank) for index in range(len(QUERIES)) for rank in range(langsearch.per_query)]
+    assert sorted(r["url"] for _, r in streamed) == sorted(r["url"] for r in agent._deduplicate_and_score(raw))
+
+
+def test_top_k_matches_a_stable_sort():
+    rng = random.Random(7)
+    for _ in range(200):
+        items = [(rng.choice([0.5, 1.0, 1.5, 2.0, 3.0]), index) for index in range(rng.randint(0, 30))]
+        k = rng.randint(1, 10)
+        top = TopK(k)
+        for score, item in items:
+            top.push(score, item)
+        expected = [item for score, item in sorted(items, key=lambda pair: -pair[0])[:k]]
+        assert top.items() == expected
@@ -0,0 +1,55 @@
+import os
+import sqlite3
+
+import pytest
+
+from tools.cache import SQLiteCache, sqlite_connection
+from tools.page_cache import CachedPage, PageCache
+from workflow.checkpoint import CheckpointStore
+from workflow.leader import LeaderLease
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc to count open files")
+
+
+def open_files() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_sqlite_connection_commits_and_closes(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    with sqlite_connection(path) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    with pytest.raises(RuntimeError):
+        with sqlite_connection(path) as conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError
+    with sqlite_connection(path) as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+
+
+def test_stores_do_not_leak_connections(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    pages = PageCache(str(tmp_path / "pages.sqlite3"))
+    checkpoints = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    lease = LeaderLease(str(tmp_path / "scheduler.sqlite3"), ttl=60)
+    page = CachedPage("https://example.com/a", "text/html", "<p>hi</p>", None, None, "h", None, None, False)
+
+    def use_all(i):
+        cache.set(f"k{i}", {"v": i}, ttl=60)
+        cache.get(f"k{i}")
+        pages.put(page.url, page)
+        pages.get(page.url)
+        run = checkpoints.start()
+        run.save_partial("node", f"k{i}", i)
+        run.finish()
+        lease.try_acquire()
+        lease.claim_run("weekly", 3600, 60)
+
+    use_all(0)
+    before = open_files()
+    for i in range(1, 30):
+        use_all(i)
+    assert open_files() <= before
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from tools import text_extraction
+from tools.text_extraction import BLOCK_PARSERS, extract_text, main_content_text, register_engine
+
+ARTICLE = " ".join(["Rocket is a new open source build tool for TypeScript monorepos."] * 5)
+
+PAGE = f"""<!DOCTYPE html><html><head><title>Rocket</title>
+<script>var price = "free"; $(".buy").show();</script><style>p {{ color: red }}</style></head>
+<body>
+<header class="site-header"><nav><a href="/">Home</a> <a href="/news">News</a></nav></header>
+<div class="cookie-banner"><p>We use cookies to improve your experience on this site, accept them.</p></div>
+<main><article>
+<header><h1>Rocket 1.0</h1></header>
+<p>{ARTICLE}</p>
+<p>It caches <a href="/docs">remote builds</a> and runs tasks in parallel across all packages of a repository.</p>
+<p><a href="/a">one link</a> <a href="/b">two link</a> <a href="/c">three link</a> <a href="/d">four link</a></p>
+<p>Too short.</p>
+</article></main>
+<aside class="sidebar"><p>Related: ten other build tools you should try out this week for sure.</p></aside>
+<footer><p>Copyright 2025 Example Media, all rights reserved worldwide and elsewhere.</p></footer>
+</body></html>"""
+
+
+@pytest.fixture(params=sorted(BLOCK_PARSERS))
+def parser(request):
+    return request.param
+
+
+def test_keeps_only_the_article_body(parser):
+    text = main_content_text(PAGE, parser=parser)
+    assert text.splitlines() == [
+        "Rocket 1.0",
+        ARTICLE,
+        "It caches remote builds and runs tasks in parallel across all packages of a repository.",
+    ]
+
+
+def test_falls_back_to_all_blocks_without_main(parser):
+    html = f"<html><body><div class='has-sidebar'><p>{ARTICLE}</p></div><nav><p>{ARTICLE}</p></nav></body></html>"
+    # The wrapper's class looks like boilerplate; the second pass without hints keeps the text
+    assert main_content_text(html, parser=parser) == ARTICLE
+
+
+def test_hidden_and_role_elements_are_dropped(parser):
+    html = (f"<body><p>{ARTICLE}</p><div hidden><p>{ARTICLE} hidden</p></div>"
+            f"<div aria-hidden='true'><p>{ARTICLE} aria</p></div><div role='banner'><p>{ARTICLE} role</p></div></body>")
+    assert main_content_text(html, parser=parser) == ARTICLE
+
+
+def random_page(rng: random.Random) -> str:
+    """Valid page (no block inside inline content, no nested links) of content, boilerplate, links and headings."""
+    words = "rocket build tool cache remote parallel package release faster".split()
+
+    def text():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(1, 12)))
+
+    def inline(depth, in_link=False):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            kind = rng.random()
+            if kind < 0.2 and depth < 2 and not in_link:
+                parts.append(f"<a href='/x'>{inline(depth + 1, True)}</a>")
+            elif kind < 0.35 and depth < 2:
+                parts.append(f"<em>{inline(depth + 1, in_link)}</em>")
+            elif kind < 0.4:
+                parts.append("<br>")
+            else:
+                parts.append(text())
+        return " ".join(parts)
+
+    def block(depth):
+        kind = rng.random()
+        if depth > 3 or kind < 0.4:
+            return f"<p>{inline(0)}</p>"
+        if kind < 0.5:
+            level = rng.randint(1, 3)
+            return f"<h{level}>{inline(1)}</h{level}>"
+        if kind < 0.6:
+            return "<ul>" + "".join(f"<li>{inline(0)}</li>" for _ in range(rng.randint(1, 3))) + "</ul>"
+        tag = rng.choice(["div", "section", "article", "main", "nav", "aside", "footer", "header", "span"])
+        attrs = rng.choice(["", " class='share-buttons'", " class='content'", " role='main'", " hidden",
+                            " id='sidebar'", " aria-hidden='true'"])
+        inner = "".join(block(depth + 1) for _ in range(rng.randint(1, 3)))
+        if tag == "span":
+            inner = inline(0)
+        return f"<{tag}{attrs}>{inner}</{tag}>"
+
+    body = "".join(block(0) for _ in range(rng.randint(1, 6)))
+    return f"<html><head><script>var a = 1;</script></head><body>{body}</body></html>"
+
+
+@pytest.mark.skipif("lxml" not in BLOCK_PARSERS, reason="lxml is not installed")
+def test_parsers_agree():
+    rng = random.Random(5)
+    for _ in range(300):
+        html = random_page(rng)
+        for use_hints in (True, False):
+            assert BLOCK_PARSERS["lxml"](html, use_hints) == BLOCK_PARSERS["stdlib"](html, use_hints), html
+
+
+def test_missing_engine_falls_back_to_main():
+    def needs_missing_package(html):
+        raise ImportError("not installed")
+
+    register_engine("missing", needs_missing_package)
+    try:
+        assert extract_text(PAGE, engine="missing") == main_content_text(PAGE)
+        assert text_extraction.ENGINES["missing"] is main_content_text
+    finally:
+        text_extraction.ENGINES.pop("missing", None)
@@ -1,27 +1,86 @@
-from typing import List
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 import json
-import requests
-from bs4 import BeautifulSoup
-from .llm_summarizer import get_llm_tool_names_from_text
-import re
+import os
+import sys
+from .dedup import TopK
+from .fetcher import fetch_all, summarize_fetch_stats
+from .gazetteer import NAME_BLACKLIST, TOOL_NAME_PATTERN
+from .page_cache import PAGE_CACHE, fetch_page_text
+from .llm_summarizer import get_llm_tool_names_from_articles, get_llm_tool_names_from_text
 from collections import Counter
 
-def extract_tool_names_llm(urls: List[str], timeout: int = 8) -> list:
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import ARTICLE_FETCH_DEADLINE, ARTICLE_FETCH_WORKERS, LLM_EXTRACTION_MODE
+
+def fetch_article_text(url: str, cancel_event=None, timeout: int = 8, documents=None):
+    """fetch_all worker for articles: (plain text or None, HTTP status), via the DocumentStore if given."""
+    if documents is not None:
+        text, page = documents.text(url, timeout=timeout, cancel_event=cancel_event)
+    else:
+        text, page = fetch_page_text(url, timeout=timeout, cancel_event=cancel_event)
+    return text, page.status
+
+
+class ArticlePrefetcher:
     """
-    Fetches all article texts, concatenates them, and uses a single LLM call to extract AI tool names.
-    Returns a list of tool names.
+    Starts downloading articles into a run's DocumentStore while search results are still
+    coming in (pass `offer` as `SearchAgent.search_new_ai_tools(on_result=...)`). A result
+    is fetched when it enters the provisional top `top_n` of the results seen so far, so
+    the articles the run ends up reading are usually in the store, or in flight, by the
+    time the search finishes. A few that later drop out of the top are fetched for nothing.
     """
-    article_texts = []
-    for url in urls:
+
+    def __init__(self, documents, top_n: int, timeout: int = 8, max_workers: int = ARTICLE_FETCH_WORKERS):
+        self.documents = documents
+        self.timeout = timeout
+        self.ranking = TopK(top_n)
+        self.started = set()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="prefetch")
+
+    def offer(self, score: float, result: Dict) -> None:
+        url = result.get("url")
+        if url and self.ranking.push(score, url) and url not in self.started:
+            self.started.add(url)
+            self.executor.submit(self._fetch, url)
+
+    def _fetch(self, url: str) -> None:
         try:
-            resp = requests.get(url, timeout=timeout)
-            if resp.status_code != 200:
-                continue
-            soup = BeautifulSoup(resp.text, "html.parser")
-            text = soup.get_text(" ", strip=True)
-            article_texts.append(text)
-        except Exception:
-            continue
+            self.documents.text(url, timeout=self.timeout)
+        except Exception as e:
+            print(f"Prefetching {url} failed: {e}")
+
+    def close(self) -> None:
+        """Stop taking results; downloads already started finish in the background."""
+        self.executor.shutdown(wait=False)
+
+
+def extract_tool_names_llm(urls: List[str], timeout: int = 8, deadline: Optional[float] = ARTICLE_FETCH_DEADLINE,
+                           stats: Optional[List[Dict]] = None, documents=None) -> list:
+    """
+    Fetches all article texts concurrently and extracts AI tool names from them with the LLM:
+    map-reduce over chunks of every article (default), or one call on the concatenated text
+    truncated to 12000 characters (LLM_EXTRACTION_MODE=single).
+    Articles still downloading when `deadline` expires are dropped. Pages are revalidated
+    against the page cache, so unchanged articles are neither downloaded nor re-parsed.
+    With a run's DocumentStore (`documents`), pages are kept there for later stages.
+    Per-URL fetch stats are appended to `stats` if given.
+    Returns a list of tool names.
+    """
+    def fetch_text(url, cancel_event):
+        return fetch_article_text(url, cancel_event, timeout, documents)
+
+    fetched, fetch_stats = fetch_all(urls, fetch_text, deadline=deadline)
+    print(f"Fetched {len(fetched)}/{len(fetch_stats)} articles: {summarize_fetch_stats(fetch_stats)}")
+    if PAGE_CACHE is not None:
+        print(f"Page cache: {PAGE_CACHE.stats()}")
+    if stats is not None:
+        stats.extend(fetch_stats)
+    # Keep the original URL order so the combined text is deterministic
+    article_texts = [fetched[url] for url in dict.fromkeys(urls) if url in fetched]
+    if LLM_EXTRACTION_MODE == "map_reduce":
+        return get_llm_tool_names_from_articles(article_texts)
     combined_text = '\n'.join(article_texts)
     if not combined_text.strip():
         return []
@@ -43,18 +102,19 @@ def extract_tool_names_from_articles(urls: List[str], timeout: int = 8) -> Count
     Returns a Counter of tool name frequencies.
     """
     tool_name_counter = Counter()
-    tool_pattern = re.compile(r"([A-Z][a-zA-Z0-9\-]+(?: [A-Z][a-zA-Z0-9\-]+)*)")
-    blacklist = {"AI", "Tools", "App", "Agent", "Labs", "Software", "Platform", "Applications", "Assistant", "Product", "Framework", "Games", "Books", "Examples", "Recents", "Facebook", "Home", "Contact", "About", "Login", "Register", "Read", "Learn", "Explore", "More", "News", "Guide", "Review", "Top", "Best", "List", "Features", "Pricing", "Website", "Summary", "Category"}
+    tool_pattern = TOOL_NAME_PATTERN
+    blacklist = NAME_BLACKLIST
     for url in urls:
         print(f"\nProcessing URL: {url}")
         try:
-            resp = requests.get(url, timeout=timeout)
-            if resp.status_code != 200:
-                print(f"  Failed to fetch (status {resp.status_code})")
+            all_text, page = fetch_page_text(url, timeout=timeout)
+            if page.status != 200:
+                print(f"  Failed to fetch (status {page.status})")
+                continue
+            if all_text is None:
+                print(f"  Skipped non-HTML response ({page.content_type})")
                 continue
-            soup = BeautifulSoup(resp.text, "html.parser")
             probable_tools = set()
-            all_text = soup.get_text(" ", strip=True)
             for m in tool_pattern.findall(all_text):
                 if m not in blacklist and len(m) > 2 and not m.islower():
                     print(f"  Found tool (anywhere): {m}")
@@ -0,0 +1,33 @@
+import asyncio
+import threading
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+def run_sync(coroutine: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code. Works both from plain threads
+    (scheduler jobs, scripts) and from code already running inside an event loop (async
+    FastAPI endpoints), where asyncio.run() is not allowed: there the coroutine gets a
+    fresh loop on a helper thread and the caller blocks until it finishes.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    outcome = {}
+
+    def runner():
+        try:
+            outcome["value"] = asyncio.run(coroutine)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=runner, name="run-sync", daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+def make_cache_key(payload: Any) -> str:
+    """
+    Stable hash of a JSON-serializable payload (e.g. a full request body).
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def sqlite_connection(path: str, timeout: float = 30) -> Iterator[sqlite3.Connection]:
+    """
+    Connection for one transaction: committed on success, rolled back on error and
+    closed either way (`with sqlite3.connect(...)` alone commits but leaves it open).
+    """
+    conn = sqlite3.connect(path, timeout=timeout)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class SQLiteCache:
+    """
+    Persistent JSON value cache backed by SQLite.
+    Entries expire after a per-entry TTL, the table is capped at `max_entries`
+    with least-recently-used eviction, and hits/misses are counted per kind.
+    Safe to share between threads and between processes using the same file.
+    """
+
+    def __init__(self, path: str, table: str = "cache", max_entries: int = 1000):
+        self.path = path
+        self.table = table
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, kind TEXT, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_lru ON {self.table} (last_access)")
+
+    def _connect(self):
+        return sqlite_connection(self.path)
+
+    def get(self, key: str, kind: str = "") -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._misses[kind] += 1
+                return None
+            conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            self._hits[kind] += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float, kind: str = "") -> None:
+        """Store a value for `ttl` seconds, evicting least recently used entries over the cap."""
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, kind, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(value, ensure_ascii=False), now + ttl, now),
+            )
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_access ASC "
+                f"LIMIT MAX(0, (SELECT COUNT(*) FROM {self.table}) - ?))",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            kinds = set(self._hits) | set(self._misses)
+            return {
+                kind or "default": {"hits": self._hits[kind], "misses": self._misses[kind]}
+                for kind in sorted(kinds)
+            }
@@ -0,0 +1,89 @@
+from typing import List, Optional
+
+# Rough size of a token for English prose; good enough to keep prompts under a budget
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Split one text into pieces of at most `max_chars`, preferring line then word boundaries."""
+    pieces = []
+    current = ""
+    for line in text.splitlines():
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars)
+            cut = cut if cut > max_chars // 2 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:cut])
+            line = line[cut:].lstrip()
+        if current and len(current) + 1 + len(line) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current.strip():
+        pieces.append(current)
+    return [piece for piece in pieces if piece.strip()]
+
+
+class ChunkPacker:
+    """
+    Incremental form of `chunk_texts`: texts are added one at a time and each chunk is
+    handed out as soon as it is full, so chunking can start before all texts are known.
+    Adding the same texts in the same order gives exactly the chunks of `chunk_texts`.
+    """
+
+    def __init__(self, chunk_tokens: int, max_tokens_per_text: int = 0):
+        self.max_chars = max(1, chunk_tokens) * CHARS_PER_TOKEN
+        self.max_tokens_per_text = max_tokens_per_text
+        self._current = ""
+
+    def add(self, text: str) -> List[str]:
+        """Add the next text; returns the chunks it completed."""
+        text = (text or "").strip()
+        if self.max_tokens_per_text:
+            text = text[:self.max_tokens_per_text * CHARS_PER_TOKEN]
+        if not text:
+            return []
+        chunks = []
+        for piece in _split_long(text, self.max_chars):
+            if self._current and len(self._current) + 1 + len(piece) > self.max_chars:
+                chunks.append(self._current)
+                self._current = ""
+            self._current = f"{self._current}\n{piece}" if self._current else piece
+        return chunks
+
+    def max_chunks_per_text(self) -> Optional[int]:
+        """
+        Upper bound on the chunks one `add` can complete, or None when texts are not capped.
+        A completed chunk plus the piece that did not fit after it hold more than a chunk's
+        worth of text, so a capped text can complete at most two chunks per chunk it fills.
+        """
+        if not self.max_tokens_per_text:
+            return None
+        text_chars = self.max_tokens_per_text * CHARS_PER_TOKEN
+        return 2 * -(-text_chars // self.max_chars) + 1
+
+    def finish(self) -> List[str]:
+        """The last, partly filled chunk (if any)."""
+        chunks = [self._current] if self._current else []
+        self._current = ""
+        return chunks
+
+
+def chunk_texts(texts: List[str], chunk_tokens: int, max_tokens_per_text: int = 0) -> List[str]:
+    """
+    Pack texts into chunks of roughly `chunk_tokens` tokens, in order. Short texts share
+    a chunk, long ones are split across chunks at line boundaries. With
+    `max_tokens_per_text`, each text is first cut to that size so one huge page
+    cannot crowd out the others.
+    """
+    packer = ChunkPacker(chunk_tokens, max_tokens_per_text)
+    chunks = []
+    for text in texts:
+        chunks.extend(packer.add(text))
+    return chunks + packer.finish()
@@ -0,0 +1,208 @@
+import hashlib
+import heapq
+import random
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters of known click trackers; they never change the page. Generic names such
+# as `ref` or `source` are kept, since some sites use them for real content
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref_src', 'ref_url', '_ga', '_hsenc', '_hsmi',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_')
+
+# Last " | Suffix", " - Suffix", " — Suffix" part of a title; only removed when it names the site
+TITLE_SUFFIX = re.compile(r"^(?P<title>.*\S)\s+(?:\||-|–|—|::|·)\s+(?P<suffix>.+?)\s*$")
+NON_WORD = re.compile(r"[^\w]+")
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so the same page reached through different links compares equal:
+    scheme and host case, `www.`, default ports, fragments, trailing slashes,
+    tracking parameters and query parameter order are ignored.
+    """
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip().lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def _names_site(suffix: str, url: str) -> bool:
+    """
+    Whether a title suffix is the name of the site at `url`: its domain ("techcrunch.com"),
+    a host label ("TechCrunch", "The Verge" on theverge.com) or a label followed by more
+    words ("DEV Community" on dev.to).
+    """
+    name = NON_WORD.sub('', suffix.lower())
+    host = (urlsplit(url).hostname or '').lower() if url else ''
+    if not name or not host:
+        return False
+    if host.startswith('www.'):
+        host = host[4:]
+    labels = [NON_WORD.sub('', label) for label in host.split('.')]
+    # The host or any parent domain, with or without its TLD ("blog.rust-lang.org", "rust-lang.org")
+    if any(name in (''.join(labels[i:]), ''.join(labels[i:-1])) for i in range(len(labels) - 1)):
+        return True
+    return any(len(label) >= 3 and name.startswith(label) for label in labels[:-1])
+
+
+def normalize_title(title: str, url: str = '') -> str:
+    """
+    Lowercase a title and collapse punctuation. A trailing " | Site Name" style suffix is
+    dropped when it names the site at `url`; other suffixes (" - Release Notes",
+    " - Part Two") tell articles apart and are kept.
+    """
+    title = (title or '').strip()
+    match = TITLE_SUFFIX.match(title)
+    # Don't strip everything when the "suffix" is most of the title
+    if match and len(match.group('title')) >= 10 and _names_site(match.group('suffix'), url):
+        title = match.group('title')
+    return NON_WORD.sub(' ', title.lower()).strip()
+
+
+def _shingles(text: str) -> Set[str]:
+    return {word for word in NON_WORD.sub(' ', text.lower()).split() if len(word) > 1}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class MinHasher:
+    """
+    MinHash signatures over the word set of a text. The fraction of equal signature
+    slots estimates the Jaccard similarity of two texts.
+    """
+
+    def __init__(self, num_perm: int = 64, min_words: int = 5, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.min_words = min_words
+        self._perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        """Signature of `text`, or None when it has too few words to compare reliably."""
+        hashes = [_hash64(shingle) & MAX_HASH for shingle in _shingles(text)]
+        if len(hashes) < self.min_words:
+            return None
+        return tuple(
+            min((a * value + b) % MERSENNE_PRIME for value in hashes) & MAX_HASH
+            for a, b in self._perms
+        )
+
+
+def estimate_similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH index over result text (title and snippet).
+    Signatures are split into bands sized for `threshold`; only texts sharing a band
+    bucket are compared, which keeps the whole dedup pass roughly linear in the
+    number of candidates. A candidate is a near-duplicate when its estimated
+    Jaccard similarity reaches `threshold`.
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.rows = self._rows_per_band(threshold, num_perm)
+        self.bands = num_perm // self.rows
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[Tuple[int, ...]] = []
+
+    @staticmethod
+    def _rows_per_band(threshold: float, num_perm: int) -> int:
+        # Largest band size whose LSH threshold (1/b)^(1/r) stays comfortably below
+        # the similarity threshold, so true near-duplicates are rarely missed
+        best = 1
+        for rows in range(1, num_perm + 1):
+            if num_perm % rows:
+                continue
+            if (1 / (num_perm // rows)) ** (1 / rows) <= threshold - 0.1:
+                best = rows
+        return best
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield signature[band * self.rows:(band + 1) * self.rows]
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        return self.hasher.signature(text)
+
+    def find(self, signature: Optional[Tuple[int, ...]]) -> Optional[int]:
+        """Return the position of a stored near-duplicate, or None."""
+        if signature is None:
+            return None
+        checked = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            for index in buckets.get(key, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                if estimate_similarity(self._signatures[index], signature) >= self.threshold:
+                    return index
+        return None
+
+    def add(self, signature: Optional[Tuple[int, ...]]) -> Optional[int]:
+        if signature is None:
+            return None
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, []).append(index)
+        return index
+
+
+class TopK:
+    """
+    Incrementally keeps the `k` highest-scored items pushed so far. Ties keep
+    arrival order, so `items()` equals a stable descending sort truncated to `k`.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, object]] = []
+        self._seq = 0
+
+    def push(self, score: float, item) -> bool:
+        """Offer an item; returns True if it is currently in the top k."""
+        # Min-heap on (score, -arrival): the root is the lowest score, latest arrival
+        entry = (score, -self._seq, item)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if self._heap and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def items(self) -> List:
+        return [item for _, _, item in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TEXT_EXTRACTION_ENGINE
+from .dedup import canonicalize_url
+from .http_client import FetchedPage, Timeout
+from .metadata import PageMetadata, aload_metadata, load_metadata, parse_metadata
+from .page_cache import PAGE_CACHE, CachedPage, PageCache, fetch_page
+from .text_extraction import extract_text
+
+
+class DocumentStore:
+    """
+    Run-scoped store of fetched documents, passed through the workflow state as
+    `state["documents"]`. Each URL (by canonical form) is downloaded, converted to
+    text and read for metadata at most once per run, whichever stage asks first.
+    Concurrent requests for the same URL wait for the one in flight (single-flight).
+    Downloads interrupted by a stage deadline are not stored, so a later stage may retry.
+    """
+
+    def __init__(self, page_cache: Optional[PageCache] = PAGE_CACHE):
+        self.page_cache = page_cache
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._pages: Dict[str, FetchedPage] = {}
+        self._entries: Dict[str, Optional[CachedPage]] = {}
+        self._texts: Dict[Tuple[str, str], Optional[str]] = {}
+        self._metadata: Dict[str, Optional[PageMetadata]] = {}
+        self.fetches = 0
+        self.reuses = 0
+
+    def _key_lock(self, kind: str, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault((kind, key), threading.Lock())
+
+    def _count(self, reused: bool) -> None:
+        with self._lock:
+            if reused:
+                self.reuses += 1
+            else:
+                self.fetches += 1
+
+    def page(self, url: str, timeout: Optional[Timeout] = None,
+             cancel_event: Optional[threading.Event] = None) -> FetchedPage:
+        """The full page, downloaded (through the page cache) on first use."""
+        key = canonicalize_url(url)
+        with self._key_lock("page", key):
+            if key in self._pages:
+                self._count(reused=True)
+                return self._pages[key]
+            page, entry = fetch_page(url, timeout=timeout, cancel_event=cancel_event, cache=self.page_cache)
+            self._count(reused=False)
+            if cancel_event is None or not cancel_event.is_set():
+                self._pages[key] = page
+                self._entries[key] = entry
+            return page
+
+    def text(self, url: str, timeout: Optional[Timeout] = None, cancel_event: Optional[threading.Event] = None,
+             engine: Optional[str] = None) -> Tuple[Optional[str], FetchedPage]:
+        """
+        Plain text of the page (None if not a usable HTML page), extracted once per engine.
+        Text the page cache already holds for unchanged content is reused as is.
+        """
+        engine = engine or TEXT_EXTRACTION_ENGINE
+        key = canonicalize_url(url)
+        page = self.page(url, timeout=timeout, cancel_event=cancel_event)
+        if page.text is None:
+            return None, page
+        with self._key_lock("text", key):
+            if (key, engine) not in self._texts:
+                entry = self._entries.get(key)
+                if entry is not None and entry.text is not None and entry.text_engine == engine:
+                    text = entry.text
+                else:
+                    text = extract_text(page.text, engine)
+                    if entry is not None and self.page_cache is not None:
+                        self.page_cache.set_text(url, entry.content_hash, engine, text)
+                self._texts[(key, engine)] = text
+            return self._texts[(key, engine)], page
+
+    def metadata(self, url: str, timeout: float = 5,
+                 cancel_event: Optional[threading.Event] = None) -> Tuple[Optional[PageMetadata], Optional[int]]:
+        """
+        Title, description and pricing hints. Taken from the full page when this run has
+        already downloaded it, otherwise from a head-only fetch (see tools.metadata).
+        """
+        key = canonicalize_url(url)
+        with self._key_lock("metadata", key):
+            if key in self._metadata:
+                self._count(reused=True)
+                return self._metadata[key], 200
+            with self._lock:
+                page = self._pages.get(key)
+            if page is not None and page.text is not None:
+                self._count(reused=True)
+                metadata, status = parse_metadata(page.text), page.status
+            else:
+                self._count(reused=False)
+                metadata, status = load_metadata(url, timeout, cancel_event)
+            if cancel_event is None or not cancel_event.is_set():
+                self._metadata[key] = metadata
+            return metadata, status
+
+    async def ametadata(self, url: str, client, timeout: float = 5) -> Tuple[Optional[PageMetadata], Optional[int]]:
+        """
+        Async variant of `metadata` over an httpx.AsyncClient. It does not wait for a
+        concurrent request for the same URL (that would block the event loop), so two
+        coroutines asking at once may both fetch; the first result is kept.
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            metadata = self._metadata.get(key)
+            known = key in self._metadata
+            page = self._pages.get(key)
+        if known:
+            self._count(reused=True)
+            return metadata, 200
+        if page is not None and page.text is not None:
+            self._count(reused=True)
+            metadata, status = parse_metadata(page.text), page.status
+        else:
+            self._count(reused=False)
+            metadata, status = await aload_metadata(url, client, timeout)
+        with self._lock:
+            return self._metadata.setdefault(key, metadata), status
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"documents": len(self._pages), "fetches": self.fetches, "reuses": self.reuses}
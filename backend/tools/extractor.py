@@ -1,8 +1,10 @@
-from typing import Dict
-import requests
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional
+from .metadata import PageMetadata, aload_metadata, fetch_metadata, fetch_metadata_all
 
-def extract_tool_info(result: Dict) -> Dict:
+# Marks a site whose metadata could not be fetched, so extract_tool_info doesn't retry it serially
+_UNAVAILABLE = PageMetadata(None, None, False)
+
+def extract_tool_info(result: Dict, metadata: Optional[PageMetadata] = None, documents=None) -> Dict:
     name = result.get("name")
     website = result.get("url")
     snippet = result.get("snippet", "")
@@ -12,25 +14,22 @@ def extract_tool_info(result: Dict) -> Dict:
     features = [snippet[:100]] if snippet else []
     pricing = "Unknown"
     category = "AI Tool"
-    # Try to crawl the website for more info
-    try:
-        resp = requests.get(website, timeout=5)
-        if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, "html.parser")
-            meta_desc = soup.find("meta", attrs={"name": "description"})
-            if meta_desc and meta_desc.get("content"):
-                functionality = meta_desc["content"]
-            if not name:
-                title = soup.find("title")
-                if title:
-                    name = title.text.strip()
-            text = soup.get_text(" ", strip=True).lower()
-            for word in ["free", "trial", "pricing", "$", "price", "subscription"]:
-                if word in text:
-                    pricing = "See website for details"
-                    break
-    except Exception:
-        pass
+    # Read title, description and pricing hints from the website's <head> (cached)
+    if metadata is None and website:
+        try:
+            if documents is not None:
+                metadata, _ = documents.metadata(website, timeout=5)
+            else:
+                metadata = fetch_metadata(website, timeout=5)
+        except Exception:
+            metadata = None
+    if metadata is not None:
+        if metadata.description:
+            functionality = metadata.description
+        if not name and metadata.title:
+            name = metadata.title
+        if metadata.has_pricing:
+            pricing = "See website for details"
     return {
         "name": name,
         "website": website,
@@ -40,3 +39,31 @@ def extract_tool_info(result: Dict) -> Dict:
         "pricing": pricing,
         "category": category
     }
+
+
+def extract_tool_infos(results: List[Dict], documents=None) -> List[Dict]:
+    """
+    extract_tool_info for several results, fetching all websites' metadata concurrently
+    (through the run's DocumentStore when given).
+    """
+    metadata = fetch_metadata_all([result.get("url") for result in results if result.get("url")],
+                                  documents=documents)
+    return [extract_tool_info(result, metadata.get(result.get("url")) or _UNAVAILABLE) for result in results]
+
+
+async def aextract_tool_info(result: Dict, client, documents=None) -> Dict:
+    """
+    Async variant of extract_tool_info: the website's metadata is fetched over the given
+    httpx.AsyncClient (through the run's DocumentStore when given).
+    """
+    metadata = None
+    website = result.get("url")
+    if website:
+        try:
+            if documents is not None:
+                metadata, _ = await documents.ametadata(website, client, timeout=5)
+            else:
+                metadata, _ = await aload_metadata(website, client, timeout=5)
+        except Exception:
+            metadata = None
+    return extract_tool_info(result, metadata or _UNAVAILABLE)
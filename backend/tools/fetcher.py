@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import ARTICLE_FETCH_WORKERS, ARTICLE_FETCH_PER_HOST, ARTICLE_FETCH_DEADLINE
+
+# fetch_one(url, cancel_event) -> (value or None, HTTP status or None)
+FetchOne = Callable[[str, threading.Event], Tuple[Optional[object], Optional[int]]]
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def fetch_all(urls: List[str], fetch_one: FetchOne, max_workers: int = ARTICLE_FETCH_WORKERS,
+              per_host: int = ARTICLE_FETCH_PER_HOST,
+              deadline: Optional[float] = ARTICLE_FETCH_DEADLINE,
+              on_done: Optional[Callable[[str, Optional[object]], None]] = None) -> Tuple[Dict[str, object], List[Dict]]:
+    """
+    Run `fetch_one` for every URL on a bounded worker pool with a per-host concurrency cap.
+    URLs wait in a queue until both a worker and a slot for their host are free (taken in
+    input order), so workers never sit blocked on a busy host while other hosts wait.
+    The whole stage gets `deadline` seconds: whatever finished by then is returned,
+    queued work is cancelled and in-flight downloads are told to stop via their cancel event.
+    `on_done(url, value or None)` is called from the worker as each started URL finishes,
+    so callers can process results while the rest are still downloading.
+    Returns ({url: value} for successful URLs, per-URL stats in input order).
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    stats = {url: {"url": url, "outcome": "cancelled", "status": None, "elapsed": None} for url in urls}
+    values: Dict[str, object] = {}
+    if not urls:
+        return values, []
+
+    cancel_event = threading.Event()
+    workers = max(1, min(max_workers, len(urls)))
+    per_host = max(1, per_host)
+    started = time.monotonic()
+    stop_at = started + deadline if deadline else None
+
+    lock = threading.Lock()
+    queued = list(urls)
+    active_per_host: Dict[str, int] = {}
+    in_flight = 0
+    finished = 0
+    all_finished = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def dispatch():
+        """Start queued URLs while workers and host slots are free (call with `lock` held)."""
+        nonlocal in_flight
+        index = 0
+        while in_flight < workers and index < len(queued) and not cancel_event.is_set():
+            host = _host(queued[index])
+            if active_per_host.get(host, 0) >= per_host:
+                index += 1
+                continue
+            url = queued.pop(index)
+            active_per_host[host] = active_per_host.get(host, 0) + 1
+            in_flight += 1
+            executor.submit(run, url)
+
+    def release(url: str):
+        """Free the URL's worker and host slot and hand them to queued URLs."""
+        nonlocal in_flight
+        with lock:
+            active_per_host[_host(url)] -= 1
+            in_flight -= 1
+            dispatch()
+
+    def finish():
+        nonlocal finished
+        with lock:
+            finished += 1
+            if finished == len(urls):
+                all_finished.set()
+
+    def run(url: str):
+        try:
+            fetch(url)
+        finally:
+            finish()
+
+    def fetch(url: str):
+        fetch_started = time.monotonic()
+        entry = stats[url]
+        entry["outcome"] = "running"
+        entry["started"] = fetch_started
+        try:
+            value, status = fetch_one(url, cancel_event)
+            entry["status"] = status
+            if cancel_event.is_set():
+                entry["outcome"] = "timeout"
+            elif value is not None:
+                values[url] = value
+                entry["outcome"] = "ok"
+            else:
+                entry["outcome"] = "http_error" if status and status != 200 else "skipped"
+        except Exception as e:
+            entry["outcome"] = "error"
+            entry["error"] = str(e)
+        finally:
+            entry["elapsed"] = round(time.monotonic() - fetch_started, 3)
+            release(url)
+        if on_done is not None:
+            on_done(url, values.get(url) if entry["outcome"] == "ok" else None)
+
+    try:
+        with lock:
+            dispatch()
+        all_finished.wait(timeout=None if stop_at is None else max(0.0, stop_at - time.monotonic()))
+    finally:
+        # Under the lock, so no worker dispatches more work once the executor shuts down
+        with lock:
+            cancel_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Snapshot now: late workers may still touch their entries. Anything still
+    # running at the deadline is reported as timed out and its result dropped.
+    now = time.monotonic()
+    result_values = {}
+    result_stats = []
+    for url in urls:
+        entry = dict(stats[url])
+        started_at = entry.pop("started", None)
+        if entry["outcome"] == "running":
+            entry["outcome"] = "timeout"
+            entry["elapsed"] = round(now - started_at, 3)
+        if entry["outcome"] == "ok":
+            result_values[url] = values[url]
+        result_stats.append(entry)
+    return result_values, result_stats
+
+
+def summarize_fetch_stats(stats: List[Dict]) -> str:
+    """One-line summary of fetch outcomes, e.g. 'http_error=1 ok=9 timeout=2 (slowest 8.0s)'."""
+    counts: Dict[str, int] = {}
+    for entry in stats:
+        counts[entry["outcome"]] = counts.get(entry["outcome"], 0) + 1
+    slowest = max((entry["elapsed"] or 0 for entry in stats), default=0)
+    parts = " ".join(f"{outcome}={count}" for outcome, count in sorted(counts.items()))
+    return f"{parts} (slowest {slowest:.1f}s)"
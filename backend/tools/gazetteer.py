@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import GAZETTEER_ENABLED, GAZETTEER_PATH, GAZETTEER_MIN_HITS, GAZETTEER_MIN_CONFIDENCE
+from .scoring import trie_regex
+
+# Capitalized words or phrases that may be product names
+TOOL_NAME_PATTERN = re.compile(r"([A-Z][a-zA-Z0-9\-]+(?: [A-Z][a-zA-Z0-9\-]+)*)")
+# The same, but only mid-sentence (after a lowercase word or punctuation), which skips sentence starts
+MID_SENTENCE_NAME = re.compile(
+    r"(?<=[a-z0-9,;:(] )([A-Z](?:[\w+#\-]|\.(?=\w))*(?: [A-Z](?:[\w+#\-]|\.(?=\w))*)*)"
+)
+NAME_BLACKLIST = {
+    "AI", "Tools", "App", "Agent", "Labs", "Software", "Platform", "Applications", "Assistant", "Product",
+    "Framework", "Games", "Books", "Examples", "Recents", "Facebook", "Home", "Contact", "About", "Login",
+    "Register", "Read", "Learn", "Explore", "More", "News", "Guide", "Review", "Top", "Best", "List",
+    "Features", "Pricing", "Website", "Summary", "Category",
+}
+
+# Well-known tools the dictionary starts from; everything else is learned from LLM extractions
+SEED_TOOLS = [
+    "React", "Vue", "Angular", "Svelte", "Next.js", "Nuxt", "Express", "FastAPI", "Django", "Flask",
+    "Python", "Rust", "TypeScript", "JavaScript", "Kotlin", "Swift", "Node.js", "Deno", "Bun",
+    "VS Code", "Visual Studio Code", "IntelliJ IDEA", "Cursor", "Neovim",
+    "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins", "GitHub Actions", "AWS Lambda",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "SQLite", "Elasticsearch", "Supabase", "Firebase",
+    "Postman", "Insomnia", "Flutter", "React Native",
+    "GitHub Copilot", "ChatGPT", "Claude", "Gemini", "TensorFlow", "PyTorch", "LangChain", "Hugging Face",
+    "Slack", "Discord", "Notion", "SonarQube", "Datadog", "Grafana", "Prometheus",
+]
+
+
+class GazetteerMatch(NamedTuple):
+    known: List[str]    # dictionary tools found in the text, canonical spelling, first-seen order
+    unknown: List[str]  # other mid-sentence capitalized names that might be tools
+
+    @property
+    def confidence(self) -> float:
+        total = len(self.known) + len(self.unknown)
+        return len(self.known) / total if total else 0.0
+
+
+class Gazetteer:
+    """
+    Persisted dictionary of known developer tool names with a compiled trie regex
+    for finding them in text. Names returned by the LLM are learned, so the share
+    of text the dictionary can handle alone grows from run to run.
+    """
+
+    def __init__(self, path: str, min_hits: int = GAZETTEER_MIN_HITS,
+                 min_confidence: float = GAZETTEER_MIN_CONFIDENCE):
+        self.path = path
+        self.min_hits = min_hits
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict] = {}
+        self._pattern: Optional[re.Pattern] = None
+        self._dirty = False
+        for name in SEED_TOOLS:
+            self._tools[name.casefold()] = {"name": name, "count": 0, "last_seen": None}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._tools.update(json.load(f).get("tools", {}))
+        except (OSError, ValueError) as e:
+            print(f"Could not load tool gazetteer from {self.path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def _compiled(self) -> re.Pattern:
+        with self._lock:
+            if self._pattern is None:
+                body = trie_regex(self._tools)
+                self._pattern = re.compile(r"(?<!\w)(?:" + body + r")(?![\w+#])", re.IGNORECASE)
+            return self._pattern
+
+    def find(self, text: str) -> List[str]:
+        """Known tool names occurring in `text` as whole words, in order of first occurrence."""
+        found = {}
+        for match in self._compiled().finditer(text):
+            entry = self._tools.get(match.group().casefold())
+            # "go", "rust", "express" in lowercase prose are ordinary words
+            if entry is None or (match.group().islower() and not entry["name"].islower()):
+                continue
+            found.setdefault(entry["name"].casefold(), entry["name"])
+        return list(found.values())
+
+    def match(self, text: str) -> GazetteerMatch:
+        known = self.find(text)
+        known_keys = {name.casefold() for name in known}
+        unknown = {}
+        for candidate in MID_SENTENCE_NAME.findall(text):
+            key = candidate.casefold()
+            if candidate in NAME_BLACKLIST or len(candidate) < 3 or key in known_keys or key in self._tools:
+                continue
+            unknown.setdefault(key, candidate)
+        return GazetteerMatch(known, list(unknown.values()))
+
+    def is_confident(self, match: GazetteerMatch) -> bool:
+        """True when the dictionary alone explains the text well enough to skip the LLM."""
+        return len(match.known) >= self.min_hits and match.confidence >= self.min_confidence
+
+    def learn(self, names: Iterable[str], text: str = "") -> int:
+        """
+        Add LLM-extracted names to the dictionary. With `text`, only names that literally
+        occur in it are learned, so hallucinated names never become matches.
+        Returns the number of new names.
+        """
+        folded_text = text.casefold()
+        today = datetime.now().strftime("%Y-%m-%d")
+        added = 0
+        with self._lock:
+            for name in names:
+                name = (name or "").strip()
+                key = name.casefold()
+                if len(name) < 2 or name in NAME_BLACKLIST or (text and key not in folded_text):
+                    continue
+                entry = self._tools.get(key)
+                if entry is None:
+                    entry = self._tools[key] = {"name": name, "count": 0, "last_seen": None}
+                    self._pattern = None
+                    added += 1
+                entry["count"] += 1
+                entry["last_seen"] = today
+                self._dirty = True
+        return added
+
+    def save(self) -> None:
+        """Write the dictionary atomically (temp file + rename)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"tools": self._tools}, f, ensure_ascii=False, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._dirty = False
+
+
+TOOL_GAZETTEER = Gazetteer(GAZETTEER_PATH) if GAZETTEER_ENABLED else None
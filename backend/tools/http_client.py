@@ -0,0 +1,269 @@
+import codecs
+import os
+import re
+import sys
+import threading
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_ENABLE_HTTP2, PAGE_MAX_BYTES
+)
+
+Timeout = Union[float, Tuple[float, float]]
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+CHUNK_SIZE = 16384
+SNIFF_BYTES = 2048
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_\-]+)""", re.IGNORECASE)
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_http2_client = None
+# Whether httpx and h2 can be imported; None until HTTP/2 is first asked for
+_http2_support: Optional[bool] = None
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide requests session. Connections are kept alive in one pool per host,
+    so repeated calls to api.langsearch.com and article hosts skip the TCP/TLS handshake.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _http2_supported() -> bool:
+    """
+    Whether the HTTP/2 dependencies (httpx with the `h2` extra) are installed. Checked
+    once per process, so a missing extra costs one import attempt and one warning.
+    """
+    global _http2_support
+    if _http2_support is None:
+        with _lock:
+            if _http2_support is None:
+                try:
+                    import httpx  # noqa: F401
+                    import h2  # noqa: F401
+                    _http2_support = True
+                except ImportError:
+                    print("HTTP/2 requested but httpx[http2] is not installed; using HTTP/1.1")
+                    _http2_support = False
+    return _http2_support
+
+
+def get_http2_client():
+    """
+    Optional HTTP/2 client (httpx with the `h2` extra) for API calls. Returns None when
+    HTTP/2 is disabled or httpx/h2 are not installed, and callers fall back to the session.
+    """
+    global _http2_client
+    if not HTTP_ENABLE_HTTP2 or not _http2_supported():
+        return None
+    if _http2_client is None:
+        with _lock:
+            if _http2_client is None:
+                import httpx
+                _http2_client = httpx.Client(
+                    http2=True,
+                    timeout=_httpx_timeout(DEFAULT_TIMEOUT),
+                    limits=httpx.Limits(max_connections=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE,
+                                        max_keepalive_connections=HTTP_POOL_MAXSIZE),
+                )
+    return _http2_client
+
+
+def _httpx_timeout(timeout: Timeout):
+    import httpx
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def get(url: str, timeout: Optional[Timeout] = None, **kwargs) -> requests.Response:
+    """
+    GET through the shared session with the default connect/read timeouts.
+    """
+    return get_session().get(url, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+def post(url: str, timeout: Optional[Timeout] = None, **kwargs):
+    """
+    POST through the shared HTTP/2 client when enabled, otherwise the shared session.
+    Both return a response exposing `status_code`, `headers`, `text` and `json()`.
+    """
+    client = get_http2_client()
+    if client is not None:
+        return client.post(url, timeout=_httpx_timeout(timeout or DEFAULT_TIMEOUT), **kwargs)
+    return get_session().post(url, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+def new_async_client():
+    """
+    New httpx.AsyncClient with the shared pool limits and timeouts (HTTP/2 when enabled
+    and available). Async clients are bound to the event loop they are used on, so callers
+    create one per run (`async with http_client.new_async_client() as client`).
+    """
+    import httpx
+    return httpx.AsyncClient(
+        http2=HTTP_ENABLE_HTTP2 and _http2_supported(),
+        timeout=_httpx_timeout(DEFAULT_TIMEOUT),
+        limits=httpx.Limits(max_connections=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE,
+                            max_keepalive_connections=HTTP_POOL_MAXSIZE),
+    )
+
+
+def close() -> None:
+    """Close pooled connections (used on application shutdown)."""
+    global _session, _http2_client
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _http2_client is not None:
+            _http2_client.close()
+            _http2_client = None
+
+
+class FetchedPage(NamedTuple):
+    url: str
+    status: int
+    content_type: str
+    text: Optional[str]  # None when the response was not a usable HTML page
+    headers: Dict[str, str]
+    truncated: bool = False
+
+
+def _sniff_encoding(declared: Optional[str], first_chunk: bytes) -> str:
+    if declared:
+        try:
+            return codecs.lookup(declared).name
+        except LookupError:
+            pass
+    match = META_CHARSET.search(first_chunk[:SNIFF_BYTES * 2])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class _BodyReader:
+    """
+    Incremental decoding of an HTML body, shared by `fetch_html` and `afetch_html`:
+    the first bytes are held back until a <meta charset> would be visible, and reading
+    stops after `max_bytes` or once `stop` returns True for the text decoded so far.
+    """
+
+    def __init__(self, declared: Optional[str], max_bytes: int, stop: Optional[Callable[[str], bool]] = None):
+        self.declared = declared
+        self.max_bytes = max_bytes
+        self.stop = stop
+        self.decoder = None
+        self.head = b""
+        self.parts = []
+        self.received = 0
+        self.truncated = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Take the next chunk; returns True when nothing more should be read."""
+        if self.received + len(chunk) >= self.max_bytes:
+            chunk = chunk[:self.max_bytes - self.received]
+            self.truncated = True
+        self.received += len(chunk)
+        if self.decoder is None:
+            self.head += chunk
+            if len(self.head) < SNIFF_BYTES and not self.truncated:
+                return False
+            self.decoder = codecs.getincrementaldecoder(_sniff_encoding(self.declared, self.head))(errors="replace")
+            chunk = self.head
+        self.parts.append(self.decoder.decode(chunk))
+        if not self.truncated and self.stop is not None and self.stop(self.parts[-1]):
+            self.truncated = True
+        return self.truncated
+
+    def text(self) -> str:
+        if self.decoder is None:
+            self.decoder = codecs.getincrementaldecoder(_sniff_encoding(self.declared, self.head))(errors="replace")
+            self.parts.append(self.decoder.decode(self.head))
+        self.parts.append(self.decoder.decode(b"", final=True))
+        return "".join(self.parts)
+
+
+def _html_mime(status: int, content_type: str) -> Tuple[str, bool]:
+    """The response's MIME type, and whether its body is worth reading (a 200 HTML page)."""
+    mime = content_type.split(";")[0].strip().lower()
+    return mime, status == 200 and (not mime or mime in HTML_CONTENT_TYPES)
+
+
+def fetch_html(url: str, timeout: Optional[Timeout] = None, max_bytes: int = PAGE_MAX_BYTES,
+               cancel_event: Optional[threading.Event] = None,
+               headers: Optional[Dict[str, str]] = None,
+               stop: Optional[Callable[[str], bool]] = None) -> FetchedPage:
+    """
+    Stream an HTML page through the shared session. Non-200 and non-HTML responses
+    (PDFs, images, ...) are dropped after the headers arrive, the body is decoded
+    incrementally and reading stops after `max_bytes` or when `cancel_event` is set.
+    `stop`, if given, is called with each newly decoded piece of text; once it returns
+    True nothing more is read and the page is marked truncated.
+    """
+    response = get_session().get(url, timeout=timeout or DEFAULT_TIMEOUT, stream=True, headers=headers)
+    try:
+        response_headers = dict(response.headers)
+        content_type = response.headers.get("Content-Type", "")
+        mime, readable = _html_mime(response.status_code, content_type)
+        if not readable:
+            return FetchedPage(response.url, response.status_code, mime, None, response_headers)
+
+        # requests falls back to ISO-8859-1 for text/* without a charset; only trust an explicit one
+        declared = response.encoding if "charset=" in content_type.lower() else None
+        reader = _BodyReader(declared, max_bytes, stop)
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if cancel_event is not None and cancel_event.is_set():
+                return FetchedPage(response.url, response.status_code, mime, None, response_headers)
+            if reader.feed(chunk):
+                break
+        return FetchedPage(response.url, response.status_code, mime, reader.text(), response_headers,
+                           reader.truncated)
+    finally:
+        response.close()
+
+
+async def afetch_html(client, url: str, timeout: Optional[Timeout] = None, max_bytes: int = PAGE_MAX_BYTES,
+                      headers: Optional[Dict[str, str]] = None,
+                      stop: Optional[Callable[[str], bool]] = None) -> FetchedPage:
+    """
+    Async variant of `fetch_html` over an httpx.AsyncClient (see `new_async_client`);
+    cancel it by cancelling the task.
+    """
+    async with client.stream("GET", url, timeout=_httpx_timeout(timeout or DEFAULT_TIMEOUT), headers=headers,
+                             follow_redirects=True) as response:
+        response_headers = dict(response.headers)
+        content_type = response.headers.get("Content-Type", "")
+        mime, readable = _html_mime(response.status_code, content_type)
+        if not readable:
+            return FetchedPage(str(response.url), response.status_code, mime, None, response_headers)
+
+        reader = _BodyReader(response.charset_encoding, max_bytes, stop)
+        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+            if reader.feed(chunk):
+                break
+        return FetchedPage(str(response.url), response.status_code, mime, reader.text(), response_headers,
+                           reader.truncated)
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INCREMENTAL_TRUST_DAYS
+from .llm_summarizer import FAILED_SUMMARY
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def canonical_tool_name(name: str) -> str:
+    """Key used to match a tool across runs: case-folded, whitespace collapsed."""
+    return " ".join((name or "").split()).casefold()
+
+
+def load_previous_results(path: str) -> Optional[List[Dict]]:
+    """Results of the last successful run stored at `path`, or None if there are none to reuse."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read previous results from {path}: {e}")
+        return None
+    if data.get("error") or not data.get("results"):
+        return None
+    return data["results"]
+
+
+def _is_reusable(entry: Dict, now: datetime, trust_days: float) -> bool:
+    if not entry.get("summary") or entry["summary"] == FAILED_SUMMARY:
+        return False
+    try:
+        refreshed_at = datetime.strptime(entry.get("refreshed_at", ""), TIMESTAMP_FORMAT)
+    except ValueError:
+        return False
+    return now - refreshed_at <= timedelta(days=trust_days)
+
+
+def plan_refresh(tool_names: List[str], previous: Optional[List[Dict]],
+                 trust_days: float = INCREMENTAL_TRUST_DAYS,
+                 now: Optional[datetime] = None) -> Tuple[Dict[str, Dict], List[str]]:
+    """
+    Split this run's top tools into entries carried over from `previous` and names that
+    need search + enrichment + summarization. An entry is carried over when its canonical
+    name matches and it was refreshed within `trust_days`, so every tool is re-summarized
+    at least that often. The name is all that is known about a tool before searching it
+    (the articles it was found in change from week to week), so it is the only key.
+    Returns ({canonical name: entry}, names).
+    """
+    now = now or datetime.now()
+    previous_by_name = {canonical_tool_name(entry.get("name", "")): entry for entry in previous or []}
+    carried: Dict[str, Dict] = {}
+    refresh: List[str] = []
+    for name in tool_names:
+        key = canonical_tool_name(name)
+        entry = previous_by_name.get(key)
+        if entry is not None and _is_reusable(entry, now, trust_days):
+            carried[key] = entry
+        else:
+            refresh.append(name)
+    return carried, refresh
+
+
+def merge_results(tool_names: List[str], carried: Dict[str, Dict], summaries: List[Dict],
+                  now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Final results in `tool_names` order: carried entries as they were, new summaries
+    stamped with their refresh time. Tools without either
+    (no search results) are left out, as in a full run.
+    """
+    refreshed_at = (now or datetime.now()).strftime(TIMESTAMP_FORMAT)
+    fresh = {canonical_tool_name(summary.get("name", "")): summary for summary in summaries}
+    results = []
+    for name in tool_names:
+        key = canonical_tool_name(name)
+        if key in carried:
+            results.append(carried[key])
+        elif key in fresh:
+            results.append({**fresh[key], "refreshed_at": refreshed_at})
+    return results
@@ -0,0 +1,173 @@
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_DEPLOYMENT, AZURE_OPENAI_API_VERSION,
+    LLM_EXTRACTION_TEMPERATURE, LLM_SUMMARY_TEMPERATURE, LLM_MAX_TOKENS,
+    LLM_MAX_CONNECTIONS, LLM_TIMEOUT,
+    LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL
+)
+from .cache import SQLiteCache, make_cache_key
+
+T = TypeVar("T")
+
+# Constant for repeated '/openai/' string
+OPENAI_PATH = '/openai/'
+
+# Named parameter sets; callers ask for a profile instead of building their own client
+LLM_PROFILES: Dict[str, Dict] = {
+    "extraction": {"temperature": LLM_EXTRACTION_TEMPERATURE, "max_tokens": LLM_MAX_TOKENS},
+    "summarization": {"temperature": LLM_SUMMARY_TEMPERATURE, "max_tokens": LLM_MAX_TOKENS},
+}
+
+# Persistent cache of LLM replies keyed by deployment, sampling parameters and prompt
+LLM_CACHE = SQLiteCache(LLM_CACHE_PATH, "llm_responses", LLM_CACHE_MAX_ENTRIES) if LLM_CACHE_ENABLED else None
+
+_lock = threading.Lock()
+_client_lock = threading.Lock()
+_llms: Dict[Tuple, object] = {}
+_http_client = None
+
+
+def azure_base_endpoint(endpoint: str = AZURE_OPENAI_ENDPOINT) -> str:
+    """
+    Resource URL from AZURE_OPENAI_ENDPOINT, which may be a full chat-completions URL
+    (https://<resource>/openai/deployments/<name>/chat/completions?...).
+    """
+    return endpoint.split(OPENAI_PATH)[0].rstrip('/') + '/'
+
+
+def _get_http_client():
+    """One keep-alive httpx client shared by every LLM instance in the process."""
+    global _http_client
+    with _client_lock:
+        if _http_client is None:
+            import httpx
+            _http_client = httpx.Client(
+                timeout=LLM_TIMEOUT,
+                limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                    max_keepalive_connections=LLM_MAX_CONNECTIONS),
+            )
+        return _http_client
+
+
+def new_async_http_client():
+    """httpx.AsyncClient with the LLM pool limits, for one event loop (see build_llm)."""
+    import httpx
+    return httpx.AsyncClient(
+        timeout=LLM_TIMEOUT,
+        limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                            max_keepalive_connections=LLM_MAX_CONNECTIONS),
+    )
+
+
+def build_llm(profile: str = "extraction", deployment: str = AZURE_OPENAI_DEPLOYMENT,
+              http_async_client=None, **overrides):
+    """
+    New AzureChatOpenAI for a profile, on the shared sync HTTP client. Pass an
+    httpx.AsyncClient for `ainvoke` calls: async clients are tied to one event loop,
+    so async callers build a run-scoped instance instead of using `get_llm`.
+    """
+    from langchain_openai import AzureChatOpenAI
+    params = {**LLM_PROFILES[profile], **overrides}
+    if http_async_client is not None:
+        params["http_async_client"] = http_async_client
+    return AzureChatOpenAI(
+        openai_api_key=AZURE_OPENAI_API_KEY,
+        azure_endpoint=azure_base_endpoint(),
+        deployment_name=deployment,
+        api_version=AZURE_OPENAI_API_VERSION,
+        http_client=_get_http_client(),
+        **params,
+    )
+
+
+def get_llm(profile: str = "extraction", deployment: str = AZURE_OPENAI_DEPLOYMENT, **overrides):
+    """
+    Shared AzureChatOpenAI for a parameter profile ("extraction", "summarization") and
+    deployment, built once per process. Keyword overrides (e.g. max_tokens=1024) get
+    their own cached instance. All instances share one pooled HTTP client.
+    """
+    key = (deployment, profile, tuple(sorted(overrides.items())))
+    llm = _llms.get(key)
+    if llm is not None:
+        return llm
+    with _lock:
+        if key not in _llms:
+            _llms[key] = build_llm(profile, deployment, **overrides)
+        return _llms[key]
+
+
+def close() -> None:
+    """Drop cached clients and close their connections (used on application shutdown)."""
+    global _http_client
+    with _lock, _client_lock:
+        _llms.clear()
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+def response_cache_key(llm, prompt: str) -> str:
+    """
+    Cache key for a reply: deployment, sampling parameters and the prompt with
+    whitespace normalized, so cosmetic prompt edits don't invalidate entries.
+    """
+    return make_cache_key({
+        "deployment": getattr(llm, "deployment_name", None),
+        "params": {name: getattr(llm, name, None) for name in ("temperature", "max_tokens", "top_p")},
+        "prompt": " ".join(str(prompt).split()),
+    })
+
+
+def get_cached_response(llm, prompt: str, kind: str, cache: Optional[SQLiteCache] = LLM_CACHE) -> Optional[str]:
+    if cache is None:
+        return None
+    return cache.get(response_cache_key(llm, prompt), kind=kind)
+
+
+def store_response(llm, prompt: str, kind: str, content: str, ttl: float = LLM_CACHE_TTL,
+                   cache: Optional[SQLiteCache] = LLM_CACHE) -> None:
+    if cache is not None:
+        cache.set(response_cache_key(llm, prompt), content, ttl, kind=kind)
+
+
+def invoke_cached(llm, prompt: str, kind: str, parse: Callable[[str], T],
+                  cache: Optional[SQLiteCache] = LLM_CACHE) -> T:
+    """
+    `parse(llm.invoke(prompt).content)`, answered from the LLM cache when the same
+    prompt was sent before. Only replies that parse are stored; `parse` errors propagate.
+    """
+    cached = get_cached_response(llm, prompt, kind, cache)
+    if cached is not None:
+        try:
+            return parse(cached)
+        except Exception:
+            pass
+    content = llm.invoke(prompt).content
+    result = parse(content)
+    store_response(llm, prompt, kind, content, cache=cache)
+    return result
+
+
+async def ainvoke_cached(llm, prompt: str, kind: str, parse: Callable[[str], T],
+                         cache: Optional[SQLiteCache] = LLM_CACHE) -> T:
+    """Async variant of `invoke_cached` using `ainvoke`."""
+    cached = get_cached_response(llm, prompt, kind, cache)
+    if cached is not None:
+        try:
+            return parse(cached)
+        except Exception:
+            pass
+    content = (await llm.ainvoke(prompt)).content
+    result = parse(content)
+    store_response(llm, prompt, kind, content, cache=cache)
+    return result
+
+
+def cache_stats() -> Dict[str, Any]:
+    return LLM_CACHE.stats() if LLM_CACHE is not None else {}
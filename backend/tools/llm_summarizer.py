@@ -1,31 +1,44 @@
+import asyncio
 import json
 import logging
-from typing import Dict, List
-from langchain_openai import AzureChatOpenAI
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 from langchain_core.prompts import ChatPromptTemplate
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT
+from config import (
+    LLM_EXTRACTION_CHUNK_TOKENS, LLM_EXTRACTION_MAX_ARTICLE_TOKENS, LLM_EXTRACTION_WORKERS,
+    LLM_MAX_TOKENS, LLM_SUMMARY_MODE, LLM_SUMMARY_BATCH_TOKENS, LLM_SUMMARY_BATCH_SIZE,
+    LLM_SUMMARY_CONCURRENCY
+)
+from . import http_client, llm_client
+from .async_utils import run_sync
+from .chunking import chunk_texts, estimate_tokens
+from .gazetteer import TOOL_GAZETTEER
+from .llm_client import get_llm
 from .search_agent import SearchAgent
-from .extractor import extract_tool_info
+from .extractor import aextract_tool_info, extract_tool_info, extract_tool_infos
+
+def strip_code_fence(content: str) -> str:
+    """Remove surrounding triple backticks and an optional 'json' marker from an LLM reply."""
+    content = content.strip()
+    if content.startswith('```'):
+        content = content.lstrip('`').strip()
+        if content.lower().startswith('json'):
+            content = content[4:].strip()
+        if content.endswith('```'):
+            content = content[:-3].strip()
+    return content
 
-# Constant for repeated '/openai/' string
-OPENAI_PATH = '/openai/'
 
-def get_llm_tool_names_from_text(article_text: str) -> list:
+def get_llm_tool_names_from_text(article_text: str, llm=None) -> list:
     """
     Uses LLM to extract a list of AI tool names from the given article text.
     Returns a list of tool names.
     """
-    llm = AzureChatOpenAI(
-        openai_api_key=AZURE_OPENAI_API_KEY,
-        azure_endpoint=AZURE_OPENAI_ENDPOINT.split(OPENAI_PATH)[0] + '/',
-        deployment_name="gpt-4o-mini",
-        api_version="2025-01-01-preview",
-        temperature=0.2,
-        max_tokens=512,
-    )
+    if llm is None:
+        llm = get_llm("extraction")
     prompt_template = ChatPromptTemplate.from_messages([
         ("system", """You are an expert at extracting developer tool names from tech articles and news. 
         Extract a JSON list of unique tool names mentioned in the following text that would be useful for developers, including:
@@ -47,32 +60,110 @@ def get_llm_tool_names_from_text(article_text: str) -> list:
         ("user", "{article_text}")
     ])
     prompt = prompt_template.format(article_text=article_text[:12000])  # Truncate if too long
-    response = llm.invoke(prompt)
-    content = response.content.strip()
-    if content.startswith('```'):
-        content = content.lstrip('`').strip()
-        if content.lower().startswith('json'):
-            content = content[4:].strip()
-        if content.endswith('```'):
-            content = content[:-3].strip()
     try:
-        tool_names = json.loads(content)
-        if isinstance(tool_names, list):
-            return [str(t) for t in tool_names if isinstance(t, str)]
+        return llm_client.invoke_cached(llm, prompt, "tool_names", _parse_tool_names)
+    except ValueError:
         return []
-    except Exception:
+
+
+def _parse_tool_names(content: str) -> list:
+    tool_names = json.loads(strip_code_fence(content))
+    if not isinstance(tool_names, list):
+        raise ValueError("expected a JSON list of tool names")
+    return [str(t) for t in tool_names if isinstance(t, str)]
+
+
+def get_llm_tool_names_from_articles(article_texts: List[str], chunk_tokens: int = LLM_EXTRACTION_CHUNK_TOKENS,
+                                     max_workers: int = LLM_EXTRACTION_WORKERS) -> list:
+    """
+    Map-reduce version of get_llm_tool_names_from_text that reads every article instead
+    of the first 12000 characters of their concatenation. Articles are packed into
+    token-budgeted chunks, names are extracted from all chunks in parallel and merged
+    case-insensitively (first spelling wins). A name is listed once per chunk that
+    mentions it, in chunk order, so Counter() over the result ranks by how widely
+    a tool is mentioned.
+    Chunks where the tool gazetteer recognises the tools with high confidence skip the
+    LLM; names the LLM returns for the other chunks are added to the gazetteer.
+    """
+    chunks = chunk_texts(article_texts, chunk_tokens, LLM_EXTRACTION_MAX_ARTICLE_TOKENS)
+    if not chunks:
+        return []
+    llm = get_llm("extraction")
+    gazetteer_hits = []
+
+    logging.info(f"Extracting tool names from {len(article_texts)} articles in {len(chunks)} chunks")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        results = list(executor.map(lambda chunk: extract_chunk_tool_names(chunk, llm, gazetteer_hits), chunks))
+    finish_chunk_extraction(len(gazetteer_hits), len(chunks))
+    return ToolNameMerger().add_all(results)
+
+
+def extract_chunk_tool_names(chunk: str, llm, gazetteer_hits: Optional[list] = None) -> list:
+    """
+    Map step of `get_llm_tool_names_from_articles` for one chunk: the gazetteer's names
+    when it is confident about the chunk (appended to `gazetteer_hits`), otherwise the
+    LLM's, which the gazetteer then learns. Errors give an empty list.
+    """
+    if TOOL_GAZETTEER is not None:
+        match = TOOL_GAZETTEER.match(chunk)
+        if TOOL_GAZETTEER.is_confident(match):
+            if gazetteer_hits is not None:
+                gazetteer_hits.append(chunk)
+            return match.known
+    try:
+        names = get_llm_tool_names_from_text(chunk, llm=llm)
+    except Exception as e:
+        logging.error(f"Tool name extraction failed for a chunk: {e}")
         return []
+    if TOOL_GAZETTEER is not None:
+        TOOL_GAZETTEER.learn(names, chunk)
+    return names
+
+
+def finish_chunk_extraction(gazetteer_hit_count: int, chunk_count: int) -> None:
+    """Log gazetteer use and persist what it learned during an extraction pass."""
+    if TOOL_GAZETTEER is None:
+        return
+    logging.info(f"Gazetteer handled {gazetteer_hit_count}/{chunk_count} chunks without the LLM "
+                 f"({len(TOOL_GAZETTEER)} known tools)")
+    try:
+        TOOL_GAZETTEER.save()
+    except OSError as e:
+        logging.error(f"Could not save tool gazetteer: {e}")
+
+
+class ToolNameMerger:
+    """
+    Reduce step of `get_llm_tool_names_from_articles`: per-chunk name lists, added in
+    chunk order, merged case-insensitively (first spelling wins, once per chunk).
+    """
+
+    def __init__(self):
+        self.spellings: Dict[str, str] = {}
+        self.merged: List[str] = []
+
+    def add(self, names: list) -> List[str]:
+        """Merge one chunk's names; returns the names it contributed."""
+        seen_in_chunk = set()
+        added = []
+        for name in names:
+            name = name.strip()
+            key = name.casefold()
+            if not key or key in seen_in_chunk:
+                continue
+            seen_in_chunk.add(key)
+            added.append(self.spellings.setdefault(key, name))
+        self.merged.extend(added)
+        return added
+
+    def add_all(self, results: List[list]) -> List[str]:
+        for names in results:
+            self.add(names)
+        return self.merged
 
 
 def make_llm_summarize_node():
-    llm = AzureChatOpenAI(
-        openai_api_key=AZURE_OPENAI_API_KEY,
-        azure_endpoint=AZURE_OPENAI_ENDPOINT.split(OPENAI_PATH)[0] + '/',
-        deployment_name="gpt-4o-mini",
-        api_version="2025-01-01-preview",
-        temperature=0.7,
-        max_tokens=512,
-    )
+    llm = get_llm("summarization")
     prompt_template = ChatPromptTemplate.from_messages([
         ("system", """You are an expert analyst of developer tools and technologies. 
         Summarize the following tool/technology with a focus on its relevance for developers, programmers, and technical teams.
@@ -100,14 +191,7 @@ def make_llm_summarize_node():
             try:
                 response = llm.invoke(prompt)
                 logging.info(f"LLM response for tool {tool.get('website', '')}: {response.content}")
-                # Remove triple backticks and optional 'json' marker
-                content = response.content.strip()
-                if content.startswith('```'):
-                    content = content.lstrip('`').strip()
-                    if content.lower().startswith('json'):
-                        content = content[4:].strip()
-                    if content.endswith('```'):
-                        content = content[:-3].strip()
+                content = strip_code_fence(response.content)
                 parsed = json.loads(content)
                 summaries.append({
                     "summary": parsed.get("summary", ""),
@@ -130,24 +214,7 @@ def make_llm_summarize_node():
 
 # New function: summarize top tools by searching and LLM summarization
 
-def summarize_top_tools(tool_names, search_agent=None, llm=None):
-    """
-    For each tool name, fetch details (single search call), then summarize with LLM (single call per tool).
-    Returns a list of summaries.
-    """
-    if search_agent is None:
-        search_agent = SearchAgent()
-    if llm is None:
-        llm = AzureChatOpenAI(
-            openai_api_key=AZURE_OPENAI_API_KEY,
-            azure_endpoint=AZURE_OPENAI_ENDPOINT.split('/openai/')[0] + '/',
-            deployment_name="gpt-4o-mini",
-            api_version="2025-01-01-preview",
-            temperature=0.7,
-            max_tokens=512,
-        )
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", """You are an expert analyst of developer tools and AI technologies. 
+SUMMARY_SYSTEM_PROMPT = """You are an expert analyst of developer tools and AI technologies. 
         Summarize the following AI tool with a focus on its relevance for developers, programmers, and technical teams.
         
         Return a JSON with:
@@ -155,39 +222,245 @@ def summarize_top_tools(tool_names, search_agent=None, llm=None):
         - 'bullets': 3-4 key features focused on development use cases
         
         Focus on aspects like: coding assistance, development workflow, API capabilities, integration options, 
-        technical features, productivity benefits for developers."""),
+        technical features, productivity benefits for developers."""
+
+BATCH_SUMMARY_SYSTEM_PROMPT = """You are an expert analyst of developer tools and AI technologies. 
+        You receive a JSON array of AI tools, each with a 'key'. Summarize every tool with a focus on its
+        relevance for developers, programmers, and technical teams.
+        
+        Return only a JSON array with one object per tool, in any order:
+        - 'key': the tool's key, unchanged
+        - 'name': the tool's name
+        - 'summary': 1-2 sentence summary highlighting developer benefits
+        - 'bullets': 3-4 key features focused on development use cases
+        
+        Focus on aspects like: coding assistance, development workflow, API capabilities, integration options, 
+        technical features, productivity benefits for developers."""
+
+
+def _summary_record(tool_name: str, tool_info: Dict, parsed: Dict) -> Dict:
+    return {
+        "name": tool_name,
+        "summary": parsed.get("summary", ""),
+        "bullets": parsed.get("bullets", []),
+        "category": tool_info.get("category", ""),
+        "website": tool_info.get("website", "")
+    }
+
+
+FAILED_SUMMARY = "LLM summarization failed."
+
+
+def _failed_summary(tool_name: str, tool_info: Dict) -> Dict:
+    return {
+        "name": tool_name,
+        "summary": FAILED_SUMMARY,
+        "bullets": [],
+        "category": tool_info.get("category", ""),
+        "website": tool_info.get("website", "")
+    }
+
+
+def _report(on_summary: Optional[Callable[[Dict], None]], record: Dict) -> Dict:
+    """Pass a finished summary to `on_summary` (failed ones are not reported) and return it."""
+    if on_summary is not None and record["summary"] != FAILED_SUMMARY:
+        on_summary(record)
+    return record
+
+
+def _single_summary_prompt(tool_info: Dict) -> str:
+    prompt_template = ChatPromptTemplate.from_messages([
+        ("system", SUMMARY_SYSTEM_PROMPT),
         ("user", "{tool_data}")
     ])
-    summaries = []
-    for tool_name in tool_names:
-        search_results = search_agent.search_tool(tool_name)
-        if not search_results:
+    return prompt_template.format(tool_data=str(tool_info))
+
+
+def _parse_summary(content: str) -> Dict:
+    parsed = json.loads(strip_code_fence(content))
+    if not isinstance(parsed, dict):
+        raise ValueError("expected a JSON object")
+    return parsed
+
+
+def summarize_tool(tool_name: str, tool_info: Dict, llm) -> Dict:
+    """
+    Summarize one tool with its own LLM request. A tool whose extracted info is unchanged
+    since an earlier run gets its summary from the LLM cache.
+    """
+    try:
+        parsed = llm_client.invoke_cached(llm, _single_summary_prompt(tool_info), "summary", _parse_summary)
+        return _summary_record(tool_name, tool_info, parsed)
+    except Exception:
+        return _failed_summary(tool_name, tool_info)
+
+
+async def asummarize_tool(tool_name: str, tool_info: Dict, llm) -> Dict:
+    """Async variant of `summarize_tool` using `ainvoke`."""
+    try:
+        parsed = await llm_client.ainvoke_cached(llm, _single_summary_prompt(tool_info), "summary", _parse_summary)
+        return _summary_record(tool_name, tool_info, parsed)
+    except Exception:
+        return _failed_summary(tool_name, tool_info)
+
+
+def make_summary_batches(items: List[Dict], budget_tokens: int = LLM_SUMMARY_BATCH_TOKENS,
+                         max_size: int = LLM_SUMMARY_BATCH_SIZE) -> List[List[Dict]]:
+    """Split keyed tool records into consecutive batches that fit a prompt token budget."""
+    batches: List[List[Dict]] = []
+    current: List[Dict] = []
+    used = 0
+    for item in items:
+        cost = estimate_tokens(json.dumps(item, ensure_ascii=False))
+        if current and (used + cost > budget_tokens or len(current) >= max_size):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def summarize_tool_batch(batch: List[Dict], llm) -> Dict[str, Dict]:
+    """
+    Summarize several keyed tool records in one LLM request. Returns {key: parsed summary}
+    for the items the reply covered with a usable summary; missing or malformed items are
+    left out for the caller to retry one by one.
+    """
+    prompt_template = ChatPromptTemplate.from_messages([
+        ("system", BATCH_SUMMARY_SYSTEM_PROMPT),
+        ("user", "{tools_json}")
+    ])
+    prompt = prompt_template.format(tools_json=json.dumps(batch, ensure_ascii=False))
+    try:
+        response = llm.invoke(prompt)
+        parsed = json.loads(strip_code_fence(response.content))
+    except Exception as e:
+        logging.error(f"Batched summarization of {len(batch)} tools failed: {e}")
+        return {}
+    if isinstance(parsed, dict):
+        # Some replies wrap the array, e.g. {"tools": [...]}
+        parsed = next((value for value in parsed.values() if isinstance(value, list)), [])
+    if not isinstance(parsed, list):
+        return {}
+
+    keys = {item["key"] for item in batch}
+    keys_by_name = {str(item["name"]).casefold(): item["key"] for item in batch}
+    summaries = {}
+    for entry in parsed:
+        if not isinstance(entry, dict) or not isinstance(entry.get("summary"), str) or not entry["summary"]:
             continue
-        tool_info = extract_tool_info(search_results[0])
-        prompt = prompt_template.format(tool_data=str(tool_info))
-        try:
-            response = llm.invoke(prompt)
-            content = response.content.strip()
-            if content.startswith('```'):
-                content = content.lstrip('`').strip()
-                if content.lower().startswith('json'):
-                    content = content[4:].strip()
-                if content.endswith('```'):
-                    content = content[:-3].strip()
-            parsed = json.loads(content)
-            summaries.append({
-                "name": tool_name,
-                "summary": parsed.get("summary", ""),
-                "bullets": parsed.get("bullets", []),
-                "category": tool_info.get("category", ""),
-                "website": tool_info.get("website", "")
-            })
-        except Exception:
-            summaries.append({
-                "name": tool_name,
-                "summary": "LLM summarization failed.",
-                "bullets": [],
-                "category": tool_info.get("category", ""),
-                "website": tool_info.get("website", "")
-            })
+        key = str(entry.get("key", ""))
+        if key not in keys:
+            key = keys_by_name.get(str(entry.get("name", "")).casefold())
+        if key is not None and key not in summaries:
+            summaries[key] = entry
     return summaries
+
+
+def search_and_summarize(tool_name: str, search_agent=None, llm=None, documents=None) -> Optional[Dict]:
+    """
+    One tool's search -> enrich -> summarize chain with blocking calls (see
+    `asummarize_top_tools` for the async form). Returns None if the search finds nothing.
+    """
+    search_agent = search_agent or SearchAgent()
+    search_results = search_agent.search_tool(tool_name)
+    if not search_results:
+        return None
+    tool_info = extract_tool_info(search_results[0], None, documents)
+    return summarize_tool(tool_name, tool_info, llm or get_llm("summarization"))
+
+
+def summarize_top_tools(tool_names, search_agent=None, llm=None, documents=None,
+                        on_summary: Optional[Callable[[Dict], None]] = None):
+    """
+    For each tool name, fetch details (single search call), then summarize with the LLM.
+    Searches run concurrently and all websites' metadata is fetched in one concurrent batch,
+    reusing pages already in the run's DocumentStore (`documents`) when given.
+    With LLM_SUMMARY_MODE=batch (default) several tools share one request, split by token
+    budget; tools a batch reply does not cover are summarized one by one.
+    LLM_SUMMARY_MODE=async runs `asummarize_top_tools` instead.
+    `on_summary` is called with each successful summary as soon as it is made
+    (e.g. to checkpoint it).
+    Returns a list of summaries.
+    """
+    if LLM_SUMMARY_MODE == "async":
+        return run_sync(asummarize_top_tools(tool_names, search_agent=search_agent, llm=llm, documents=documents,
+                                             on_summary=on_summary))
+    if search_agent is None:
+        search_agent = SearchAgent()
+    single_llm = llm or get_llm("summarization")
+    with ThreadPoolExecutor(max_workers=max(1, min(search_agent.max_workers, len(tool_names) or 1))) as executor:
+        searches = list(executor.map(search_agent.search_tool, tool_names))
+    found = [(tool_name, results[0]) for tool_name, results in zip(tool_names, searches) if results]
+    tool_infos = extract_tool_infos([result for _, result in found], documents=documents)
+
+    batched: Dict[str, Dict] = {}
+    if LLM_SUMMARY_MODE == "batch" and len(found) > 1:
+        # Summaries are cached per tool (under the single-tool prompt), whichever way they were made
+        prompts = {str(index): _single_summary_prompt(tool_info) for index, tool_info in enumerate(tool_infos)}
+        items = []
+        for index, ((tool_name, _), tool_info) in enumerate(zip(found, tool_infos)):
+            cached = llm_client.get_cached_response(single_llm, prompts[str(index)], "summary")
+            try:
+                parsed = _parse_summary(cached) if cached is not None else None
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                # The tool's own name, not the title of the page it was found on
+                items.append({"key": str(index), **tool_info, "name": tool_name})
+            else:
+                batched[str(index)] = parsed
+                _report(on_summary, _summary_record(tool_name, tool_info, parsed))
+        cached_count = len(batched)
+        for batch in make_summary_batches(items):
+            # Room for every summary in the batch's reply
+            batch_llm = llm or get_llm("summarization", max_tokens=LLM_MAX_TOKENS * len(batch))
+            summaries_by_key = summarize_tool_batch(batch, batch_llm)
+            for key, entry in summaries_by_key.items():
+                llm_client.store_response(single_llm, prompts[key], "summary", json.dumps(entry, ensure_ascii=False))
+                _report(on_summary, _summary_record(found[int(key)][0], tool_infos[int(key)], entry))
+            batched.update(summaries_by_key)
+        logging.info(f"Summaries: {cached_count} cached, {len(batched) - cached_count} batched, "
+                     f"{len(found) - len(batched)} single of {len(found)} tools")
+
+    summaries = []
+    for index, ((tool_name, _), tool_info) in enumerate(zip(found, tool_infos)):
+        parsed = batched.get(str(index))
+        if parsed is not None:
+            summaries.append(_summary_record(tool_name, tool_info, parsed))
+        else:
+            summaries.append(_report(on_summary, summarize_tool(tool_name, tool_info, single_llm)))
+    logging.info(f"LLM cache: {llm_client.cache_stats()}")
+    return summaries
+
+
+async def asummarize_top_tools(tool_names, search_agent=None, llm=None, documents=None,
+                               concurrency: int = LLM_SUMMARY_CONCURRENCY,
+                               on_summary: Optional[Callable[[Dict], None]] = None):
+    """
+    Async version of `summarize_top_tools`: every tool runs its own search -> enrich ->
+    summarize chain, with at most `concurrency` chains in flight, so run time stays
+    roughly flat as the number of tools grows. Searches and website metadata use one
+    shared httpx.AsyncClient and LLM calls use `ainvoke`. Results keep the input
+    order; tools without search results are left out.
+    """
+    if search_agent is None:
+        search_agent = SearchAgent()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async with http_client.new_async_client() as client, llm_client.new_async_http_client() as llm_http:
+        if llm is None:
+            llm = llm_client.build_llm("summarization", http_async_client=llm_http)
+
+        async def run_chain(tool_name: str) -> Optional[Dict]:
+            async with semaphore:
+                search_results = await search_agent.asearch_tool(tool_name, client)
+                if not search_results:
+                    return None
+                tool_info = await aextract_tool_info(search_results[0], client, documents)
+                return _report(on_summary, await asummarize_tool(tool_name, tool_info, llm))
+
+        summaries = await asyncio.gather(*(run_chain(tool_name) for tool_name in tool_names))
+    return [summary for summary in summaries if summary is not None]
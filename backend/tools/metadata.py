@@ -0,0 +1,195 @@
+import os
+import re
+import sys
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    METADATA_MAX_BYTES, METADATA_PRICING_SCAN_CHARS, METADATA_CACHE_TTL,
+    METADATA_FETCH_DEADLINE, SEARCH_CACHE_ENABLED, SEARCH_CACHE_PATH, SEARCH_CACHE_MAX_ENTRIES
+)
+from . import http_client
+from .cache import SQLiteCache
+from .dedup import canonicalize_url
+from .fetcher import fetch_all, summarize_fetch_stats
+
+PRICING_WORDS = re.compile(r"free|trial|pricing|\$|price|subscription")
+TAG = re.compile(r"<[^>]*>")
+# Inline scripts, styles and comments are not visible text (jQuery's `$(` is not a price);
+# an element cut off by the scan window runs to its end
+NON_VISIBLE = re.compile(
+    r"<(script|style|noscript|template)\b[^>]*>.*?(?:</\1\s*>|$)|<!--.*?(?:-->|$)", re.IGNORECASE | re.DOTALL
+)
+
+# Stored next to the search responses; entries are small
+METADATA_CACHE = SQLiteCache(SEARCH_CACHE_PATH, "page_metadata", SEARCH_CACHE_MAX_ENTRIES) \
+    if SEARCH_CACHE_ENABLED else None
+
+
+class PageMetadata(NamedTuple):
+    title: Optional[str]
+    description: Optional[str]
+    has_pricing: bool
+
+
+class _HeadParser(HTMLParser):
+    """Collects <title> and <meta name=description>, and stops at </head> or <body>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title: Optional[str] = None
+        self.description: Optional[str] = None
+        self.head_end: Optional[Tuple[int, int]] = None
+        self._in_title = False
+        self._title_parts: List[str] = []
+
+    def _finish(self) -> None:
+        if self.head_end is None:
+            self.head_end = self.getpos()
+
+    def handle_starttag(self, tag, attrs):
+        if self.head_end is not None:
+            return
+        if tag == "title" and self.title is None:
+            self._in_title = True
+        elif tag == "meta":
+            attributes = dict(attrs)
+            if (attributes.get("name") or "").lower() == "description" and attributes.get("content") \
+                    and self.description is None:
+                self.description = attributes["content"].strip()
+        elif tag == "body":
+            self._finish()
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = "".join(self._title_parts).strip() or None
+        elif tag == "head":
+            self._finish()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title_parts.append(data)
+
+
+def _offset(html: str, position: Tuple[int, int]) -> int:
+    """Convert an HTMLParser (line, column) position into a string offset."""
+    line, column = position
+    offset = 0
+    for _ in range(line - 1):
+        offset = html.index("\n", offset) + 1
+    return offset + column
+
+
+def parse_metadata(html: str, pricing_scan_chars: int = METADATA_PRICING_SCAN_CHARS) -> PageMetadata:
+    """
+    Read the title and meta description from the <head> only, then look for pricing words
+    in the visible text of at most `pricing_scan_chars` characters after it.
+    """
+    parser = _HeadParser()
+    # Feed in slices so parsing stops soon after the head instead of walking the whole page
+    step = 4096
+    for start in range(0, len(html), step):
+        parser.feed(html[start:start + step])
+        if parser.head_end is not None:
+            break
+    body_start = _offset(html, parser.head_end) if parser.head_end is not None else 0
+    window = html[body_start:body_start + pricing_scan_chars]
+    window = TAG.sub(" ", NON_VISIBLE.sub(" ", window)).lower()
+    return PageMetadata(parser.title, parser.description, bool(PRICING_WORDS.search(window)))
+
+
+class _HeadWindow:
+    """
+    `fetch_html` stop condition for `parse_metadata`: fed the decoded text piece by piece,
+    it says stop once the end of the head and the pricing scan window after it are in.
+    """
+    HEAD_END = re.compile(r"</head\s*>|<body[\s>]", re.IGNORECASE)
+    # Enough of the previous piece to find a marker split between two pieces
+    OVERLAP = 16
+
+    def __init__(self, pricing_scan_chars: int = METADATA_PRICING_SCAN_CHARS):
+        self.pricing_scan_chars = pricing_scan_chars
+        self.received = 0
+        self.head_end: Optional[int] = None
+        self._tail = ""
+
+    def __call__(self, text: str) -> bool:
+        if self.head_end is None:
+            match = self.HEAD_END.search(self._tail + text)
+            if match is not None:
+                self.head_end = self.received - len(self._tail) + match.end()
+            self._tail = (self._tail + text)[-self.OVERLAP:]
+        self.received += len(text)
+        return self.head_end is not None and self.received >= self.head_end + self.pricing_scan_chars
+
+
+def fetch_metadata(url: str, timeout: float = 5, cancel_event=None,
+                   cache: Optional[SQLiteCache] = METADATA_CACHE) -> Optional[PageMetadata]:
+    """
+    Metadata for one page: served from the cache when fresh, otherwise read from the first
+    METADATA_MAX_BYTES of the page. Returns None if the page could not be read.
+    """
+    value, _ = load_metadata(url, timeout, cancel_event, cache)
+    return value
+
+
+def load_metadata(url: str, timeout: float = 5, cancel_event=None,
+                  cache: Optional[SQLiteCache] = METADATA_CACHE) -> Tuple[Optional[PageMetadata], Optional[int]]:
+    """
+    fetch_metadata that also returns the HTTP status, in the shape fetch_all expects.
+    Only the head and the pricing scan window after it are downloaded. The cache is keyed
+    by canonical URL rather than by domain: results often live on shared hosts (github.com,
+    medium.com, dev.to), where one domain key would give every tool the first one's metadata;
+    for a tool's own site the URL is its homepage, so that is one entry per domain anyway.
+    """
+    key = canonicalize_url(url)
+    if cache is not None:
+        cached = cache.get(key, kind="metadata")
+        if cached is not None:
+            return PageMetadata(*cached), 200
+    page = http_client.fetch_html(url, timeout=timeout, max_bytes=METADATA_MAX_BYTES, cancel_event=cancel_event,
+                                  stop=_HeadWindow())
+    if page.text is None:
+        return None, page.status
+    metadata = parse_metadata(page.text)
+    if cache is not None:
+        cache.set(key, list(metadata), METADATA_CACHE_TTL, kind="metadata")
+    return metadata, page.status
+
+
+async def aload_metadata(url: str, client, timeout: float = 5,
+                        cache: Optional[SQLiteCache] = METADATA_CACHE) -> Tuple[Optional[PageMetadata], Optional[int]]:
+    """Async variant of `load_metadata` over an httpx.AsyncClient (see http_client.new_async_client)."""
+    key = canonicalize_url(url)
+    if cache is not None:
+        cached = cache.get(key, kind="metadata")
+        if cached is not None:
+            return PageMetadata(*cached), 200
+    page = await http_client.afetch_html(client, url, timeout=timeout, max_bytes=METADATA_MAX_BYTES,
+                                         stop=_HeadWindow())
+    if page.text is None:
+        return None, page.status
+    metadata = parse_metadata(page.text)
+    if cache is not None:
+        cache.set(key, list(metadata), METADATA_CACHE_TTL, kind="metadata")
+    return metadata, page.status
+
+
+def fetch_metadata_all(urls: List[str], timeout: float = 5, deadline: Optional[float] = METADATA_FETCH_DEADLINE,
+                       cache: Optional[SQLiteCache] = METADATA_CACHE, documents=None) -> Dict[str, PageMetadata]:
+    """
+    Fetch metadata for many pages concurrently (per-host caps, stage deadline).
+    With a run's DocumentStore, pages it already holds are not fetched again.
+    """
+    def fetch_one(url, cancel_event):
+        if documents is not None:
+            return documents.metadata(url, timeout=timeout, cancel_event=cancel_event)
+        return load_metadata(url, timeout, cancel_event, cache)
+
+    values, stats = fetch_all(urls, fetch_one, deadline=deadline)
+    if stats:
+        print(f"Fetched metadata for {len(values)}/{len(stats)} sites: {summarize_fetch_stats(stats)}")
+    return values
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    PAGE_CACHE_ENABLED, PAGE_CACHE_PATH, PAGE_CACHE_MAX_BYTES, PAGE_MAX_BYTES, TEXT_EXTRACTION_ENGINE
+)
+from . import http_client
+from .cache import sqlite_connection
+from .dedup import canonicalize_url
+from .http_client import FetchedPage, Timeout
+from .text_extraction import extract_text
+
+
+class CachedPage(NamedTuple):
+    url: str
+    content_type: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    text_engine: Optional[str]
+    text: Optional[str]
+    truncated: bool
+
+
+def content_hash(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8", errors="replace")).hexdigest()
+
+
+class PageCache:
+    """
+    On-disk cache of fetched HTML pages keyed by canonical URL.
+    Each entry keeps the body, its validators (ETag / Last-Modified), a content hash
+    and the text extracted from it. The total stored size is capped at `max_bytes`
+    with least-recently-used eviction. Safe to share between threads.
+    """
+
+    def __init__(self, path: str, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max(1, max_bytes)
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "key TEXT PRIMARY KEY, url TEXT, content_type TEXT, body TEXT NOT NULL, "
+                "etag TEXT, last_modified TEXT, content_hash TEXT NOT NULL, "
+                "text_engine TEXT, text TEXT, truncated INTEGER NOT NULL DEFAULT 0, "
+                "size INTEGER NOT NULL, fetched_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages (last_access)")
+
+    def _connect(self):
+        return sqlite_connection(self.path)
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT url, content_type, body, etag, last_modified, content_hash, text_engine, text, truncated "
+                "FROM pages WHERE key = ?", (canonicalize_url(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedPage(*row[:8], bool(row[8]))
+
+    def put(self, url: str, page: CachedPage) -> None:
+        """Store a page, evicting least recently used pages while over the byte cap."""
+        size = len(page.body.encode("utf-8", errors="replace")) \
+            + len((page.text or "").encode("utf-8", errors="replace"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, content_type, body, etag, last_modified, content_hash, "
+                "text_engine, text, truncated, size, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (canonicalize_url(url), page.url, page.content_type, page.body, page.etag, page.last_modified,
+                 page.content_hash, page.text_engine, page.text, int(page.truncated), size, now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Keep the most recently used pages whose running total fits in the cap
+        conn.execute(
+            "DELETE FROM pages WHERE key IN (SELECT key FROM ("
+            "SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key) AS running FROM pages"
+            ") WHERE running > ?)",
+            (self.max_bytes,),
+        )
+
+    def touch(self, url: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), canonicalize_url(url)))
+
+    def set_text(self, url: str, hash_: str, engine: str, text: str) -> None:
+        """Attach extracted text to a stored page, if it still has the same content."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE pages SET text_engine = ?, text = ?, size = size - LENGTH(CAST(COALESCE(text, '') AS BLOB)) "
+                "+ LENGTH(CAST(? AS BLOB)) WHERE key = ? AND content_hash = ?",
+                (engine, text, text, canonicalize_url(url), hash_),
+            )
+            self._evict(conn)
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM pages")
+
+    def stats(self) -> Dict:
+        with self._lock, self._connect() as conn:
+            pages, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+            return {"pages": pages, "bytes": size, **dict(sorted(self._counts.items()))}
+
+
+PAGE_CACHE = PageCache(PAGE_CACHE_PATH, PAGE_CACHE_MAX_BYTES) if PAGE_CACHE_ENABLED else None
+
+
+def _conditional_headers(cached: Optional[CachedPage]) -> Dict[str, str]:
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+def fetch_page(url: str, timeout: Optional[Timeout] = None, max_bytes: int = PAGE_MAX_BYTES,
+               cancel_event: Optional[threading.Event] = None,
+               cache: Optional[PageCache] = PAGE_CACHE) -> Tuple[FetchedPage, Optional[CachedPage]]:
+    """
+    Fetch an HTML page, revalidating a cached copy with a conditional GET.
+    A 304 is answered from disk. Returns the page (status 200 with the cached body on a 304)
+    and the cache entry now describing it, whose extracted text is reusable when present.
+    """
+    cached = cache.get(url) if cache is not None else None
+    page = http_client.fetch_html(url, timeout=timeout, max_bytes=max_bytes, cancel_event=cancel_event,
+                                  headers=_conditional_headers(cached) or None)
+    if cache is None:
+        return page, None
+
+    if page.status == 304 and cached is not None:
+        cache.touch(url)
+        cache.record("not_modified")
+        return FetchedPage(cached.url, 200, cached.content_type, cached.body, page.headers, cached.truncated), cached
+    if page.text is None:
+        cache.record("uncached")
+        return page, None
+
+    hash_ = content_hash(page.text)
+    unchanged = cached is not None and cached.content_hash == hash_
+    cache.record("unchanged" if unchanged else "changed" if cached is not None else "new")
+    entry = CachedPage(
+        page.url, page.content_type, page.text,
+        page.headers.get("ETag"), page.headers.get("Last-Modified"), hash_,
+        # Same bytes as last time: the extracted text is still valid
+        cached.text_engine if unchanged else None, cached.text if unchanged else None,
+        page.truncated,
+    )
+    cache.put(url, entry)
+    return page, entry
+
+
+def fetch_page_text(url: str, timeout: Optional[Timeout] = None, cancel_event: Optional[threading.Event] = None,
+                    engine: Optional[str] = None,
+                    cache: Optional[PageCache] = PAGE_CACHE) -> Tuple[Optional[str], FetchedPage]:
+    """
+    Plain text of an HTML page (None if it is not a usable page). When the page content
+    is unchanged since it was cached, the stored extraction is reused and nothing is parsed.
+    """
+    engine = engine or TEXT_EXTRACTION_ENGINE
+    page, entry = fetch_page(url, timeout=timeout, cancel_event=cancel_event, cache=cache)
+    if page.text is None:
+        return None, page
+    if entry is not None and entry.text is not None and entry.text_engine == engine:
+        return entry.text, page
+    text = extract_text(page.text, engine)
+    if cache is not None and entry is not None:
+        cache.set_text(url, entry.content_hash, engine, text)
+    return text, page
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to cap the request rate against an external API.
+    Tokens refill continuously at `rate` per second up to `capacity`, so a burst of
+    up to `capacity` requests can start at once and the rest are spaced out.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available. Returns 0.0 on success, otherwise the
+        number of seconds until the next token will be available.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available. Returns the time spent waiting in seconds.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self) -> float:
+        """
+        Async variant of `acquire` that sleeps without blocking the event loop.
+        Shares tokens with threaded callers.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay <= 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
@@ -0,0 +1,142 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+
+
+class RetryBudget:
+    """
+    Thread-safe retry budget shared by every request in one run, so a burst of
+    rate limiting costs bounded extra latency instead of retrying forever.
+    Also records how many retries were made and how long we waited for them.
+    """
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max(0, max_retries)
+        self.retries = 0
+        self.exhausted = 0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.retries >= self.max_retries:
+                self.exhausted += 1
+                return False
+            self.retries += 1
+            return True
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds += seconds
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "retry_budget": self.max_retries,
+                "budget_exhausted": self.exhausted,
+                "retry_wait_seconds": round(self.wait_seconds, 2),
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given either as delta-seconds or an HTTP-date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float,
+                  retry_after: Optional[float] = None) -> Optional[float]:
+    """
+    Exponential backoff with full jitter, capped at `max_delay`. A server-provided
+    Retry-After is a floor, with a little jitter on top so concurrent callers don't
+    wake up together; if it asks for more than `max_delay`, returns None: retrying
+    any sooner would only be rejected again, so the caller should give up instead.
+    """
+    if retry_after is not None:
+        if retry_after > max_delay:
+            return None
+        return retry_after + random.uniform(0, base_delay)
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _retry_delay(response, attempt: int, budget: RetryBudget, max_attempts: int,
+                 base_delay: float, max_delay: float, label: str) -> Optional[float]:
+    """How long to wait before attempt `attempt + 1` after a retryable response, or None to give up."""
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    delay = backoff_delay(attempt - 1, base_delay, max_delay, retry_after)
+    if delay is None:
+        print(f"Giving up on {label} after {attempt} attempt(s) (status {response.status_code}): "
+              f"Retry-After {retry_after:.0f}s is longer than the {max_delay:.0f}s we wait")
+        return None
+    if attempt >= max_attempts or not budget.try_spend():
+        print(f"Giving up on {label} after {attempt} attempt(s) (status {response.status_code})")
+        return None
+    print(f"{label} got status {response.status_code}, retrying in {delay:.1f}s "
+          f"(attempt {attempt + 1}/{max_attempts})")
+    return delay
+
+
+def request_with_retry(send: Callable[[], object], budget: RetryBudget, max_attempts: int,
+                       base_delay: float, max_delay: float,
+                       retry_statuses: Iterable[int] = RETRYABLE_STATUSES,
+                       label: str = "request"):
+    """
+    Call `send()` until it returns a non-retryable response, the attempts run out,
+    the shared budget is exhausted or the server's Retry-After is longer than
+    `max_delay`. Returns the last response.
+    """
+    retry_statuses = tuple(retry_statuses)
+    attempt = 0
+    while True:
+        response = send()
+        if response.status_code not in retry_statuses:
+            return response
+        attempt += 1
+        delay = _retry_delay(response, attempt, budget, max_attempts, base_delay, max_delay, label)
+        if delay is None:
+            return response
+        time.sleep(delay)
+        budget.record_wait(delay)
+
+
+async def arequest_with_retry(send: Callable[[], Awaitable[object]], budget: RetryBudget, max_attempts: int,
+                              base_delay: float, max_delay: float,
+                              retry_statuses: Iterable[int] = RETRYABLE_STATUSES,
+                              label: str = "request"):
+    """
+    Async variant of `request_with_retry`: awaits `send()` and backs off with asyncio.sleep.
+    """
+    retry_statuses = tuple(retry_statuses)
+    attempt = 0
+    while True:
+        response = await send()
+        if response.status_code not in retry_statuses:
+            return response
+        attempt += 1
+        delay = _retry_delay(response, attempt, budget, max_attempts, base_delay, max_delay, label)
+        if delay is None:
+            return response
+        await asyncio.sleep(delay)
+        budget.record_wait(delay)
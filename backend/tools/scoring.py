@@ -0,0 +1,237 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+GITHUB_DOMAIN = 'github.com'
+
+# Trusted domains for content quality (weighted scoring with diversity promotion).
+# Order matters: the first domain contained in the URL wins.
+TRUSTED_DOMAINS = {
+    # Tier 1: Official company sources (highest trust)
+    'openai.com': 10, 'anthropic.com': 10, 'google.com': 9, 'microsoft.com': 9,
+    'meta.com': 8, 'apple.com': 9, 'amazon.com': 8, 'netflix.com': 7,
+    'huggingface.co': 8, 'pytorch.org': 8, 'tensorflow.org': 8,
+
+    # Tier 2: Tech news and communities (high trust)
+    'techcrunch.com': 8, 'theverge.com': 8, 'arstechnica.com': 8,
+    'venturebeat.com': 7, 'wired.com': 7, 'hackernews.com': 7,
+    'engadget.com': 6, 'zdnet.com': 6, 'cnet.com': 6,
+
+    # Tier 3: Developer platforms (balanced scoring)
+    'stackoverflow.com': 7, 'dev.to': 6, 'medium.com': 5,
+    'producthunt.com': 6, 'kaggle.com': 6, 'reddit.com': 5,
+
+    # Tier 4: Specialized tech platforms
+    'npmjs.com': 6, 'pypi.org': 6, 'crates.io': 6, 'packagist.org': 6,
+    'dockerhub.com': 6, 'kubernetes.io': 7, 'apache.org': 7,
+
+    # Reduced GitHub scoring to promote diversity
+    GITHUB_DOMAIN: 4  # Reduced from 9 to 4 to allow other sources
+}
+
+# Developer/Tech relevance indicators (broad tech ecosystem)
+RELEVANCE_INDICATORS = {
+    # Trending and viral indicators
+    'trending': 4, 'viral': 4, 'popular': 3, 'breakthrough': 4,
+    'game-changer': 4, 'revolutionary': 3, 'innovative': 3,
+
+    # AI and ML (subset of broader tech)
+    'ai': 2, 'artificial intelligence': 2, 'machine learning': 2,
+    'neural network': 2, 'deep learning': 2, 'llm': 2, 'model': 2,
+
+    # Web development and frameworks
+    'react': 2, 'vue': 2, 'angular': 2, 'nodejs': 2, 'typescript': 2,
+    'javascript': 2, 'python': 2, 'rust': 2, 'go': 2, 'kotlin': 2,
+
+    # Developer tools and platforms
+    'developer': 3, 'programming': 2, 'code': 2, 'api': 3,
+    'open source': 3, 'github': 2, 'framework': 2, 'library': 2,
+    'vscode': 2, 'docker': 2, 'kubernetes': 2, 'cloud': 2,
+
+    # DevOps and infrastructure
+    'devops': 2, 'ci/cd': 2, 'deployment': 2, 'microservices': 2,
+    'serverless': 2, 'aws': 2, 'azure': 2, 'gcp': 2,
+
+    # Mobile and emerging tech
+    'mobile': 2, 'ios': 2, 'android': 2, 'flutter': 2, 'react native': 2,
+    'blockchain': 2, 'web3': 2, 'cryptocurrency': 2, 'nft': 1,
+
+    # Database and backend
+    'database': 2, 'sql': 2, 'nosql': 2, 'mongodb': 2, 'postgresql': 2,
+    'redis': 2, 'elasticsearch': 2, 'graphql': 2, 'rest api': 2,
+
+    # Freshness and news indicators
+    'announcement': 3, 'launch': 3, 'release': 3, 'beta': 2,
+    'new': 2, 'latest': 2, 'just': 3, 'breaking': 4,
+
+    # General tech ecosystem
+    'startup': 2, 'funding': 2, 'acquisition': 2, 'partnership': 2,
+    'innovation': 2, 'technology': 1, 'tech': 1, 'software': 1
+}
+
+# Freshness indicators bonus (quality)
+QUALITY_FRESHNESS_TERMS = ['new', 'just', 'today', 'this week', 'breaking', 'latest']
+QUALITY_FRESHNESS_BONUS = 2
+
+# Negative indicators (reduce quality score)
+NEGATIVE_TERMS = ['casino', 'gambling', 'adult', 'loan', 'insurance', 'diet']
+NEGATIVE_PENALTY = 10
+
+# Minimum content length check
+MIN_CONTENT_LENGTH = 20
+SHORT_CONTENT_PENALTY = 5
+
+QUALITY_THRESHOLD = 5
+
+# High-value keywords for ranking (higher scores)
+HIGH_VALUE_KEYWORDS = {
+    'announcement': 3.0, 'launched': 3.0, 'released': 3.0, 'new': 2.0,
+    'developer': 2.5, 'api': 2.5, 'open source': 3.0, 'github': 2.0,
+    'ai tool': 3.0, 'artificial intelligence': 2.0, 'machine learning': 2.0,
+    'beta': 2.5, 'copilot': 2.5, 'assistant': 2.0, 'framework': 2.0
+}
+
+# Domain authority scores for ranking. Order matters as for TRUSTED_DOMAINS.
+DOMAIN_AUTHORITY_SCORES = {
+    'openai.com': 5.0, 'anthropic.com': 5.0, 'google.com': 4.0,
+    'microsoft.com': 4.0, 'github.com': 4.0, 'techcrunch.com': 3.5,
+    'theverge.com': 3.0, 'arstechnica.com': 3.0, 'hackernews.com': 3.0
+}
+
+# Freshness bonus for ranking (if we can determine recency)
+RELEVANCE_FRESHNESS_TERMS = ['today', 'yesterday', 'this week', 'just', 'breaking']
+RELEVANCE_FRESHNESS_BONUS = 2.0
+
+
+def trie_regex(terms: Iterable[str]) -> str:
+    """
+    Build a regex from a trie of `terms` so shared prefixes are matched once.
+    Continuations are greedy, so at any position the longest matching term wins.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node: Dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return '(?:' + body + ')?'
+        return body
+
+    return emit(trie)
+
+
+class TermMatcher:
+    """
+    Reports which of a fixed set of terms occur as substrings of a text, with the
+    same semantics as `term in text` for each term, in a single left-to-right scan
+    with a compiled trie regex.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = list(dict.fromkeys(term for term in terms if term))
+        self._search = re.compile(trie_regex(self.terms)).search
+        # A match implies every term contained in it is present too
+        self._contained = {
+            term: frozenset(other for other in self.terms if other in term)
+            for term in self.terms
+        }
+        # After matching a term, resume at the first offset where another term could
+        # start inside it and run past its end; terms wholly inside it are covered above
+        self._resume = {term: self._resume_offset(term) for term in self.terms}
+
+    def _resume_offset(self, term: str) -> int:
+        for offset in range(1, len(term)):
+            tail = term[offset:]
+            if any(other.startswith(tail) and len(other) > len(tail) for other in self.terms):
+                return offset
+        return len(term)
+
+    def find(self, text: str) -> Set[str]:
+        found = set()
+        if not self.terms:
+            return found
+        search = self._search
+        match = search(text)
+        while match:
+            term = match.group()
+            found |= self._contained[term]
+            match = search(text, match.start() + self._resume[term])
+        return found
+
+
+class ContentScore(NamedTuple):
+    quality: int
+    relevance: float
+
+    @property
+    def is_quality(self) -> bool:
+        return self.quality >= QUALITY_THRESHOLD
+
+
+class ContentScorer:
+    """
+    Computes the quality score (used to filter results) and the relevance score
+    (used to rank them) from one pass over the snippet and one over the URL.
+    Lookup tables are compiled once; use the shared `CONTENT_SCORER` instance.
+    """
+
+    def __init__(self):
+        self._text_matcher = TermMatcher(
+            list(RELEVANCE_INDICATORS) + QUALITY_FRESHNESS_TERMS + NEGATIVE_TERMS
+            + list(HIGH_VALUE_KEYWORDS) + RELEVANCE_FRESHNESS_TERMS
+        )
+        self._url_matcher = TermMatcher(list(TRUSTED_DOMAINS) + list(DOMAIN_AUTHORITY_SCORES))
+        self._quality_freshness = frozenset(QUALITY_FRESHNESS_TERMS)
+        self._negative = frozenset(NEGATIVE_TERMS)
+        self._relevance_freshness = frozenset(RELEVANCE_FRESHNESS_TERMS)
+
+    @staticmethod
+    def _first_in_order(table: Dict, found: Set[str]):
+        for key, value in table.items():
+            if key in found:
+                return value
+        return 0
+
+    @lru_cache(maxsize=4096)
+    def _score_text(self, snippet: str, url: str) -> ContentScore:
+        terms = self._text_matcher.find(snippet)
+        domains = self._url_matcher.find(url)
+
+        quality = self._first_in_order(TRUSTED_DOMAINS, domains) if domains else 0
+        relevance = 0.0
+        for term in terms:
+            quality += RELEVANCE_INDICATORS.get(term, 0)
+            relevance += HIGH_VALUE_KEYWORDS.get(term, 0.0)
+        if not terms.isdisjoint(self._quality_freshness):
+            quality += QUALITY_FRESHNESS_BONUS
+        if not terms.isdisjoint(self._negative):
+            quality -= NEGATIVE_PENALTY
+        if len(snippet.strip()) < MIN_CONTENT_LENGTH:
+            quality -= SHORT_CONTENT_PENALTY
+
+        if domains:
+            relevance += self._first_in_order(DOMAIN_AUTHORITY_SCORES, domains)
+        if not terms.isdisjoint(self._relevance_freshness):
+            relevance += RELEVANCE_FRESHNESS_BONUS
+
+        return ContentScore(quality, relevance)
+
+    def score(self, result: Dict) -> ContentScore:
+        """Score a single search result."""
+        snippet = (result.get('snippet', '') + ' ' + result.get('name', '')).lower()
+        url = result.get('url', '').lower()
+        return self._score_text(snippet, url)
+
+    def score_batch(self, results: List[Dict]) -> List[ContentScore]:
+        """Score a whole result list, preserving order."""
+        return [self.score(result) for result in results]
+
+
+CONTENT_SCORER = ContentScorer()
@@ -3,27 +3,154 @@ import json
 import os
 import sys
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import LANGSEARCH_API_KEY, LANGSEARCH_SEARCH_ENDPOINT
+from config import (
+    LANGSEARCH_API_KEY, LANGSEARCH_SEARCH_ENDPOINT,
+    LANGSEARCH_REQUESTS_PER_SECOND, LANGSEARCH_BURST, LANGSEARCH_MAX_WORKERS,
+    LANGSEARCH_MAX_ATTEMPTS, LANGSEARCH_RETRY_BUDGET,
+    LANGSEARCH_RETRY_BASE_DELAY, LANGSEARCH_RETRY_MAX_DELAY,
+    SEARCH_CACHE_ENABLED, SEARCH_CACHE_PATH, SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_TTL_STRATEGIC, SEARCH_CACHE_TTL_TOOL, NEAR_DUPLICATE_THRESHOLD
+)
+from . import http_client
+from .cache import SQLiteCache, make_cache_key
+from .dedup import NearDuplicateIndex, TopK, canonicalize_url, normalize_title
+from .rate_limiter import TokenBucket
+from .retry import RetryBudget, arequest_with_retry, request_with_retry
+from .scoring import CONTENT_SCORER, GITHUB_DOMAIN
+
+# Process-wide limiter: LangSearch rate limits per API key, not per SearchAgent
+LANGSEARCH_RATE_LIMITER = TokenBucket(LANGSEARCH_REQUESTS_PER_SECOND, LANGSEARCH_BURST)
+
+# Persistent cache of raw LangSearch responses keyed by the full request body
+SEARCH_CACHE = SQLiteCache(SEARCH_CACHE_PATH, "search_responses", SEARCH_CACHE_MAX_ENTRIES) \
+    if SEARCH_CACHE_ENABLED else None
+SEARCH_CACHE_TTLS = {"strategic": SEARCH_CACHE_TTL_STRATEGIC, "tool": SEARCH_CACHE_TTL_TOOL}
 
 class SearchAgent:
     # Class constants
-    GITHUB_DOMAIN = 'github.com'
-    
-    def search_tool(self, tool_name: str) -> List[Dict]:
+    GITHUB_DOMAIN = GITHUB_DOMAIN
+    TOP_RESULTS = 15
+
+    # Strategic diverse queries that capture trending developer tech from various ecosystems
+    STRATEGIC_QUERIES = [
+        # AI and ML tools (beyond GitHub)
+        "new AI developer tools 2025 trending -github.com programming artificial intelligence",
+        
+        # Web development frameworks and libraries
+        "new web development framework 2025 react vue angular trending -github.com",
+        
+        # Mobile development and cross-platform tools
+        "new mobile development tools 2025 flutter react-native kotlin swift trending",
+        
+        # DevOps and cloud tools
+        "new devops tools 2025 kubernetes docker cloud deployment trending -github.com",
+        
+        # Programming languages and compilers
+        "new programming language 2025 trending rust go python typescript compiler",
+        
+        # Database and backend innovations
+        "new database technology 2025 trending nosql sql mongodb postgresql redis",
+        
+        # Developer productivity and IDEs
+        "new developer productivity tools 2025 IDE editor vscode trending -github.com",
+        
+        # Security and testing tools
+        "new cybersecurity tools 2025 testing framework developer trending -github.com"
+    ]
+
+    def __init__(self, rate_limiter: Optional[TokenBucket] = None, max_workers: int = LANGSEARCH_MAX_WORKERS,
+                 retry_budget: Optional[RetryBudget] = None, cache: Optional[SQLiteCache] = SEARCH_CACHE):
+        self.rate_limiter = rate_limiter or LANGSEARCH_RATE_LIMITER
+        self.max_workers = max(1, max_workers)
+        # Shared by all of the agent's searches; a workflow run passes one budget to all of its agents
+        self.retry_budget = retry_budget or RetryBudget(LANGSEARCH_RETRY_BUDGET)
+        self.cache = cache
+
+    def _search(self, body: Dict, query_type: str, label: str) -> Optional[Dict]:
         """
-        Search for a specific tech tool with enhanced parameters for better results.
+        Return the LangSearch response payload for `body`, served from the response cache
+        when a fresh entry exists. Returns None if the request failed.
+        """
+        key = make_cache_key(body)
+        if self.cache is not None:
+            cached = self.cache.get(key, kind=query_type)
+            if cached is not None:
+                print(f"LangSearch cache hit for {label}")
+                return cached
+        
+        response = self._post_search(body, label)
+        print(f"LangSearch response status for {label}: {response.status_code}")
+        if response.status_code != 200:
+            print(f"LangSearch error for {label}: {response.text}")
+            return None
+        
+        data = response.json()
+        if self.cache is not None:
+            self.cache.set(key, data, SEARCH_CACHE_TTLS.get(query_type, 0), kind=query_type)
+        return data
+
+    def _post_search(self, body: Dict, label: str):
+        """
+        POST a search body to LangSearch, paced by the token bucket and retried on
+        429/5xx with backoff. Every attempt draws a fresh token.
         """
-        headers = {
+        headers = self._headers()
+
+        def send():
+            self.rate_limiter.acquire()
+            return http_client.post(LANGSEARCH_SEARCH_ENDPOINT, headers=headers, json=body)
+
+        return request_with_retry(
+            send, self.retry_budget, LANGSEARCH_MAX_ATTEMPTS,
+            LANGSEARCH_RETRY_BASE_DELAY, LANGSEARCH_RETRY_MAX_DELAY, label=label
+        )
+    
+    @staticmethod
+    def _headers() -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {LANGSEARCH_API_KEY}",
             "Content-Type": "application/json"
         }
-        body = {
+
+    async def _asearch(self, body: Dict, query_type: str, label: str, client) -> Optional[Dict]:
+        """
+        Async variant of `_search` over an httpx.AsyncClient; shares the token bucket,
+        retry budget and response cache with the threaded path.
+        """
+        key = make_cache_key(body)
+        if self.cache is not None:
+            cached = self.cache.get(key, kind=query_type)
+            if cached is not None:
+                print(f"LangSearch cache hit for {label}")
+                return cached
+
+        async def send():
+            await self.rate_limiter.acquire_async()
+            return await client.post(LANGSEARCH_SEARCH_ENDPOINT, headers=self._headers(), json=body)
+
+        response = await arequest_with_retry(
+            send, self.retry_budget, LANGSEARCH_MAX_ATTEMPTS,
+            LANGSEARCH_RETRY_BASE_DELAY, LANGSEARCH_RETRY_MAX_DELAY, label=label
+        )
+        print(f"LangSearch response status for {label}: {response.status_code}")
+        if response.status_code != 200:
+            print(f"LangSearch error for {label}: {response.text}")
+            return None
+
+        data = response.json()
+        if self.cache is not None:
+            self.cache.set(key, data, SEARCH_CACHE_TTLS.get(query_type, 0), kind=query_type)
+        return data
+
+    @staticmethod
+    def _tool_search_body(tool_name: str) -> Dict:
+        return {
             "query": f"{tool_name} developer programming tool technology",
             "freshness": "oneWeek",  # Focus on recent information
             "summary": True,
@@ -31,129 +158,153 @@ class SearchAgent:
             "safeSearch": "moderate",
             "market": "en-US"
         }
-        
+
+    @staticmethod
+    def _validated_tool_results(data: Optional[Dict]) -> List[Dict]:
+        if data is None:
+            return []
+        results = data.get("data", {}).get("webPages", {}).get("value", [])
+        # Apply content validation
+        scores = CONTENT_SCORER.score_batch(results)
+        return [r for r, score in zip(results, scores) if score.is_quality]
+
+    def search_tool(self, tool_name: str) -> List[Dict]:
+        """
+        Search for a specific tech tool with enhanced parameters for better results.
+        """
         try:
-            response = requests.post(LANGSEARCH_SEARCH_ENDPOINT, headers=headers, json=body)
-            if response.status_code != 200:
-                print(f"LangSearch error for {tool_name}: {response.text}")
-                return []
-            
-            data = response.json()
-            results = data.get("data", {}).get("webPages", {}).get("value", [])
-            
-            # Apply content validation
-            validated_results = [r for r in results if self._validate_content_quality(r)]
-            return validated_results
-            
+            data = self._search(self._tool_search_body(tool_name), "tool", tool_name)
+            return self._validated_tool_results(data)
         except Exception as e:
             print(f"Error searching for {tool_name}: {e}")
             return []
-    def search_new_ai_tools(self) -> List[Dict]:
+
+    async def asearch_tool(self, tool_name: str, client) -> List[Dict]:
+        """
+        Async variant of `search_tool` using the given httpx.AsyncClient.
+        """
+        try:
+            data = await self._asearch(self._tool_search_body(tool_name), "tool", tool_name, client)
+            return self._validated_tool_results(data)
+        except Exception as e:
+            print(f"Error searching for {tool_name}: {e}")
+            return []
+    def search_new_ai_tools(self, concurrent: bool = True,
+                            on_result: Optional[Callable[[float, Dict], None]] = None) -> List[Dict]:
         """
         Uses LangSearch Web Search API to find fresh trending tech tools and developer news from the last 7 days.
         Covers all developer-relevant technology trends, not limited to AI.
         Uses dynamic, broad queries to maximize coverage with minimal API calls.
+        With `concurrent` (default) all strategic queries are sent at once, paced only by the
+        shared token bucket; results are still merged in query order so ranking is unchanged.
+        `on_result` is called with each (score, result) of `stream_new_ai_tools` as it arrives,
+        e.g. to start fetching articles before the last query is answered.
+        """
+        ranking = TopK(self.TOP_RESULTS)
+        for score, result in self.stream_new_ai_tools(ranking, concurrent=concurrent):
+            if on_result is not None:
+                on_result(score, result)
+        unique_results = ranking.items()
+        print(f"Final curated results after deduplication: {len(unique_results)}")
+        return unique_results  # Top 15 most relevant results
+
+    def stream_new_ai_tools(self, ranking: Optional[TopK] = None,
+                            concurrent: bool = True) -> Iterator[Tuple[float, Dict]]:
+        """
+        Streaming variant of `search_new_ai_tools`: yields (score, result) for each validated,
+        deduplicated result as soon as its strategic query completes, whatever the query's
+        position. Deduplication is order-dependent (first copy and first results per domain
+        win), so `ranking` (if given) is fed separately, holding back results until every
+        earlier query is in: once the stream is exhausted `ranking.items()` is exactly the
+        batch top-k, while the results yielded early may include a few it later drops.
         """
         current_date = datetime.now()
         week_ago = current_date - timedelta(days=7)
+        strategic_queries = self.STRATEGIC_QUERIES
+        arrivals = ResultDeduplicator(self)
+        deduplicator = ResultDeduplicator(self)
+        held: Dict[int, List[Dict]] = {}
+        next_query = 0
+        total_results = 0
         
-        # Strategic diverse queries that capture trending developer tech from various ecosystems
-        strategic_queries = [
-            # AI and ML tools (beyond GitHub)
-            "new AI developer tools 2025 trending -github.com programming artificial intelligence",
-            
-            # Web development frameworks and libraries
-            "new web development framework 2025 react vue angular trending -github.com",
-            
-            # Mobile development and cross-platform tools
-            "new mobile development tools 2025 flutter react-native kotlin swift trending",
-            
-            # DevOps and cloud tools
-            "new devops tools 2025 kubernetes docker cloud deployment trending -github.com",
-            
-            # Programming languages and compilers
-            "new programming language 2025 trending rust go python typescript compiler",
-            
-            # Database and backend innovations
-            "new database technology 2025 trending nosql sql mongodb postgresql redis",
-            
-            # Developer productivity and IDEs
-            "new developer productivity tools 2025 IDE editor vscode trending -github.com",
+        started = time.monotonic()
+        executor = None
+        try:
+            if concurrent:
+                executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(strategic_queries)))
+                futures = {executor.submit(self._run_strategic_query, query, week_ago): index
+                           for index, query in enumerate(strategic_queries)}
+                per_query_results = ((futures[future], future.result()) for future in as_completed(futures))
+            else:
+                per_query_results = ((index, self._run_strategic_query(query, week_ago))
+                                     for index, query in enumerate(strategic_queries))
             
-            # Security and testing tools
-            "new cybersecurity tools 2025 testing framework developer trending -github.com"
-        ]
+            for index, results in per_query_results:
+                total_results += len(results)
+                held[index] = results
+                while next_query in held:
+                    for result in held.pop(next_query):
+                        score = deduplicator.add(result)
+                        if score is not None and ranking is not None:
+                            ranking.push(score, result)
+                    next_query += 1
+                for result in results:
+                    score = arrivals.add(result)
+                    if score is not None:
+                        yield score, result
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
         
-        all_results = []
+        print(f"Total results from {len(strategic_queries)} strategic queries: {total_results} "
+              f"({deduplicator.accepted} unique) in {time.monotonic() - started:.1f}s")
+        print(f"LangSearch retry stats: {self.retry_budget.stats()}")
+        if self.cache is not None:
+            print(f"LangSearch cache stats: {self.cache.stats()}")
+
+    def _run_strategic_query(self, query: str, week_ago: datetime) -> List[Dict]:
+        """
+        Execute a single strategic query and return its fresh, quality-validated results.
+        """
+        # Optimized LangSearch parameters for maximum relevant coverage
+        body = {
+            "query": query,
+            "freshness": "oneWeek",  # Strictly last 7 days
+            "summary": True,
+            "count": 20,  # More results per strategic query
+            "safeSearch": "moderate",
+            "market": "en-US",
+            "category": "ScienceAndTechnology",
+            "sortBy": "date"
+        }
         
-        for query in strategic_queries:
-            headers = {
-                "Authorization": f"Bearer {LANGSEARCH_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            
-            # Optimized LangSearch parameters for maximum relevant coverage
-            body = {
-                "query": query,
-                "freshness": "oneWeek",  # Strictly last 7 days
-                "summary": True,
-                "count": 20,  # More results per strategic query
-                "safeSearch": "moderate",
-                "market": "en-US",
-                "category": "ScienceAndTechnology",
-                "sortBy": "date"
-            }
+        print(f"Executing strategic search: {query}")
+        
+        try:
+            data = self._search(body, "strategic", f"strategic search '{query}'")
+            if data is None:
+                return []
+                
+            results = data.get("data", {}).get("webPages", {}).get("value", [])
             
-            print(f"Executing strategic search: {query}")
+            # Validate freshness and quality
+            validated_results = self._validate_freshness(results, week_ago)
+            print(f"Strategic query returned {len(results)} results, {len(validated_results)} validated")
+            return validated_results
             
-            try:
-                response = requests.post(LANGSEARCH_SEARCH_ENDPOINT, headers=headers, json=body)
-                print(f"LangSearch response status: {response.status_code}")
-                
-                if response.status_code == 429:
-                    print("Rate limit hit, waiting...")
-                    time.sleep(5)
-                    continue
-                    
-                if response.status_code != 200:
-                    print(f"LangSearch error: {response.text}")
-                    continue
-                    
-                data = response.json()
-                results = data.get("data", {}).get("webPages", {}).get("value", [])
-                
-                # Validate freshness and quality
-                validated_results = self._validate_freshness(results, week_ago)
-                print(f"Strategic query returned {len(results)} results, {len(validated_results)} validated")
-                
-                all_results.extend(validated_results)
-                
-                # Brief delay between API calls
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Error with strategic query: {e}")
-                continue
-        
-        print(f"Total results from {len(strategic_queries)} strategic queries: {len(all_results)}")
-        
-        # Enhanced deduplication and intelligent scoring
-        unique_results = self._deduplicate_and_score(all_results)
-        
-        print(f"Final curated results after deduplication: {len(unique_results)}")
-        return unique_results[:15]  # Return top 15 most relevant results
+        except Exception as e:
+            print(f"Error with strategic query: {e}")
+            return []
 
     def _validate_freshness(self, results: List[Dict], cutoff_date: datetime) -> List[Dict]:
         """
         Validates that search results are from the last 7 days by checking date published.
         """
-        validated_results = []
-        
-        for result in results:
-            if self._is_result_fresh(result, cutoff_date) and self._validate_content_quality(result):
-                validated_results.append(result)
-        
-        return validated_results
+        scores = CONTENT_SCORER.score_batch(results)
+        return [
+            result for result, score in zip(results, scores)
+            if self._is_result_fresh(result, cutoff_date) and score.is_quality
+        ]
 
     def _is_result_fresh(self, result: Dict, cutoff_date: datetime) -> bool:
         """
@@ -181,147 +332,20 @@ class SearchAgent:
         """
         Intelligent content quality validation using dynamic scoring.
         """
-        snippet = (result.get('snippet', '') + ' ' + result.get('name', '')).lower()
-        url = result.get('url', '').lower()
-        
-        # Dynamic scoring system
-        quality_score = 0
-        
-        # Trusted domains (weighted scoring with diversity promotion)
-        trusted_domains = {
-            # Tier 1: Official company sources (highest trust)
-            'openai.com': 10, 'anthropic.com': 10, 'google.com': 9, 'microsoft.com': 9,
-            'meta.com': 8, 'apple.com': 9, 'amazon.com': 8, 'netflix.com': 7,
-            'huggingface.co': 8, 'pytorch.org': 8, 'tensorflow.org': 8,
-            
-            # Tier 2: Tech news and communities (high trust)
-            'techcrunch.com': 8, 'theverge.com': 8, 'arstechnica.com': 8,
-            'venturebeat.com': 7, 'wired.com': 7, 'hackernews.com': 7,
-            'engadget.com': 6, 'zdnet.com': 6, 'cnet.com': 6,
-            
-            # Tier 3: Developer platforms (balanced scoring)
-            'stackoverflow.com': 7, 'dev.to': 6, 'medium.com': 5,
-            'producthunt.com': 6, 'kaggle.com': 6, 'reddit.com': 5,
-            
-            # Tier 4: Specialized tech platforms  
-            'npmjs.com': 6, 'pypi.org': 6, 'crates.io': 6, 'packagist.org': 6,
-            'dockerhub.com': 6, 'kubernetes.io': 7, 'apache.org': 7,
-            
-            # Reduced GitHub scoring to promote diversity
-            self.GITHUB_DOMAIN: 4  # Reduced from 9 to 4 to allow other sources
-        }
-        
-        # Check domain authority
-        for domain, score in trusted_domains.items():
-            if domain in url:
-                quality_score += score
-                break
-        
-        # Developer/Tech relevance indicators (broad tech ecosystem)
-        relevance_indicators = {
-            # Trending and viral indicators
-            'trending': 4, 'viral': 4, 'popular': 3, 'breakthrough': 4,
-            'game-changer': 4, 'revolutionary': 3, 'innovative': 3,
-            
-            # AI and ML (subset of broader tech)
-            'ai': 2, 'artificial intelligence': 2, 'machine learning': 2,
-            'neural network': 2, 'deep learning': 2, 'llm': 2, 'model': 2,
-            
-            # Web development and frameworks
-            'react': 2, 'vue': 2, 'angular': 2, 'nodejs': 2, 'typescript': 2,
-            'javascript': 2, 'python': 2, 'rust': 2, 'go': 2, 'kotlin': 2,
-            
-            # Developer tools and platforms
-            'developer': 3, 'programming': 2, 'code': 2, 'api': 3,
-            'open source': 3, 'github': 2, 'framework': 2, 'library': 2,
-            'vscode': 2, 'docker': 2, 'kubernetes': 2, 'cloud': 2,
-            
-            # DevOps and infrastructure
-            'devops': 2, 'ci/cd': 2, 'deployment': 2, 'microservices': 2,
-            'serverless': 2, 'aws': 2, 'azure': 2, 'gcp': 2,
-            
-            # Mobile and emerging tech
-            'mobile': 2, 'ios': 2, 'android': 2, 'flutter': 2, 'react native': 2,
-            'blockchain': 2, 'web3': 2, 'cryptocurrency': 2, 'nft': 1,
-            
-            # Database and backend
-            'database': 2, 'sql': 2, 'nosql': 2, 'mongodb': 2, 'postgresql': 2,
-            'redis': 2, 'elasticsearch': 2, 'graphql': 2, 'rest api': 2,
-            
-            # Freshness and news indicators
-            'announcement': 3, 'launch': 3, 'release': 3, 'beta': 2,
-            'new': 2, 'latest': 2, 'just': 3, 'breaking': 4,
-            
-            # General tech ecosystem
-            'startup': 2, 'funding': 2, 'acquisition': 2, 'partnership': 2,
-            'innovation': 2, 'technology': 1, 'tech': 1, 'software': 1
-        }
-        
-        # Calculate relevance score
-        for term, score in relevance_indicators.items():
-            if term in snippet:
-                quality_score += score
-        
-        # Freshness indicators bonus
-        freshness_terms = ['new', 'just', 'today', 'this week', 'breaking', 'latest']
-        if any(term in snippet for term in freshness_terms):
-            quality_score += 2
-        
-        # Negative indicators (reduce score)
-        negative_terms = ['casino', 'gambling', 'adult', 'loan', 'insurance', 'diet']
-        if any(term in snippet for term in negative_terms):
-            quality_score -= 10
-        
-        # Minimum content length check
-        if len(snippet.strip()) < 20:
-            quality_score -= 5
-        
-        # Dynamic threshold based on overall content ecosystem
-        threshold = 5  # Adaptive threshold
-        
-        return quality_score >= threshold
+        return CONTENT_SCORER.score(result).is_quality
 
     def _deduplicate_and_score(self, results: List[Dict]) -> List[Dict]:
         """
         Advanced deduplication and scoring with domain diversity promotion.
+        URLs are compared in canonical form, and syndicated copies are caught by a MinHash
+        near-duplicate index over title (without its site-name suffix) + snippet.
         """
-        seen_urls = set()
-        seen_titles = set()
-        domain_count = {}  # Track how many results we have from each domain
-        
-        MAX_GITHUB_RESULTS = 2
-        MAX_OTHER_DOMAIN_RESULTS = 3
-        
-        # Score and sort results
+        deduplicator = ResultDeduplicator(self)
         scored_results = []
         for result in results:
-            url = result.get('url', '')
-            title = result.get('name', '').lower().strip()
-            
-            # Skip if URL or very similar title already seen
-            if url in seen_urls or title in seen_titles:
-                continue
-            
-            # Extract domain for diversity tracking
-            domain = self._extract_domain(url)
-            
-            # Promote diversity - limit results per domain
-            current_domain_count = domain_count.get(domain, 0)
-            if (domain == self.GITHUB_DOMAIN and current_domain_count >= MAX_GITHUB_RESULTS) or \
-               (domain != self.GITHUB_DOMAIN and current_domain_count >= MAX_OTHER_DOMAIN_RESULTS):
-                continue  # Skip if domain limit reached
-                
-            if url and title:
-                score = self._calculate_relevance_score(result)
-                
-                # Apply diversity bonus for non-GitHub sources
-                if domain != self.GITHUB_DOMAIN:
-                    score += 1.0  # Bonus for diversity
-                    
+            score = deduplicator.add(result)
+            if score is not None:
                 scored_results.append((score, result))
-                seen_urls.add(url)
-                seen_titles.add(title)
-                domain_count[domain] = current_domain_count + 1
         
         # Sort by score (highest first) and return
         scored_results.sort(key=lambda x: x[0], reverse=True)
@@ -339,41 +363,7 @@ class SearchAgent:
         """
         Calculate relevance score based on multiple factors.
         """
-        score = 0.0
-        snippet = (result.get('snippet', '') + ' ' + result.get('name', '')).lower()
-        url = result.get('url', '').lower()
-        
-        # High-value keywords (higher scores)
-        high_value_keywords = {
-            'announcement': 3.0, 'launched': 3.0, 'released': 3.0, 'new': 2.0,
-            'developer': 2.5, 'api': 2.5, 'open source': 3.0, 'github': 2.0,
-            'ai tool': 3.0, 'artificial intelligence': 2.0, 'machine learning': 2.0,
-            'beta': 2.5, 'copilot': 2.5, 'assistant': 2.0, 'framework': 2.0
-        }
-        
-        # Domain authority scores
-        domain_scores = {
-            'openai.com': 5.0, 'anthropic.com': 5.0, 'google.com': 4.0,
-            'microsoft.com': 4.0, 'github.com': 4.0, 'techcrunch.com': 3.5,
-            'theverge.com': 3.0, 'arstechnica.com': 3.0, 'hackernews.com': 3.0
-        }
-        
-        # Calculate keyword score
-        for keyword, value in high_value_keywords.items():
-            if keyword in snippet:
-                score += value
-        
-        # Calculate domain score
-        for domain, value in domain_scores.items():
-            if domain in url:
-                score += value
-                break
-        
-        # Freshness bonus (if we can determine recency)
-        if any(word in snippet for word in ['today', 'yesterday', 'this week', 'just', 'breaking']):
-            score += 2.0
-        
-        return score
+        return CONTENT_SCORER.score(result).relevance
 
     def force_fetch_and_store(self, results_path: str = "weekly_tech_tools.json"):
         """
@@ -385,3 +375,62 @@ class SearchAgent:
         print(f"Forced fetch complete. Results written to {results_path}")
 
 
+class ResultDeduplicator:
+    """
+    Incremental form of SearchAgent._deduplicate_and_score: results are offered one
+    at a time, in order, and each is either rejected (duplicate, near-duplicate or
+    over its domain's quota) or accepted with its relevance score.
+    """
+    MAX_GITHUB_RESULTS = 2
+    MAX_OTHER_DOMAIN_RESULTS = 3
+
+    def __init__(self, agent: SearchAgent):
+        self.agent = agent
+        self.seen_urls = set()
+        self.seen_titles = set()
+        self.near_duplicates = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD)
+        self.domain_count = {}  # Track how many results we have from each domain
+        self.accepted = 0
+
+    def add(self, result: Dict) -> Optional[float]:
+        """Return the result's score if it is accepted, otherwise None."""
+        url = result.get('url', '')
+        title = result.get('name', '').lower().strip()
+        canonical_url = canonicalize_url(url)
+        
+        # Skip if URL or title already seen
+        if canonical_url in self.seen_urls or title in self.seen_titles:
+            return None
+        
+        # Skip syndicated copies and reposts of an already accepted result; the site-name
+        # suffix is left out so it doesn't make copies on different sites look different
+        signature = self.near_duplicates.signature(
+            f"{normalize_title(result.get('name', ''), url)} {result.get('snippet', '')}")
+        if self.near_duplicates.find(signature) is not None:
+            return None
+        
+        # Extract domain for diversity tracking
+        domain = self.agent._extract_domain(url)
+        github = self.agent.GITHUB_DOMAIN
+        
+        # Promote diversity - limit results per domain
+        current_domain_count = self.domain_count.get(domain, 0)
+        if (domain == github and current_domain_count >= self.MAX_GITHUB_RESULTS) or \
+           (domain != github and current_domain_count >= self.MAX_OTHER_DOMAIN_RESULTS):
+            return None  # Skip if domain limit reached
+        
+        if not (url and title):
+            return None
+        
+        score = self.agent._calculate_relevance_score(result)
+        
+        # Apply diversity bonus for non-GitHub sources
+        if domain != github:
+            score += 1.0  # Bonus for diversity
+        
+        self.seen_urls.add(canonical_url)
+        self.seen_titles.add(title)
+        self.near_duplicates.add(signature)
+        self.domain_count[domain] = current_domain_count + 1
+        self.accepted += 1
+        return score
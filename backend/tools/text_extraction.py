@@ -0,0 +1,257 @@
+import os
+import re
+import sys
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TEXT_EXTRACTION_ENGINE, TEXT_EXTRACTION_PARSER
+
+try:
+    from lxml import etree
+except ImportError:  # optional: the "main" engine then parses with html.parser
+    etree = None
+
+# Elements whose content is never article text
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object", "embed",
+    "head", "nav", "footer", "aside", "form", "button", "select", "textarea", "dialog", "menu",
+}
+# Page headers are chrome, but an <article>'s own <header> holds its title
+PAGE_CHROME_TAGS = {"header"}
+MAIN_TAGS = {"article", "main"}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "li", "ul", "ol", "pre", "blockquote",
+    "table", "tr", "td", "th", "dl", "dt", "dd", "figure", "figcaption",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# Tags HTML lets authors leave unclosed; a new one implicitly closes the previous
+AUTO_CLOSE_TAGS = {"p", "li", "dt", "dd", "tr", "td", "th", "option"}
+SKIP_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search", "dialog", "alert"}
+BOILERPLATE_HINT = re.compile(
+    r"cookie|consent|gdpr|banner|navbar|\bnav\b|navigation|menu|footer|sidebar|breadcrumb|"
+    r"share|social|subscribe|newsletter|signup|sign-up|advert|\bads?\b|promo|sponsor|"
+    r"related|recommend|comment|popup|modal|masthead|toolbar|paywall",
+    re.IGNORECASE,
+)
+
+MIN_BLOCK_WORDS = 5
+MAX_LINK_DENSITY = 0.5
+MIN_MAIN_CHARS = 200
+
+
+class _Block(NamedTuple):
+    text: str
+    link_chars: int
+    in_main: bool
+    heading: bool
+
+
+class _Frame(NamedTuple):
+    tag: str
+    skip: bool
+    main: bool
+    link: bool
+
+
+class _BlockCollector:
+    """
+    Receives parse events (no tree is built), splits visible text into blocks, drops
+    script/navigation/cookie-banner style elements and remembers which blocks sit
+    inside <article>/<main>. Driven by the stdlib parser or, when installed, used
+    directly as an lxml parser target (`start`, `end`, `data`, `close`).
+    """
+
+    def __init__(self, use_hints: bool = True):
+        self.use_hints = use_hints
+        self.blocks: List[_Block] = []
+        self._stack: List[_Frame] = []
+        self._parts: List[str] = []
+        self._link_chars = 0
+        self._block_main = False
+        self._block_heading = False
+
+    def _top(self) -> _Frame:
+        return self._stack[-1] if self._stack else _Frame("", False, False, False)
+
+    def _flush(self, heading: bool = False) -> None:
+        if self._parts:
+            text = " ".join("".join(self._parts).split())
+            if text:
+                self.blocks.append(_Block(text, self._link_chars, self._block_main, self._block_heading))
+            self._parts = []
+        self._link_chars = 0
+        self._block_main = False
+        self._block_heading = heading
+
+    def start(self, tag: str, attributes: Dict) -> None:
+        if tag in VOID_TAGS:
+            if tag in ("br", "hr"):
+                self._parts.append(" ")
+            return
+        if tag in AUTO_CLOSE_TAGS and self._stack and self._stack[-1].tag == tag:
+            self._stack.pop()
+        parent = self._top()
+        is_main = tag in MAIN_TAGS
+        skip = parent.skip or tag in SKIP_TAGS or (tag in PAGE_CHROME_TAGS and not parent.main)
+        # Most elements have no attributes; only look them up (slow on lxml's mapping) when needed
+        if attributes and not skip:
+            role = attributes.get("role")
+            is_main = is_main or role == "main"
+            skip = role in SKIP_ROLES \
+                or attributes.get("aria-hidden") == "true" or "hidden" in attributes \
+                or (self.use_hints and not is_main and tag not in ("html", "body")
+                    and bool(BOILERPLATE_HINT.search(f"{attributes.get('class') or ''} {attributes.get('id') or ''}")))
+        if tag in BLOCK_TAGS:
+            self._flush(heading=tag in HEADING_TAGS)
+        self._stack.append(_Frame(tag, skip, parent.main or is_main, parent.link or tag == "a"))
+
+    def end(self, tag: str) -> None:
+        if tag in VOID_TAGS:
+            return
+        # Pop back to the matching open tag; stray end tags are ignored
+        for depth in range(len(self._stack) - 1, max(-1, len(self._stack) - 20), -1):
+            if self._stack[depth].tag == tag:
+                del self._stack[depth:]
+                break
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def data(self, data: str) -> None:
+        frame = self._top()
+        if frame.skip or not data:
+            return
+        if not self._parts:
+            self._block_main = frame.main
+        self._parts.append(data)
+        if frame.link:
+            self._link_chars += len(data.strip())
+
+    def close(self) -> List[_Block]:
+        self._flush()
+        return self.blocks
+
+
+class _StdlibParser(HTMLParser):
+    """Pure-Python driver for _BlockCollector (html.parser)."""
+
+    def __init__(self, collector: _BlockCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+def _stdlib_blocks(html: str, use_hints: bool) -> List[_Block]:
+    parser = _StdlibParser(_BlockCollector(use_hints))
+    parser.feed(html)
+    parser.close()
+    return parser.collector.close()
+
+
+def _lxml_blocks(html: str, use_hints: bool) -> List[_Block]:
+    # libxml2 tokenizes in C and closes implicitly ended elements before the events reach us
+    collector = _BlockCollector(use_hints)
+    if not html.strip():
+        return collector.close()
+    parser = etree.HTMLParser(target=collector, recover=True, no_network=True)
+    parser.feed(html)
+    return parser.close()  # the collector's close(): its blocks
+
+
+BLOCK_PARSERS: Dict[str, Callable[[str, bool], List[_Block]]] = {"stdlib": _stdlib_blocks}
+if etree is not None:
+    BLOCK_PARSERS["lxml"] = _lxml_blocks
+
+
+def _default_parser() -> str:
+    if TEXT_EXTRACTION_PARSER in BLOCK_PARSERS:
+        return TEXT_EXTRACTION_PARSER
+    if TEXT_EXTRACTION_PARSER == "lxml":
+        print("TEXT_EXTRACTION_PARSER=lxml but lxml is not installed; using html.parser")
+    return "lxml" if "lxml" in BLOCK_PARSERS else "stdlib"
+
+
+# Parser behind the "main" engine: lxml when installed (unless TEXT_EXTRACTION_PARSER=stdlib)
+DEFAULT_PARSER = _default_parser()
+
+
+def soup_text(html: str) -> str:
+    """The original extraction: every text node of the page."""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser").get_text(" ", strip=True)
+
+
+def main_content_text(html: str, parser: Optional[str] = None) -> str:
+    """
+    Keep only the main article body: boilerplate elements are dropped while parsing,
+    blocks inside <article>/<main> win when there are enough of them, and remaining
+    blocks must be long enough and not mostly links (menus, tag clouds, footers).
+    `parser` ("lxml" or "stdlib") overrides DEFAULT_PARSER; both give the same blocks.
+    """
+    parse_blocks = BLOCK_PARSERS[parser or DEFAULT_PARSER]
+    text = _main_content_text(parse_blocks(html, True))
+    if len(text) < MIN_MAIN_CHARS:
+        # A class/id hint on a page wrapper (e.g. "has-sidebar") can hide everything
+        text = _main_content_text(parse_blocks(html, False))
+    return text
+
+
+def _main_content_text(blocks: List[_Block]) -> str:
+    main_blocks = [block for block in blocks if block.in_main]
+    if sum(len(block.text) for block in main_blocks) >= MIN_MAIN_CHARS:
+        blocks = main_blocks
+    kept = []
+    for block in blocks:
+        if block.link_chars > MAX_LINK_DENSITY * len(block.text):
+            continue
+        if not block.heading and len(block.text.split()) < MIN_BLOCK_WORDS:
+            continue
+        kept.append(block.text)
+    return "\n".join(kept)
+
+
+def trafilatura_text(html: str) -> str:
+    """Optional engine backed by trafilatura, if installed."""
+    import trafilatura
+    return trafilatura.extract(html, include_comments=False, include_tables=False) or ""
+
+
+ENGINES: Dict[str, Callable[[str], str]] = {
+    "soup": soup_text,
+    "main": main_content_text,
+    "trafilatura": trafilatura_text,
+}
+
+
+def register_engine(name: str, engine: Callable[[str], str]) -> None:
+    """Plug in another HTML -> text engine, selectable via TEXT_EXTRACTION_ENGINE."""
+    ENGINES[name] = engine
+
+
+def extract_text(html: str, engine: Optional[str] = None) -> str:
+    """
+    Turn an HTML page into plain text with the configured engine ("main" by default).
+    Falls back to the main-content engine if an optional engine is not installed.
+    """
+    name = engine or TEXT_EXTRACTION_ENGINE
+    extractor = ENGINES.get(name, main_content_text)
+    try:
+        return extractor(html)
+    except ImportError:
+        print(f"Text extraction engine '{name}' is not available, using 'main'")
+        ENGINES[name] = main_content_text
+        return main_content_text(html)
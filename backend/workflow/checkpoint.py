@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from config import CHECKPOINT_ENABLED, CHECKPOINT_PATH, CHECKPOINT_MAX_AGE
+from tools.cache import sqlite_connection
+
+# State entries that are rebuilt for every run (or passed in by the caller) instead of being saved
+UNSAVED_KEYS = ("documents", "checkpoint", "previous_results", "progress", "retry_budget")
+
+
+class CheckpointStore:
+    """
+    SQLite store of in-progress workflow runs: the state after each completed node and
+    finished per-item results inside a node (e.g. one tool's summary). A run that fails
+    or is interrupted stays in the store and the next run resumes it; a finished run is
+    removed. Unfinished runs older than `max_age` seconds are discarded instead of resumed,
+    since their search results would be stale.
+    """
+
+    def __init__(self, path: str, max_age: float = CHECKPOINT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, completed TEXT NOT NULL, state TEXT NOT NULL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS partials ("
+                "run_id TEXT NOT NULL, node TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (run_id, node, key))"
+            )
+
+    def _connect(self):
+        return sqlite_connection(self.path)
+
+    def start(self, resume: bool = True) -> "RunCheckpoint":
+        """Resume the latest unfinished run (if `resume` and it is recent enough), else start a new one."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = None if not resume else conn.execute(
+                "SELECT run_id, completed, state FROM runs WHERE created_at >= ? "
+                "ORDER BY created_at DESC LIMIT 1", (now - self.max_age,)).fetchone()
+            # Every other unfinished run is superseded
+            for (run_id,) in conn.execute("SELECT run_id FROM runs").fetchall():
+                if row is None or run_id != row[0]:
+                    self._delete(conn, run_id)
+            if row is not None:
+                return RunCheckpoint(self, row[0], json.loads(row[1]), json.loads(row[2]))
+            run_id = uuid.uuid4().hex
+            conn.execute("INSERT INTO runs (run_id, completed, state, created_at, updated_at) "
+                         "VALUES (?, '[]', '{}', ?, ?)", (run_id, now, now))
+        return RunCheckpoint(self, run_id, [], {})
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, run_id: str) -> None:
+        conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        conn.execute("DELETE FROM partials WHERE run_id = ?", (run_id,))
+
+    def save_node(self, run_id: str, completed: List[str], state: Dict) -> None:
+        saved = {key: value for key, value in state.items() if key not in UNSAVED_KEYS}
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE runs SET completed = ?, state = ?, updated_at = ? WHERE run_id = ?",
+                         (json.dumps(completed), json.dumps(saved, ensure_ascii=False), time.time(), run_id))
+
+    def save_partial(self, run_id: str, node: str, key: str, value: Any) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO partials (run_id, node, key, value) VALUES (?, ?, ?, ?)",
+                         (run_id, node, key, json.dumps(value, ensure_ascii=False)))
+
+    def partials(self, run_id: str, node: str) -> Dict[str, Any]:
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT key, value FROM partials WHERE run_id = ? AND node = ?",
+                                (run_id, node)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def finish(self, run_id: str) -> None:
+        with self._lock, self._connect() as conn:
+            self._delete(conn, run_id)
+
+
+class RunCheckpoint:
+    """
+    Checkpoint of one workflow run, passed through the workflow state as
+    `state["checkpoint"]`. `completed` lists the nodes whose output is in `state`.
+    Saving never fails the run: storage errors are logged and the run goes on.
+    """
+
+    def __init__(self, store: CheckpointStore, run_id: str, completed: List[str], state: Dict):
+        self.store = store
+        self.run_id = run_id
+        self.completed = completed
+        self.state = state
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.completed)
+
+    def node_done(self, node: str, state: Dict) -> None:
+        self.completed = self.completed + [node]
+        try:
+            self.store.save_node(self.run_id, self.completed, state)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Could not checkpoint node {node}: {e}")
+
+    def save_partial(self, node: str, key: str, value: Any) -> None:
+        try:
+            self.store.save_partial(self.run_id, node, key, value)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Could not checkpoint {key} in node {node}: {e}")
+
+    def partials(self, node: str) -> Dict[str, Any]:
+        try:
+            return self.store.partials(self.run_id, node)
+        except sqlite3.Error as e:
+            print(f"Could not read checkpointed results of node {node}: {e}")
+            return {}
+
+    def finish(self) -> None:
+        try:
+            self.store.finish(self.run_id)
+        except sqlite3.Error as e:
+            print(f"Could not clear checkpoint of run {self.run_id}: {e}")
+
+
+def checkpointed(node_name: str, node: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+    """
+    Wrap a graph node so it is skipped when the run's checkpoint already holds its output
+    (a resumed run), and its output is saved to the checkpoint once it completes.
+    """
+    def run_node(state: Dict) -> Dict:
+        checkpoint: Optional[RunCheckpoint] = state.get("checkpoint")
+        if checkpoint is not None and node_name in checkpoint.completed:
+            print(f"Run {checkpoint.run_id}: {node_name} restored from checkpoint")
+            return state
+        state = node(state)
+        if checkpoint is not None:
+            checkpoint.node_done(node_name, state)
+        return state
+    return run_node
+
+
+CHECKPOINTS = CheckpointStore(CHECKPOINT_PATH) if CHECKPOINT_ENABLED else None
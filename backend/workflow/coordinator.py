@@ -0,0 +1,353 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import SCHEDULER_DB_PATH, SCHEDULER_LEASE_TTL
+from tools.cache import sqlite_connection
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def report_progress(state: Dict, event: Dict) -> None:
+    """Send a progress event to the run's listener (`state["progress"]`), if there is one."""
+    progress = state.get("progress")
+    if progress is not None:
+        try:
+            progress(event)
+        except Exception as e:
+            print(f"Progress listener failed: {e}")
+
+
+def _progress(events: List[Dict]) -> Tuple[Dict[str, str], List[Dict]]:
+    """Latest status of each node and the summaries so far, from a run's progress events."""
+    nodes: Dict[str, str] = {}
+    summaries: List[Dict] = []
+    for event in events:
+        if event["type"] == "node":
+            nodes[event["node"]] = event["status"]
+        elif event["type"] == "summary":
+            summaries.append(event["summary"])
+    return nodes, summaries
+
+
+class RunStatus:
+    """
+    One coordinated run: its ID, state ("running", "completed", "failed"), timing and
+    the progress events it has emitted so far, numbered from 0 (node started/completed,
+    tool summarized, final status). With a RunStore, every event and the final state
+    are also written there for other processes to read; storage errors are logged and
+    the run goes on.
+    """
+
+    def __init__(self, run_id: str, trigger: str, store: Optional["RunStore"] = None):
+        self.run_id = run_id
+        self.trigger = trigger
+        self.store = store
+        self.status = "running"
+        self.started_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.finished_at: Optional[str] = None
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._events: List[Dict] = []
+
+    def emit(self, event: Dict) -> None:
+        """Record a progress event (thread-safe); passed to the workflow as its progress listener."""
+        with self._lock:
+            event = self._append(event)
+            if self.store is not None:
+                try:
+                    self.store.append(self.run_id, event)
+                except sqlite3.Error as e:
+                    print(f"Could not store progress of run {self.run_id}: {e}")
+
+    def _append(self, event: Dict) -> Dict:
+        event = {"seq": len(self._events), "time": round(time.time(), 3), **event}
+        self._events.append(event)
+        return event
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.finished_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+            event = self._append({"type": "status", "status": status, "error": error})
+            if self.store is not None:
+                try:
+                    self.store.finish(self.run_id, status, error, self.finished_at, event)
+                except sqlite3.Error as e:
+                    print(f"Could not store the result of run {self.run_id}: {e}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the run has finished (at most `timeout` seconds); returns whether it has."""
+        return self.done.wait(timeout)
+
+    def events_since(self, index: int) -> Tuple[List[Dict], bool]:
+        """Events numbered `index` and up, and whether the run has finished (no more will come)."""
+        with self._lock:
+            return self._events[index:], self.status != "running"
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            nodes, summaries = _progress(self._events)
+            return {
+                "run_id": self.run_id,
+                "trigger": self.trigger,
+                "status": self.status,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "nodes": nodes,
+                "partial_results": summaries,
+                "events": len(self._events),
+            }
+
+
+class StoredRun:
+    """
+    A run read from the RunStore, typically one executing in another process: the same
+    status, progress and waiting interface as RunStatus, read from the database on use.
+    """
+
+    def __init__(self, store: "RunStore", row: Dict, poll_interval: float = 1.0):
+        self.store = store
+        self.run_id = row["run_id"]
+        self.trigger = row["trigger"]
+        self.poll_interval = poll_interval
+        self._row = row
+
+    def _refresh(self) -> Dict:
+        row = self.store.get(self.run_id)
+        if row is not None:
+            self._row = row
+        return self._row
+
+    @property
+    def status(self) -> str:
+        return self._refresh()["status"]
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._refresh()["error"]
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.status == "running":
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def events_since(self, index: int) -> Tuple[List[Dict], bool]:
+        # Status first: a finished run's final event is stored together with its status
+        finished = self._refresh()["status"] != "running"
+        return self.store.events(self.run_id, index), finished
+
+    def as_dict(self) -> Dict:
+        row = self._refresh()
+        events = self.store.events(self.run_id, 0)
+        nodes, summaries = _progress(events)
+        return {**row, "nodes": nodes, "partial_results": summaries, "events": len(events)}
+
+
+class RunStore:
+    """
+    Run registry shared by processes (e.g. uvicorn workers) through SQLite: which run is
+    in progress, and every run's state and progress events. Claiming a run is atomic, so
+    at most one run is in progress across all processes, and any process can report on
+    any run. The process executing a run renews its heartbeat; a run whose heartbeat is
+    more than `ttl` seconds old (its process died) is marked failed, so the next trigger
+    starts over and resumes from the checkpoint. Only the `history` most recent runs
+    are kept. The database must be on storage every process can reach.
+    """
+
+    def __init__(self, path: str = SCHEDULER_DB_PATH, ttl: float = SCHEDULER_LEASE_TTL, history: int = 20):
+        self.path = path
+        self.ttl = ttl
+        self.history = max(1, history)
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "run_id TEXT PRIMARY KEY, trigger TEXT NOT NULL, status TEXT NOT NULL, "
+                "started_at TEXT NOT NULL, finished_at TEXT, error TEXT, "
+                "created_at REAL NOT NULL, heartbeat_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                "run_id TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL, PRIMARY KEY (run_id, seq))"
+            )
+
+    def _connect(self):
+        return sqlite_connection(self.path)
+
+    def _expire(self, conn: sqlite3.Connection, now: float) -> None:
+        """Mark runs whose process stopped renewing their heartbeat as failed."""
+        error = "worker stopped responding"
+        finished_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+        stale = conn.execute("SELECT run_id FROM jobs WHERE status = 'running' AND heartbeat_at < ?",
+                             (now - self.ttl,)).fetchall()
+        for (run_id,) in stale:
+            (seq,) = conn.execute("SELECT COUNT(*) FROM job_events WHERE run_id = ?", (run_id,)).fetchone()
+            event = {"seq": seq, "time": round(now, 3), "type": "status", "status": "failed", "error": error}
+            self._finish(conn, run_id, "failed", error, finished_at, event)
+
+    @staticmethod
+    def _finish(conn: sqlite3.Connection, run_id: str, status: str, error: Optional[str],
+                finished_at: str, event: Dict) -> None:
+        conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE run_id = ?",
+                     (status, error, finished_at, run_id))
+        conn.execute("INSERT OR REPLACE INTO job_events (run_id, seq, event) VALUES (?, ?, ?)",
+                     (run_id, event["seq"], json.dumps(event, ensure_ascii=False)))
+
+    def claim(self, run: RunStatus) -> Optional[StoredRun]:
+        """
+        Register `run` as the run in progress, unless another one is: then return that
+        one (and `run` must not be executed).
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._expire(conn, now)
+            row = conn.execute("SELECT run_id FROM jobs WHERE status = 'running'").fetchone()
+            if row is not None:
+                return StoredRun(self, self._get(conn, row[0]))
+            conn.execute("INSERT INTO jobs (run_id, trigger, status, started_at, created_at, heartbeat_at) "
+                         "VALUES (?, ?, 'running', ?, ?, ?)", (run.run_id, run.trigger, run.started_at, now, now))
+            for (old_id,) in conn.execute("SELECT run_id FROM jobs ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+                                          (self.history,)).fetchall():
+                conn.execute("DELETE FROM jobs WHERE run_id = ?", (old_id,))
+                conn.execute("DELETE FROM job_events WHERE run_id = ?", (old_id,))
+        return None
+
+    def heartbeat(self, run_id: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE run_id = ? AND status = 'running'",
+                         (time.time(), run_id))
+
+    def append(self, run_id: str, event: Dict) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO job_events (run_id, seq, event) VALUES (?, ?, ?)",
+                         (run_id, event["seq"], json.dumps(event, ensure_ascii=False)))
+
+    def finish(self, run_id: str, status: str, error: Optional[str], finished_at: str, event: Dict) -> None:
+        """Record a run's final state together with its final event."""
+        with self._lock, self._connect() as conn:
+            self._finish(conn, run_id, status, error, finished_at, event)
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, run_id: str) -> Optional[Dict]:
+        row = conn.execute("SELECT run_id, trigger, status, started_at, finished_at, error FROM jobs "
+                           "WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("run_id", "trigger", "status", "started_at", "finished_at", "error"), row))
+
+    def get(self, run_id: str) -> Optional[Dict]:
+        with self._lock, self._connect() as conn:
+            self._expire(conn, time.time())
+            return self._get(conn, run_id)
+
+    def events(self, run_id: str, index: int = 0) -> List[Dict]:
+        """Stored events of a run numbered `index` and up."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT event FROM job_events WHERE run_id = ? AND seq >= ? ORDER BY seq",
+                                (run_id, index)).fetchall()
+        return [json.loads(event) for (event,) in rows]
+
+
+class RunCoordinator:
+    """
+    Single-flight runner for the workflow: at most one run is in progress at a time.
+    A request while a run is in progress attaches to that run (same run ID) instead of
+    starting another, so concurrent triggers never multiply API spend. Runs execute on
+    a background thread; the most recent `history` runs are kept for status lookups.
+    With a shared RunStore this holds across processes: a run in progress in another
+    worker is attached to (as a StoredRun) and every worker can look up every run.
+    `run_fn` is called with the request's keyword arguments plus `progress`, a callback
+    taking progress event dicts (see RunStatus).
+    """
+
+    def __init__(self, run_fn: Callable[..., Any], history: int = 20, store: Optional[RunStore] = None):
+        self.run_fn = run_fn
+        self.history = max(1, history)
+        self.store = store
+        self._lock = threading.Lock()
+        self._current: Optional[RunStatus] = None
+        self._runs: "OrderedDict[str, RunStatus]" = OrderedDict()
+
+    def start(self, trigger: str = "manual", **kwargs) -> Tuple[Any, bool]:
+        """
+        Start a run with `run_fn(**kwargs)`, or attach to the one in progress (whose
+        arguments then apply). Returns (run, True if this call started it).
+        """
+        with self._lock:
+            if self._current is not None:
+                return self._current, False
+            run = RunStatus(uuid.uuid4().hex, trigger, self.store)
+            if self.store is not None:
+                active = self.store.claim(run)
+                if active is not None:
+                    return active, False
+            self._current = run
+            self._runs[run.run_id] = run
+            while len(self._runs) > self.history:
+                self._runs.popitem(last=False)
+        threading.Thread(target=self._execute, args=(run, kwargs), name=f"run-{run.run_id[:8]}",
+                         daemon=True).start()
+        if self.store is not None:
+            threading.Thread(target=self._heartbeat, args=(run,), name=f"heartbeat-{run.run_id[:8]}",
+                             daemon=True).start()
+        return run, True
+
+    def run(self, trigger: str = "manual", timeout: Optional[float] = None, **kwargs) -> Tuple[Any, bool]:
+        """`start`, then wait for the run to finish (at most `timeout` seconds)."""
+        run, started = self.start(trigger, **kwargs)
+        run.wait(timeout)
+        return run, started
+
+    def _execute(self, run: RunStatus, kwargs: Dict) -> None:
+        print(f"Run {run.run_id} started ({run.trigger})")
+        status, error = "completed", None
+        try:
+            run.result = self.run_fn(progress=run.emit, **kwargs)
+        except Exception as e:
+            status, error = "failed", str(e)
+        finally:
+            with self._lock:
+                self._current = None
+            run.finish(status, error)
+            print(f"Run {run.run_id} {run.status}")
+            run.done.set()
+
+    def _heartbeat(self, run: RunStatus) -> None:
+        """Keep the run's claim in the store alive while it executes."""
+        while not run.done.wait(self.store.ttl / 3):
+            try:
+                self.store.heartbeat(run.run_id)
+            except sqlite3.Error as e:
+                print(f"Could not renew run {run.run_id}: {e}")
+
+    def get(self, run_id: str) -> Optional[Any]:
+        """A run of this process, or any stored run (RunStatus or StoredRun); None if unknown."""
+        with self._lock:
+            run = self._runs.get(run_id)
+        if run is not None or self.store is None:
+            return run
+        row = self.store.get(run_id)
+        return StoredRun(self.store, row) if row is not None else None
+
+    def current(self) -> Optional[RunStatus]:
+        with self._lock:
+            return self._current
@@ -0,0 +1,111 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+from config import SCHEDULER_DB_PATH, SCHEDULER_LEASE_TTL
+from tools.cache import sqlite_connection
+
+
+class LeaderLease:
+    """
+    Leader election between processes (e.g. uvicorn workers) through a time-limited lease
+    row in SQLite. Each process calls `try_acquire` periodically; the holder renews its
+    lease, the others take over only once it has expired, so a crashed leader is replaced
+    after at most `ttl` seconds. Also keeps shared "last run" times so scheduled work can
+    be claimed by one process at a time (`claim_run`) and counts as done for an interval
+    only once it has succeeded (`complete_run`).
+    The database must be on storage every process can reach (same host or shared volume).
+    """
+
+    def __init__(self, path: str = SCHEDULER_DB_PATH, name: str = "scheduler", ttl: float = SCHEDULER_LEASE_TTL):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._held_until = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scheduled_runs ("
+                "name TEXT PRIMARY KEY, last_run_at REAL NOT NULL, claimed_until REAL NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(scheduled_runs)")]
+            if "claimed_until" not in columns:
+                conn.execute("ALTER TABLE scheduled_runs ADD COLUMN claimed_until REAL NOT NULL DEFAULT 0")
+
+    def _connect(self):
+        return sqlite_connection(self.path)
+
+    @property
+    def is_leader(self) -> bool:
+        """True while this process holds an unexpired lease (as of its last acquire/renew)."""
+        return time.time() < self._held_until
+
+    def try_acquire(self) -> bool:
+        """Acquire the lease, or renew it if already held. Returns whether this process is the leader."""
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+                acquired = row is None or row[0] == self.holder or row[1] < now
+                if acquired:
+                    conn.execute("INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES (?, ?, ?)",
+                                 (self.name, self.holder, now + self.ttl))
+        except sqlite3.Error as e:
+            print(f"Could not renew {self.name} lease: {e}")
+            acquired = False
+        was_leader = self.is_leader
+        # Stop acting as leader a little before the lease expires for the others
+        self._held_until = now + self.ttl * 0.8 if acquired else 0.0
+        if acquired != was_leader:
+            print(f"{self.holder} {'is now' if acquired else 'is no longer'} the {self.name} leader")
+        return acquired
+
+    def release(self) -> None:
+        """Give up the lease (on shutdown) so another process can take over at once."""
+        self._held_until = 0.0
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder))
+        except sqlite3.Error as e:
+            print(f"Could not release {self.name} lease: {e}")
+
+    def claim_run(self, job: str, interval: float, retry_after: float, now: Optional[float] = None) -> bool:
+        """
+        Atomically claim job `job` if it last succeeded at least `interval` seconds ago and
+        no unexpired claim is pending. The claim lasts `retry_after` seconds: a run that
+        fails (or whose process dies) is not recorded by `complete_run`, so the job is
+        claimed again once the claim expires. The first call only records a starting
+        point, so the job first runs one interval after the service was first started.
+        """
+        now = time.time() if now is None else now
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT last_run_at, claimed_until FROM scheduled_runs WHERE name = ?",
+                               (job,)).fetchone()
+            if row is None:
+                conn.execute("INSERT INTO scheduled_runs (name, last_run_at) VALUES (?, ?)", (job, now))
+                return False
+            if now - row[0] < interval or now < row[1]:
+                return False
+            conn.execute("UPDATE scheduled_runs SET claimed_until = ? WHERE name = ?", (now + retry_after, job))
+            return True
+
+    def complete_run(self, job: str, now: Optional[float] = None) -> None:
+        """Record a successful run of `job`: the next one is due one interval from now."""
+        now = time.time() if now is None else now
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE scheduled_runs SET last_run_at = ?, claimed_until = 0 WHERE name = ?", (now, job))
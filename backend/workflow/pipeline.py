@@ -0,0 +1,251 @@
+import queue
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from config import (
+    ARTICLE_FETCH_DEADLINE, LLM_EXTRACTION_CHUNK_TOKENS, LLM_EXTRACTION_MAX_ARTICLE_TOKENS,
+    LLM_EXTRACTION_WORKERS, LLM_SUMMARY_CONCURRENCY, LLM_SUMMARY_MODE
+)
+from tools.article_url_extractor import fetch_article_text
+from tools.chunking import ChunkPacker
+from tools.fetcher import fetch_all, summarize_fetch_stats
+from tools.incremental import canonical_tool_name, merge_results, plan_refresh
+from tools.llm_client import get_llm
+from tools.llm_summarizer import (
+    FAILED_SUMMARY, ToolNameMerger, extract_chunk_tool_names, finish_chunk_extraction, search_and_summarize,
+    summarize_top_tools
+)
+from tools.search_agent import SearchAgent
+from workflow.coordinator import report_progress
+
+
+class _Stage:
+    """
+    Worker threads fed through a bounded queue: `put` blocks while the queue is full,
+    so a fast stage cannot run ahead of a slow one. Each result is posted to the
+    pipeline's event queue as (stage name, item key, result).
+    """
+
+    def __init__(self, name: str, work: Callable, workers: int, events: queue.Queue, maxsize: int):
+        self.name = name
+        self.work = work
+        self.events = events
+        self.inbox: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        self.threads = [threading.Thread(target=self._run, name=f"pipeline-{name}", daemon=True)
+                        for _ in range(max(1, workers))]
+        for thread in self.threads:
+            thread.start()
+
+    def put(self, key, item) -> None:
+        self.inbox.put((key, item))
+
+    def close(self) -> None:
+        for _ in self.threads:
+            self.inbox.put(None)
+
+    def _run(self) -> None:
+        while True:
+            job = self.inbox.get()
+            if job is None:
+                return
+            key, item = job
+            try:
+                result = self.work(item)
+            except Exception as e:
+                print(f"Pipeline stage {self.name} failed for {key}: {e}")
+                result = None
+            self.events.put((self.name, key, result))
+
+
+class RankTracker:
+    """
+    Follows `Counter(names).most_common(top_n)` while chunk results arrive in chunk order,
+    and tells which names are certain to be in the final top `top_n` however the
+    remaining chunks turn out.
+    """
+
+    def __init__(self, top_n: int):
+        self.top_n = top_n
+        self.merger = ToolNameMerger()
+        self.counts: Counter = Counter()
+        self.chunks = 0
+
+    def add(self, names: list) -> None:
+        self.counts.update(self.merger.add(names))
+        self.chunks += 1
+
+    def top(self) -> List[str]:
+        return [name for name, _ in self.counts.most_common(self.top_n)]
+
+    def certain(self, remaining_chunks: int) -> List[str]:
+        """
+        Names already sure to make the top `top_n`. Each remaining chunk adds at most one to
+        a name's count and ties keep first-seen order, so a name is safe once no name could
+        reach past it: unseen names can only reach `remaining_chunks` (and lose ties), seen
+        names their count plus `remaining_chunks`.
+        """
+        order = {name: position for position, name in enumerate(self.counts)}
+        certain = []
+        for name, count in self.counts.items():
+            if remaining_chunks > count:
+                continue
+            threats = sum(1 for other, other_count in self.counts.items() if other != name and (
+                other_count + remaining_chunks > count
+                or (other_count + remaining_chunks == count and order[other] < order[name])))
+            if threats < self.top_n:
+                certain.append(name)
+        return certain
+
+
+def run_pipelined(state: Dict, top_n_tools: int = 8, deadline: Optional[float] = ARTICLE_FETCH_DEADLINE) -> List[Dict]:
+    """
+    Run extraction and summarization for `state["article_urls"]` as overlapping stages
+    instead of one after another. Articles are chunked (in URL order) as soon as they are
+    fetched and each full chunk goes straight to an extraction worker; a tool is handed to
+    a summarization worker once its place in the top `top_n_tools` can no longer change,
+    which can happen while articles are still being fetched. With LLM_SUMMARY_MODE=batch
+    the tools that become certain together are summarized as one batch; otherwise each
+    tool gets its own worker. Stages are connected by bounded queues. Articles, chunks, ranking and incremental
+    carry-over are the same as in the sequential workflow, so the same tools come out
+    in the same order. Summaries are checkpointed one by one (`state["checkpoint"]`), and
+    those from an earlier failed attempt of the run are reused. Returns the summaries.
+    """
+    documents = state.get("documents")
+    previous = state.get("previous_results")
+    checkpoint = state.get("checkpoint")
+    done = checkpoint.partials("pipeline") if checkpoint is not None else {}
+    search_agent = SearchAgent(retry_budget=state.get("retry_budget"))
+    urls = list(dict.fromkeys(url for url in state["article_urls"] if url))
+
+    events: queue.Queue = queue.Queue()
+    extraction_llm = get_llm("extraction")
+    summary_llm = get_llm("summarization")
+    gazetteer_hits: list = []
+    extractor = _Stage("extract", lambda chunk: extract_chunk_tool_names(chunk, extraction_llm, gazetteer_hits),
+                       LLM_EXTRACTION_WORKERS, events, LLM_EXTRACTION_WORKERS)
+    def record(summary: Dict) -> None:
+        if checkpoint is not None:
+            checkpoint.save_partial("pipeline", canonical_tool_name(summary["name"]), summary)
+        report_progress(state, {"type": "summary", "summary": summary})
+
+    def summarize(names: tuple) -> List[Optional[Dict]]:
+        if len(names) > 1:
+            found = summarize_top_tools(list(names), search_agent, documents=documents, on_summary=record)
+        else:
+            summary = search_and_summarize(names[0], search_agent, summary_llm, documents)
+            found = [summary] if summary is not None else []
+            if summary is not None and summary["summary"] != FAILED_SUMMARY:
+                record(summary)
+        by_name = {summary["name"]: summary for summary in found}
+        return [by_name.get(name) for name in names]
+
+    summarizer = _Stage("summarize", summarize, LLM_SUMMARY_CONCURRENCY, events, LLM_SUMMARY_CONCURRENCY)
+
+    def fetch_articles():
+        try:
+            fetched, stats = fetch_all(urls, lambda url, cancel: fetch_article_text(url, cancel, documents=documents),
+                                       deadline=deadline,
+                                       on_done=lambda url, text: events.put(("article", url, text)))
+        except Exception as e:
+            print(f"Article fetching failed: {e}")
+            fetched, stats = {}, []
+        events.put(("fetched", None, (fetched, stats)))
+
+    threading.Thread(target=fetch_articles, name="pipeline-fetch", daemon=True).start()
+
+    packer = ChunkPacker(LLM_EXTRACTION_CHUNK_TOKENS, LLM_EXTRACTION_MAX_ARTICLE_TOKENS)
+    per_article = packer.max_chunks_per_text()
+    tracker = RankTracker(top_n_tools)
+    arrived: Dict[str, Optional[str]] = {}
+    articles = 0
+    next_article = 0
+    fetch_done = False
+    chunk_results: Dict[int, list] = {}
+    total_chunks: Optional[int] = None
+    chunk_count = 0
+    submitted: Dict[str, bool] = {}
+    summaries: Dict[str, Optional[Dict]] = {}
+
+    def submit_chunks(chunks: List[str]) -> None:
+        nonlocal chunk_count
+        for chunk in chunks:
+            extractor.put(chunk_count, chunk)
+            chunk_count += 1
+
+    def claim_tool(name: str) -> bool:
+        """Whether a newly certain tool still needs summarizing (not carried over or checkpointed)."""
+        if name in submitted:
+            return False
+        carried, refresh = plan_refresh([name], previous)
+        if refresh and canonical_tool_name(name) in done:
+            summaries[name] = done[canonical_tool_name(name)]
+            report_progress(state, {"type": "summary", "summary": summaries[name]})
+            refresh = []
+        submitted[name] = bool(refresh)
+        return bool(refresh)
+
+    def submit_tools(names: List[str]) -> None:
+        names = [name for name in names if claim_tool(name)]
+        groups = [tuple(names)] if LLM_SUMMARY_MODE == "batch" else [(name,) for name in names]
+        for group in groups:
+            if group:
+                summarizer.put(group, group)
+
+    try:
+        while True:
+            kind, key, value = events.get()
+            if kind == "article" and not fetch_done:
+                arrived[key] = value
+            elif kind == "fetched":
+                fetch_done = True
+                fetched, stats = value
+                print(f"Fetched {len(fetched)}/{len(stats)} articles: {summarize_fetch_stats(stats)}")
+                state["fetch_stats"] = stats
+                # Whatever the fetcher reports at the deadline decides the articles not seen yet
+                for url in urls:
+                    arrived.setdefault(url, fetched.get(url))
+            elif kind == "extract":
+                chunk_results[key] = value or []
+                while tracker.chunks in chunk_results:
+                    tracker.add(chunk_results.pop(tracker.chunks))
+            elif kind == "summarize":
+                for name, summary in zip(key, value or [None] * len(key)):
+                    summaries[name] = summary
+
+            # Feed articles to the chunker strictly in URL order
+            while next_article < len(urls) and urls[next_article] in arrived:
+                text = arrived[urls[next_article]]
+                if text is not None:
+                    articles += 1
+                    submit_chunks(packer.add(text))
+                next_article += 1
+            if fetch_done and total_chunks is None and next_article == len(urls):
+                submit_chunks(packer.finish())
+                total_chunks = chunk_count
+                print(f"Extracting tool names from {articles} articles in {total_chunks} chunks")
+
+            if total_chunks is not None:
+                remaining = total_chunks - tracker.chunks
+            elif per_article is not None:
+                # Until fetching ends, bound what is left: chunks still being extracted, the most
+                # each article not chunked yet can complete, and the final partly filled chunk
+                remaining = chunk_count - tracker.chunks + (len(urls) - next_article) * per_article + 1
+            else:
+                remaining = None
+            if remaining is not None:
+                submit_tools(tracker.certain(remaining))
+            if remaining == 0 and all(name in summaries for name, queued in submitted.items() if queued):
+                break
+    finally:
+        extractor.close()
+        summarizer.close()
+
+    finish_chunk_extraction(len(gazetteer_hits), total_chunks or 0)
+    top_tools = tracker.top()
+    state["top_tools"] = top_tools
+    carried, refresh = plan_refresh(top_tools, previous)
+    if previous is not None:
+        print(f"Incremental run: {len(carried)} tools carried over, {len(refresh)} to refresh")
+    fresh = [summaries[name] for name in refresh if summaries.get(name) is not None]
+    return merge_results(top_tools, carried, fresh)
@@ -1,16 +1,31 @@
 
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 from collections import Counter
 from langgraph.graph import StateGraph, START, END
-from tools.article_url_extractor import extract_tool_names_llm
+from tools.article_url_extractor import ArticlePrefetcher, extract_tool_names_llm
+from tools.document_store import DocumentStore
+from tools.incremental import canonical_tool_name, merge_results, plan_refresh
 from tools.llm_summarizer import summarize_top_tools
+from tools.retry import RetryBudget
 from tools.search_agent import SearchAgent
+from workflow.checkpoint import CHECKPOINTS, checkpointed
+from workflow.coordinator import report_progress
+from workflow.pipeline import run_pipelined
+from config import LANGSEARCH_RETRY_BUDGET, LLM_EXTRACTION_MODE, WORKFLOW_MODE
 
 
 def make_search_articles_node(top_n_articles: int = 12):
     def search_articles_node(state: Dict) -> Dict:
-        search_agent = SearchAgent()
-        results = search_agent.search_new_ai_tools()  # Now searches all trending tech tools
+        search_agent = SearchAgent(retry_budget=state.get("retry_budget"))
+        documents = state.get("documents")
+        # Articles start downloading as soon as their query answers, not after the last one
+        prefetcher = ArticlePrefetcher(documents, top_n_articles) if documents is not None else None
+        try:
+            results = search_agent.search_new_ai_tools(  # Now searches all trending tech tools
+                on_result=prefetcher.offer if prefetcher is not None else None)
+        finally:
+            if prefetcher is not None:
+                prefetcher.close()
         # Get top N article URLs - increased from 4 to 12 for more diversity
         urls = [r.get('url') for r in results if r.get('url')][:top_n_articles]
         state["article_urls"] = urls
@@ -20,7 +35,10 @@ def make_search_articles_node(top_n_articles: int = 12):
 
 def make_extract_tools_llm_node(top_n: int = 8):
     def extract_tools_llm_node(state: Dict) -> Dict:
-        tool_names = extract_tool_names_llm(state["article_urls"])
+        fetch_stats = []
+        tool_names = extract_tool_names_llm(state["article_urls"], stats=fetch_stats,
+                                            documents=state.get("documents"))
+        state["fetch_stats"] = fetch_stats
         # Increased diversity in final selection
         ranked = Counter(tool_names).most_common(top_n)
         state["top_tools"] = [name for name, _ in ranked]
@@ -29,19 +47,61 @@ def make_extract_tools_llm_node(top_n: int = 8):
 
 def make_llm_summarize_top_tools_node():
     def llm_summarize_top_tools_node(state: Dict) -> Dict:
-        summaries = summarize_top_tools(state["top_tools"])
-        state["summaries"] = summaries
+        documents = state.get("documents")
+        # Incremental run: only tools that are new, or whose last summary is too old, are summarized again
+        carried, refresh = plan_refresh(state["top_tools"], state.get("previous_results"))
+        if state.get("previous_results") is not None:
+            print(f"Incremental run: {len(carried)} tools carried over, {len(refresh)} to refresh")
+        # Tools summarized before a failed attempt of this run are kept in its checkpoint
+        checkpoint = state.get("checkpoint")
+        done = checkpoint.partials("llm_summarize_top_tools") if checkpoint is not None else {}
+        todo = [name for name in refresh if canonical_tool_name(name) not in done]
+        if done:
+            print(f"Run {checkpoint.run_id}: {len(refresh) - len(todo)} summaries restored from checkpoint")
+        for summary in done.values():
+            report_progress(state, {"type": "summary", "summary": summary})
+
+        def on_summary(summary: Dict) -> None:
+            if checkpoint is not None:
+                checkpoint.save_partial("llm_summarize_top_tools", canonical_tool_name(summary["name"]), summary)
+            report_progress(state, {"type": "summary", "summary": summary})
+
+        search_agent = SearchAgent(retry_budget=state.get("retry_budget"))
+        summaries = summarize_top_tools(todo, search_agent=search_agent, documents=documents,
+                                        on_summary=on_summary) if todo else []
+        state["summaries"] = merge_results(state["top_tools"], carried, list(done.values()) + summaries)
+        if documents is not None:
+            print(f"Document store: {documents.stats()}")
         return state
     return llm_summarize_top_tools_node
+def tracked(node_name: str, node):
+    """
+    Graph node with checkpointing (see workflow.checkpoint) that reports "started" and
+    "completed" (or "restored", when taken from the checkpoint) progress events.
+    """
+    node = checkpointed(node_name, node)
+
+    def run_node(state: Dict) -> Dict:
+        checkpoint = state.get("checkpoint")
+        restored = checkpoint is not None and node_name in checkpoint.completed
+        report_progress(state, {"type": "node", "node": node_name, "status": "started"})
+        state = node(state)
+        report_progress(state, {"type": "node", "node": node_name, "status": "restored" if restored else "completed"})
+        return state
+    return run_node
+
+
 class Workflow:
     def __init__(self, top_n_articles: int = 12, top_n_tools: int = 8):
         self.top_n_articles = top_n_articles
         self.top_n_tools = top_n_tools
 
         graph = StateGraph(dict)
-        graph.add_node("search_articles", make_search_articles_node(self.top_n_articles))
-        graph.add_node("extract_tools_llm", make_extract_tools_llm_node(self.top_n_tools))
-        graph.add_node("llm_summarize_top_tools", make_llm_summarize_top_tools_node())
+        # Each node's output is checkpointed, so a failed run resumes after its last completed node
+        graph.add_node("search_articles", tracked("search_articles", make_search_articles_node(self.top_n_articles)))
+        graph.add_node("extract_tools_llm", tracked("extract_tools_llm", make_extract_tools_llm_node(self.top_n_tools)))
+        graph.add_node("llm_summarize_top_tools",
+                       tracked("llm_summarize_top_tools", make_llm_summarize_top_tools_node()))
 
         graph.add_edge(START, "search_articles")
         graph.add_edge("search_articles", "extract_tools_llm")
@@ -50,7 +110,35 @@ class Workflow:
 
         self.app = graph.compile()
 
-    def run(self) -> List[Dict]:
-        initial_state = {}
-        result = self.app.invoke(initial_state)
-        return result.get("summaries", [])
+    def run(self, previous_results: Optional[List[Dict]] = None, resume: bool = True,
+            progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Run the workflow. With `previous_results` (the last stored results), unchanged
+        tools summarized within INCREMENTAL_TRUST_DAYS are carried over and only new or stale
+        ones are searched and summarized.
+        If the last run failed or was interrupted, it is resumed from its checkpoint
+        (unless `resume` is False); the checkpoint is cleared once a run completes.
+        `progress` receives node and per-tool summary events as the run goes.
+        """
+        # One document store per run: every stage reads pages from it instead of refetching.
+        # One LangSearch retry budget per run, shared by every stage's searches
+        retry_budget = RetryBudget(LANGSEARCH_RETRY_BUDGET)
+        initial_state = {"documents": DocumentStore(), "previous_results": previous_results, "progress": progress,
+                         "retry_budget": retry_budget}
+        checkpoint = CHECKPOINTS.start(resume) if CHECKPOINTS is not None else None
+        if checkpoint is not None:
+            if checkpoint.resumed:
+                print(f"Resuming run {checkpoint.run_id} after {', '.join(checkpoint.completed)}")
+                initial_state.update(checkpoint.state)
+            initial_state["checkpoint"] = checkpoint
+        if WORKFLOW_MODE == "pipelined" and LLM_EXTRACTION_MODE == "map_reduce":
+            state = tracked("search_articles", make_search_articles_node(self.top_n_articles))(initial_state)
+            report_progress(state, {"type": "node", "node": "pipeline", "status": "started"})
+            summaries = run_pipelined(state, self.top_n_tools)
+            report_progress(state, {"type": "node", "node": "pipeline", "status": "completed"})
+        else:
+            summaries = self.app.invoke(initial_state).get("summaries", [])
+        print(f"LangSearch retry stats for the run: {retry_budget.stats()}")
+        if checkpoint is not None:
+            checkpoint.finish()
+        return summaries
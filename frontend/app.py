@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 import sys
 import os
 
@@ -13,6 +14,7 @@ st.title("Developer Tech Tools Discovery Dashboard")
 # Dynamic API URLs based on environment
 API_URL = f"{BACKEND_URL}/weekly-tech-tools"
 TRIGGER_URL = f"{BACKEND_URL}/trigger-workflow"
+JOBS_URL = f"{BACKEND_URL}/jobs"
 DEBUG_URL = f"{BACKEND_URL}/debug-workflow"
 
 def display_tool(tool):
@@ -74,18 +76,49 @@ def fetch_tools():
         st.error(f"Connection Error: {str(e)}")
         return None
 
+def follow_job(job_id, status):
+    """Show a job's progress events (Server-Sent Events) as they arrive; returns the final status event"""
+    final = None
+    # The server sends a keep-alive at least every 15 s, so the read timeout only trips if it goes away
+    with requests.get(f"{JOBS_URL}/{job_id}/events", stream=True, timeout=(5, 60)) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            if event["type"] == "node":
+                status.update(label=f"Running workflow: {event['node']} {event['status']}...")
+                status.write(f"{event['node']}: {event['status']}")
+            elif event["type"] == "summary":
+                status.write(f"Summarized **{event['summary'].get('name', 'tool')}**")
+            elif event["type"] == "status":
+                final = event
+    return final
+
 def trigger_workflow():
-    """Trigger the workflow manually"""
+    """Start a workflow run and follow its progress until it finishes"""
     try:
-        response = requests.post(TRIGGER_URL, timeout=60)
-        if response.status_code == 200:
-            result = response.json()
-            st.success("Workflow triggered successfully!")
-            st.json(result)
-            return True
-        else:
+        response = requests.post(JOBS_URL, timeout=30)
+        if response.status_code not in (200, 202):
             st.error(f"Workflow Error: {response.status_code} - {response.text}")
             return False
+        job = response.json()
+        with st.status("Running workflow...", expanded=True) as status:
+            if job.get("joined_existing_run"):
+                status.write("A run was already in progress; following it.")
+            final = follow_job(job["job_id"], status)
+            if final is None:
+                # Stream ended early: fall back to the job's status
+                final = requests.get(f"{JOBS_URL}/{job['job_id']}", timeout=30).json()
+            if final.get("status") == "completed":
+                status.update(label="Workflow completed", state="complete", expanded=False)
+            else:
+                status.update(label="Workflow did not complete", state="error")
+        if final.get("status") == "completed":
+            st.success("Workflow completed successfully!")
+            return True
+        st.error(f"Workflow {final.get('status')}: {final.get('error')}")
+        return False
     except requests.exceptions.RequestException as e:
         st.error(f"Connection Error: {str(e)}")
         return False
@@ -118,9 +151,8 @@ with col1:
 
 with col2:
     if st.button("🚀 Trigger Workflow"):
-        with st.spinner("Running workflow..."):
-            if trigger_workflow():
-                st.rerun()
+        if trigger_workflow():
+            st.rerun()
 
 with col3:
     if st.button("🔍 Debug Info"):